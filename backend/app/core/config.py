@@ -9,6 +9,7 @@ class Settings(BaseSettings):
     redis_url: str = "redis://localhost:6379/0"
     celery_broker_url: str = "redis://localhost:6379/1"
     celery_result_backend: str = "redis://localhost:6379/2"
+    celery_prefetch_multiplier: int = 1
     cors_origins: str = "http://localhost:5173"
     bili_client: str = "mock"
     bili_cookies: str | None = None
@@ -19,7 +20,12 @@ class Settings(BaseSettings):
     refresh_all_time: str = "03:00"
     refresh_all_batch_size: int = 50
     creator_watch_interval_minutes: int = 45
+    creator_watch_tick_minutes: int = 5
+    creator_watch_min_interval_minutes: int = 15
+    creator_watch_max_interval_hours: int = 24
     creator_watch_fetch_limit: int = 20
+    creator_watch_concurrency: int = 8
+    creator_profile_ttl_hours: int = 24
     comment_crawl_limit: int = 500
     comment_crawl_limit_max: int = 1000
     comment_crawl_min_views: int = 0
@@ -38,12 +44,38 @@ class Settings(BaseSettings):
     asr_ffmpeg_path: str | None = None
     asr_max_audio_mb: int = 100
     asr_transcode: bool = True
+    asr_stream_segment_seconds: int = 300
+    asr_cache_enabled: bool = True
+    asr_spool_dir: str | None = None
+    asr_vad_enabled: bool = False
+    asr_vad_floor_db: float = -50.0
+    asr_vad_margin_db: float = 12.0
+    asr_vad_min_silence_ms: int = 800
+    asr_vad_padding_ms: int = 200
+    asr_upload_codec: str = "wav"
+    asr_upload_opus_kbps: int = 24
+    subtitle_native_concurrency: int = 8
+    subtitle_native_batch_size: int = 100
+    whisper_service_enabled: bool = False
+    whisper_queue_key: str = "asr:whisper:jobs"
+    whisper_processes: int = 1
+    whisper_cpu_threads: int = 4
+    whisper_num_workers: int = 2
+    whisper_batch_size: int = 8
+    whisper_vad_filter: bool = True
+    whisper_job_timeout_seconds: int = 1500
     doubao_app_key: str | None = None
     doubao_access_key: str | None = None
     doubao_resource_id: str = "volc.bigasr.auc_turbo"
     doubao_endpoint: str = "https://openspeech.bytedance.com/api/v3/auc/bigmodel/recognize/flash"
     doubao_submit_endpoint: str = "https://openspeech.bytedance.com/api/v3/auc/bigmodel/submit"
     doubao_query_endpoint: str = "https://openspeech.bytedance.com/api/v3/auc/bigmodel/query"
+    doubao_poll_initial_seconds: int = 5
+    doubao_poll_max_seconds: int = 60
+    doubao_poll_timeout_minutes: int = 180
+    asr_poll_tick_seconds: int = 15
+    asr_poll_batch_size: int = 200
+    asr_poll_concurrency: int = 8
     baidu_api_key: str | None = None
     baidu_secret_key: str | None = None
     baidu_token_endpoint: str = "https://aip.baidubce.com/oauth/2.0/token"
@@ -51,6 +83,11 @@ class Settings(BaseSettings):
     baidu_dev_pid: int = 1537
     baidu_cuid: str = "bili-admin"
     baidu_segment_seconds: int = 20
+    baidu_concurrency: int = 4
+    baidu_qps: float = 5.0
+    baidu_retry_times: int = 3
+    baidu_timeout_seconds: int = 120
+    baidu_allow_partial: bool = True
     tos_access_key: str | None = None
     tos_secret_key: str | None = None
     tos_endpoint: str | None = None
@@ -60,6 +97,28 @@ class Settings(BaseSettings):
     tos_public_base: str | None = None
     tos_url_expires: int = 3600
     frames_dir: str = "frames"
+    frame_progress_interval_seconds: float = 1.0
+    frame_seek_min_interval_seconds: int = 5
+    frame_seek_concurrency: int = 4
+    frame_scene_two_pass: bool = True
+    frame_cpu_budget: int = 0
+    frame_slice_min_seconds: int = 120
+    frame_thumb_width: int = 320
+    frame_thumb_format: str = "webp"
+    frame_dedup_distance: int = -1
+    frame_dedup_delete: bool = False
+    frame_url_secret: str | None = None
+    frame_sprite_enabled: bool = False
+    frame_sprite_columns: int = 10
+    frame_sprite_rows: int = 10
+    frame_sprite_tile_width: int = 160
+    frame_storage_max_mb: int = 20480
+    frame_keep_jobs_per_video: int = 3
+    frame_gc_interval_minutes: int = 60
+    frame_gc_budget_seconds: int = 120
+    frame_scene_analysis_width: int = 160
+    source_cache_dir: str = "source_cache"
+    source_cache_max_mb: int = 10240
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
@@ -19,6 +19,15 @@ engine = _make_engine()
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False)
 
 
+def dialect_insert(db):
+    """``insert`` of the session's dialect, for ``on_conflict_do_*`` upserts (PostgreSQL or SQLite)."""
+    if db.bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
 def init_db() -> None:
     from app import models  # noqa: F401
 
@@ -30,7 +39,10 @@ def init_db() -> None:
 def _ensure_sqlite_columns() -> None:
     with engine.begin() as conn:
         tables = {
-            "tasks": {"tags": "TEXT"},
+            "tasks": {"tags": "TEXT", "next_run_at": "DATETIME"},
+            "task_videos": {"keyword_hits": "TEXT DEFAULT '[]'"},
+            "subtitles": {"asr_job": "TEXT", "asr_next_poll_at": "DATETIME", "segments": "BLOB"},
+            "transcript_cache": {"segments": "BLOB"},
             "videos": {
                 "tags": "TEXT",
                 "views_delta_1d": "INTEGER",
@@ -42,15 +54,30 @@ def _ensure_sqlite_columns() -> None:
             },
             "frame_jobs": {
                 "frame_count": "INTEGER DEFAULT 0",
+                "scene_scores": "BLOB",
+                "dedup_distance": "INTEGER",
+                "accessed_at": "DATETIME",
+                "storage_bytes": "INTEGER",
             },
             "video_frames": {
                 "thumb_url": "TEXT",
+                "phash": "TEXT",
+                "duplicate_of": "TEXT",
             },
             "followed_creators": {
                 "follower_count": "INTEGER DEFAULT 0",
                 "following_count": "INTEGER DEFAULT 0",
                 "like_count": "INTEGER DEFAULT 0",
                 "view_count": "INTEGER DEFAULT 0",
+                "latest_bvid": "TEXT",
+                "latest_publish_at": "DATETIME",
+                "profile_refreshed_at": "DATETIME",
+                "post_interval_hours": "FLOAT",
+                "next_check_at": "DATETIME",
+                "boost": "BOOLEAN DEFAULT 0",
+                "backfill_status": "TEXT",
+                "backfill_total": "INTEGER DEFAULT 0",
+                "backfill_done": "INTEGER DEFAULT 0",
             },
         }
         for table, columns in tables.items():
@@ -70,6 +97,15 @@ def _ensure_sqlite_columns() -> None:
             if table == "videos":
                 if "source" in existing:
                     conn.execute(text("UPDATE videos SET source='task' WHERE source IS NULL"))
+        indexes = {
+            "ix_videos_views": ("videos", "views"),
+            "ix_videos_follower_count": ("videos", "follower_count"),
+            "ix_tasks_next_run_at": ("tasks", "next_run_at"),
+            "ix_followed_creators_next_check_at": ("followed_creators", "next_check_at"),
+            "ix_subtitles_asr_next_poll_at": ("subtitles", "asr_next_poll_at"),
+        }
+        for name, (table, column) in indexes.items():
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({column})"))
 
 
 def get_db():
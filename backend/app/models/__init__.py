@@ -14,6 +14,7 @@ from app.models.comment_crawl_job import CommentCrawlJob
 from app.models.product import Product
 from app.models.product_mention import ProductMention
 from app.models.followed_creator import FollowedCreator
+from app.models.transcript_cache import TranscriptCache
 
 __all__ = [
     "Task",
@@ -32,4 +33,5 @@ __all__ = [
     "Product",
     "ProductMention",
     "FollowedCreator",
+    "TranscriptCache",
 ]
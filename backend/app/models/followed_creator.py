@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Boolean, Column, DateTime, String, Text, JSON, Integer
+from sqlalchemy import Boolean, Column, DateTime, Float, String, Text, JSON, Integer
 
 from app.models.base import Base
 
@@ -25,3 +25,12 @@ class FollowedCreator(Base):
     last_success_at = Column(DateTime, nullable=True)
     last_error_at = Column(DateTime, nullable=True)
     last_error_msg = Column(Text, nullable=True)
+    latest_bvid = Column(String(32), nullable=True)
+    latest_publish_at = Column(DateTime, nullable=True)
+    profile_refreshed_at = Column(DateTime, nullable=True)
+    post_interval_hours = Column(Float, nullable=True)
+    next_check_at = Column(DateTime, nullable=True, index=True)
+    boost = Column(Boolean, nullable=False, default=False)
+    backfill_status = Column(String(16), nullable=True)
+    backfill_total = Column(Integer, nullable=False, default=0)
+    backfill_done = Column(Integer, nullable=False, default=0)
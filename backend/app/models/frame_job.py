@@ -1,7 +1,7 @@
 from datetime import datetime
 from uuid import uuid4
 
-from sqlalchemy import Column, DateTime, Float, Integer, String, Text
+from sqlalchemy import BigInteger, Column, DateTime, Float, Integer, LargeBinary, String, Text
 
 from app.models.base import Base
 
@@ -25,11 +25,18 @@ class FrameJob(Base):
     scene_threshold = Column(Float, nullable=True)
     max_frames = Column(Integer, nullable=False, default=120)
     resolution = Column(String(10), nullable=False, default="720p")
+    dedup_distance = Column(Integer, nullable=True)
     source_video_path = Column(String(500), nullable=True)
     output_dir = Column(String(500), nullable=True)
     generated_frames = Column(Integer, nullable=False, default=0)
     frame_count = Column(Integer, nullable=False, default=0)
     progress = Column(Float, nullable=True)
+    # Pass-1 scene scores packed by ``scene_scores.pack``; reused to re-threshold without decoding.
+    scene_scores = Column(LargeBinary, nullable=True)
     error_msg = Column(Text, nullable=True)
     created_at = Column(DateTime, nullable=False, default=_now)
     updated_at = Column(DateTime, nullable=False, default=_now, onupdate=_now)
+    # Last time the frames were listed; storage GC evicts least recently viewed jobs first.
+    accessed_at = Column(DateTime, nullable=True)
+    # Bytes the job's directory holds, measured at extraction and refreshed by storage GC.
+    storage_bytes = Column(BigInteger, nullable=True)
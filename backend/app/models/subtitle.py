@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, DateTime, String, Text, ForeignKey
+from sqlalchemy import Column, DateTime, String, Text, ForeignKey, JSON, LargeBinary
 from sqlalchemy.orm import relationship
 
 from app.models.base import Base
@@ -15,8 +15,13 @@ class Subtitle(Base):
     bvid = Column(String(32), ForeignKey("videos.bvid"), primary_key=True)
     status = Column(String(20), nullable=False, default="none")
     text = Column(Text, nullable=True)
+    # Timestamped segments packed by ``transcript_segments.pack``; ``text`` is their join.
+    segments = Column(LargeBinary, nullable=True)
     format = Column(String(20), nullable=False, default="txt")
     updated_at = Column(DateTime, nullable=False, default=_now, onupdate=_now)
     error = Column(String(500), nullable=True)
+    # In-flight asynchronous ASR job (provider task id, attempts, ...) and its next poll time.
+    asr_job = Column(JSON, nullable=True)
+    asr_next_poll_at = Column(DateTime, nullable=True, index=True)
 
     video = relationship("Video", back_populates="subtitle")
@@ -27,6 +27,7 @@ class Task(Base):
     rules = Column(JSON, nullable=False, default=dict)
     status = Column(String(20), nullable=False, default="enabled")
     consecutive_failures = Column(Integer, nullable=False, default=0)
+    next_run_at = Column(DateTime, nullable=True, index=True)
     created_at = Column(DateTime, nullable=False, default=_now)
     updated_at = Column(DateTime, nullable=False, default=_now, onupdate=_now)
 
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, UniqueConstraint, JSON
 from sqlalchemy.orm import relationship
 
 from app.models.base import Base
@@ -16,6 +16,7 @@ class TaskVideo(Base):
     id = Column(Integer, primary_key=True)
     task_id = Column(String(36), ForeignKey("tasks.id"), nullable=False)
     bvid = Column(String(32), ForeignKey("videos.bvid"), nullable=False)
+    keyword_hits = Column(JSON, nullable=False, default=list)
     created_at = Column(DateTime, nullable=False, default=_now)
 
     task = relationship("Task", back_populates="task_videos")
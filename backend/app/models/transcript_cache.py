@@ -0,0 +1,23 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer, LargeBinary, String, Text
+
+from app.models.base import Base
+
+
+def _now() -> datetime:
+    return datetime.utcnow()
+
+
+class TranscriptCache(Base):
+    __tablename__ = "transcript_cache"
+
+    audio_hash = Column(String(64), primary_key=True)
+    provider = Column(String(32), primary_key=True)
+    model = Column(String(100), primary_key=True)
+    text = Column(Text, nullable=False)
+    segments = Column(LargeBinary, nullable=True)
+    duration_ms = Column(Integer, nullable=False, default=0)
+    hit_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, nullable=False, default=_now)
+    last_hit_at = Column(DateTime, nullable=True)
@@ -16,12 +16,12 @@ class Video(Base):
     title = Column(String(500), nullable=False)
     up_id = Column(String(64), nullable=False)
     up_name = Column(String(200), nullable=False)
-    follower_count = Column(Integer, nullable=False, default=0)
+    follower_count = Column(Integer, nullable=False, default=0, index=True)
     publish_time = Column(DateTime, nullable=True)
     fetch_time = Column(DateTime, nullable=False, default=_now)
     cover_url = Column(String(500), nullable=True)
 
-    views = Column(Integer, nullable=False, default=0)
+    views = Column(Integer, nullable=False, default=0, index=True)
     views_delta_1d = Column(Integer, nullable=True)
     like = Column(Integer, nullable=False, default=0)
     fav = Column(Integer, nullable=False, default=0)
@@ -26,4 +26,7 @@ class VideoFrame(Base):
     thumb_url = Column(String(500), nullable=True)
     width = Column(Integer, nullable=True)
     height = Column(Integer, nullable=True)
+    # 64-bit dHash as 16 hex digits (``frame_hash``); near-identical frames point at the kept one.
+    phash = Column(String(16), nullable=True)
+    duplicate_of = Column(String(36), nullable=True)
     created_at = Column(DateTime, nullable=False, default=_now)
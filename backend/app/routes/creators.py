@@ -13,7 +13,7 @@ from app.schemas.pagination import Page
 from app.services.bili_client import MockBiliClient
 from app.services.bili_crawler import CrawlerBiliClient
 from app.services.settings_service import get_or_create_settings
-from app.services.creator_sync import sync_creator_videos
+from app.workers.celery_app import celery_app
 
 router = APIRouter()
 
@@ -68,6 +68,15 @@ def _build_creator_client(db: Session):
     return MockBiliClient()
 
 
+def _mark_backfill_queued(creator: FollowedCreator) -> None:
+    # Profile refresh and the 30-day video pull run on the crawl queue (backfill_creator);
+    # clients watch backfill_status / backfill_done / backfill_total on the creator.
+    # Send the task only after this state is committed, so the worker never races it.
+    creator.backfill_status = "queued"
+    creator.backfill_total = 0
+    creator.backfill_done = 0
+
+
 def _creator_to_dict(creator: FollowedCreator) -> dict:
     return {
         "up_id": creator.up_id,
@@ -84,6 +93,14 @@ def _creator_to_dict(creator: FollowedCreator) -> dict:
         "last_success_at": creator.last_success_at,
         "last_error_at": creator.last_error_at,
         "last_error_msg": creator.last_error_msg,
+        "latest_bvid": creator.latest_bvid,
+        "latest_publish_at": creator.latest_publish_at,
+        "post_interval_hours": creator.post_interval_hours,
+        "next_check_at": creator.next_check_at,
+        "boost": bool(creator.boost),
+        "backfill_status": creator.backfill_status,
+        "backfill_total": int(creator.backfill_total or 0),
+        "backfill_done": int(creator.backfill_done or 0),
     }
 
 
@@ -153,44 +170,26 @@ def create_creator(payload: dict, db: Session = Depends(get_db)):
     if monitor is not None:
         creator.monitor_enabled = bool(monitor)
 
-    client = _build_creator_client(db)
-    profile = client.get_up_profile(up_id)
-    if profile:
+    if not creator.up_name:
+        # One profile call so the list shows the real name right away; follower counts and
+        # stats come with the backfill.
+        try:
+            profile = _build_creator_client(db).get_up_profile(up_id) or {}
+        except Exception:
+            profile = {}
         if profile.get("up_name"):
-            creator.up_name = profile.get("up_name") or creator.up_name
+            creator.up_name = profile.get("up_name")
         if profile.get("avatar"):
-            creator.avatar = profile.get("avatar") or creator.avatar
-
-    up_info = client.get_up_info(up_id)
-    if up_info:
-        creator.follower_count = int(up_info.get("follower_count", creator.follower_count) or 0)
-        creator.following_count = int(up_info.get("following_count", creator.following_count) or 0)
-
-    stats = client.get_up_stats(up_id)
-    if stats:
-        creator.view_count = int(stats.get("view_count", creator.view_count) or 0)
-        creator.like_count = int(stats.get("like_count", creator.like_count) or 0)
-
+            creator.avatar = profile.get("avatar")
     if not creator.up_name:
         creator.up_name = payload.get("up_name") or creator.up_id
+    # On follow, refresh the profile and pull recent 30-day videos in the background.
+    _mark_backfill_queued(creator)
 
     try:
         db.add(creator)
         db.commit()
         db.refresh(creator)
-        # On first follow, pull recent 30-day videos regardless of count.
-        try:
-            now = datetime.utcnow()
-            sync_creator_videos(db, creator, client, days_limit=30, now=now)
-            creator.last_checked_at = now
-            creator.last_success_at = now
-            creator.last_error_at = None
-            creator.last_error_msg = None
-            db.add(creator)
-            db.commit()
-        except Exception:
-            db.rollback()
-        return {"ok": True, "creator": _creator_to_dict(creator)}
     except IntegrityError:
         db.rollback()
         existing = db.get(FollowedCreator, up_id)
@@ -198,6 +197,9 @@ def create_creator(payload: dict, db: Session = Depends(get_db)):
             return {"ok": True, "creator": _creator_to_dict(existing)}
         raise
 
+    celery_app.send_task("backfill_creator", args=[up_id])
+    return {"ok": True, "creator": _creator_to_dict(creator)}
+
 
 @router.put("/{up_id}")
 def update_creator(up_id: str, payload: dict, db: Session = Depends(get_db)):
@@ -214,39 +216,22 @@ def update_creator(up_id: str, payload: dict, db: Session = Depends(get_db)):
     monitor = payload.get("monitor_enabled")
     if monitor is not None:
         creator.monitor_enabled = bool(monitor)
+    boost = payload.get("boost")
+    if boost is not None:
+        creator.boost = bool(boost)
+        # Check on the next watch tick, which then re-plans with the new boost flag.
+        creator.next_check_at = datetime.utcnow()
 
-    if payload.get("refresh_profile"):
-        client = _build_creator_client(db)
-        profile = client.get_up_profile(up_id)
-        if profile:
-            if profile.get("up_name"):
-                creator.up_name = profile.get("up_name") or creator.up_name
-            if profile.get("avatar"):
-                creator.avatar = profile.get("avatar") or creator.avatar
-        up_info = client.get_up_info(up_id)
-        if up_info:
-            creator.follower_count = int(up_info.get("follower_count", creator.follower_count) or 0)
-            creator.following_count = int(up_info.get("following_count", creator.following_count) or 0)
-        stats = client.get_up_stats(up_id)
-        if stats:
-            creator.view_count = int(stats.get("view_count", creator.view_count) or 0)
-            creator.like_count = int(stats.get("like_count", creator.like_count) or 0)
-        # After refreshing profile, sync recent videos (30 days). New items inserted; existing updated.
-        try:
-            now = datetime.utcnow()
-            sync_creator_videos(db, creator, client, days_limit=30, now=now)
-            creator.last_checked_at = now
-            creator.last_success_at = now
-            creator.last_error_at = None
-            creator.last_error_msg = None
-        except Exception as exc:
-            creator.last_checked_at = datetime.utcnow()
-            creator.last_error_at = creator.last_checked_at
-            creator.last_error_msg = str(exc)
+    refresh = bool(payload.get("refresh_profile"))
+    if refresh:
+        # Profile and recent 30-day videos are re-synced by the backfill task.
+        _mark_backfill_queued(creator)
 
     db.add(creator)
     db.commit()
     db.refresh(creator)
+    if refresh:
+        celery_app.send_task("backfill_creator", args=[up_id])
     return {"ok": True, "creator": _creator_to_dict(creator)}
 
 
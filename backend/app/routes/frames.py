@@ -1,17 +1,57 @@
+import json
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import StreamingResponse
-from sqlalchemy import select, func
+import redis
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse
+from sqlalchemy import func, select, update
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
 from app.models import FrameJob, VideoFrame, Video, FrameFavorite
+from app.services import frame_files, frame_gc, scene_scores, source_cache
 from app.workers.celery_app import celery_app
+from app.workers.tasks import read_frame_progress, request_frame_cancel
 
 router = APIRouter()
 
+# Listing a job's frames refreshes ``accessed_at`` at most this often.
+_ACCESS_RESOLUTION = timedelta(minutes=10)
+
+
+def _frame_urls(frame: VideoFrame) -> tuple[str, str]:
+    """Image and thumbnail URLs: signed static paths when enabled, else the per-frame routes."""
+    frame_url = frame_files.static_url(frame.frame_url)
+    thumb_url = frame_files.static_url(frame.thumb_url) or frame_url
+    base = f"/api/frame_jobs/{frame.job_id}/frames/{frame.id}"
+    return frame_url or f"{base}/image", thumb_url or f"{base}/thumb"
+
+
+def _touch_job(db: Session, job: FrameJob) -> None:
+    """Record that the job was viewed (storage GC evicts least recently viewed jobs first)."""
+    now = datetime.utcnow()
+    if job.accessed_at is None or now - job.accessed_at > _ACCESS_RESOLUTION:
+        # Core UPDATE so ``updated_at`` (onupdate) keeps meaning "job changed".
+        db.execute(update(FrameJob).where(FrameJob.id == job.id).values(accessed_at=now, updated_at=FrameJob.updated_at))
+        db.commit()
+
+
+def _file_response(request: Request, path: str) -> Response:
+    """Serve an immutable frame file: strong ETag, 304 on ``If-None-Match``, Range via FileResponse."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        raise HTTPException(status_code=404, detail="file not found")
+    etag = frame_files.etag(stat)
+    headers = {"ETag": etag, "Cache-Control": frame_files.CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        if "*" in tags or etag in tags:
+            return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=frame_files.media_type(path), headers=headers, stat_result=stat)
+
 
 @router.post("/videos/{bvid}/frame_jobs")
 def create_frame_job(bvid: str, payload: dict, db: Session = Depends(get_db)):
@@ -28,6 +68,7 @@ def create_frame_job(bvid: str, payload: dict, db: Session = Depends(get_db)):
     scene_threshold = payload.get("scene_threshold") or 0.35
     max_frames = int(payload.get("max_frames") or 120)
     resolution = payload.get("resolution") or "720p"
+    dedup_distance = payload.get("dedup_distance")
 
     if max_frames > 300:
         max_frames = 300
@@ -35,6 +76,11 @@ def create_frame_job(bvid: str, payload: dict, db: Session = Depends(get_db)):
         max_frames = 120
     if resolution not in {"720p", "1080p"}:
         resolution = "720p"
+    if dedup_distance is not None:
+        try:
+            dedup_distance = max(-1, min(int(dedup_distance), 64))
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="invalid dedup_distance")
 
     job = FrameJob(
         bvid=bvid,
@@ -44,6 +90,7 @@ def create_frame_job(bvid: str, payload: dict, db: Session = Depends(get_db)):
         scene_threshold=scene_threshold if mode == "scene" else None,
         max_frames=max_frames,
         resolution=resolution,
+        dedup_distance=dedup_distance,
         source_video_path=video.source_video_path,
         output_dir=None,
         generated_frames=0,
@@ -72,6 +119,7 @@ def get_frame_job(job_id: str, db: Session = Depends(get_db)):
         "scene_threshold": job.scene_threshold,
         "max_frames": job.max_frames,
         "resolution": job.resolution,
+        "dedup_distance": job.dedup_distance,
         "generated_frames": job.generated_frames,
         "frame_count": job.frame_count,
         "progress": job.progress,
@@ -82,6 +130,41 @@ def get_frame_job(job_id: str, db: Session = Depends(get_db)):
     }
 
 
+@router.get("/frame_jobs/{job_id}/progress")
+def get_frame_job_progress(job_id: str, db: Session = Depends(get_db)):
+    """Live progress published by the worker; falls back to the job row once it has expired."""
+    try:
+        progress = read_frame_progress(job_id)
+    except redis.RedisError:
+        progress = None
+    if progress:
+        return progress
+    job = db.get(FrameJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="job not found")
+    return {
+        "id": job.id,
+        "status": job.status,
+        "progress": job.progress,
+        "generated_frames": job.generated_frames,
+        "out_time_ms": None,
+        "duration_ms": None,
+        "updated_at": None,
+    }
+
+
+@router.get("/frame_jobs/{job_id}/scene_cuts")
+def get_scene_cuts(job_id: str, threshold: float = Query(..., ge=0, le=1), db: Session = Depends(get_db)):
+    """Cuts a scene job would take at ``threshold``, from its stored pass-1 scores (no decoding)."""
+    row = db.execute(select(FrameJob.scene_scores).where(FrameJob.id == job_id)).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="job not found")
+    if not row.scene_scores:
+        raise HTTPException(status_code=404, detail="SCENE_SCORES_NOT_AVAILABLE")
+    cuts = scene_scores.cuts(row.scene_scores, threshold)
+    return {"job_id": job_id, "threshold": threshold, "count": len(cuts), "timestamps_ms": cuts}
+
+
 @router.get("/frame_jobs/{job_id}/frames")
 def list_frames(
     job_id: str,
@@ -89,10 +172,12 @@ def list_frames(
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=200),
     only_favorited: bool = Query(False),
+    include_duplicates: bool = Query(False),
 ):
     job = db.get(FrameJob, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="job not found")
+    _touch_job(db, job)
 
     fav_join = select(VideoFrame, FrameFavorite.id.label("fav_id")).outerjoin(
         FrameFavorite, FrameFavorite.frame_id == VideoFrame.id
@@ -100,16 +185,24 @@ def list_frames(
     query = fav_join.where(VideoFrame.job_id == job_id).order_by(VideoFrame.idx.asc())
     if only_favorited:
         query = query.where(FrameFavorite.id.isnot(None))
+    if not include_duplicates:
+        query = query.where(VideoFrame.duplicate_of.is_(None))
     total = db.execute(select(func.count()).select_from(query.subquery())).scalar()
     rows = db.execute(query.offset((page - 1) * page_size).limit(page_size)).all()
     items = []
     for frame, fav_id in rows:
+        frame_url, thumb_url = _frame_urls(frame)
         items.append(
             {
                 "id": frame.id,
                 "idx": frame.idx,
                 "timestamp_ms": frame.timestamp_ms,
-                "frame_url": f"/api/frame_jobs/{job_id}/frames/{frame.id}/image",
+                "frame_url": frame_url,
+                "thumb_url": thumb_url,
+                "width": frame.width,
+                "height": frame.height,
+                "phash": frame.phash,
+                "duplicate_of": frame.duplicate_of,
                 "is_favorited": fav_id is not None,
             }
         )
@@ -117,13 +210,58 @@ def list_frames(
 
 
 @router.get("/frame_jobs/{job_id}/frames/{frame_id}/image")
-def view_frame(job_id: str, frame_id: str, db: Session = Depends(get_db)):
+def view_frame(job_id: str, frame_id: str, request: Request, db: Session = Depends(get_db)):
+    frame = db.get(VideoFrame, frame_id)
+    if not frame or frame.job_id != job_id:
+        raise HTTPException(status_code=404, detail="frame not found")
+    return _file_response(request, frame.frame_url)
+
+
+@router.get("/frame_jobs/{job_id}/frames/{frame_id}/thumb")
+def view_frame_thumb(job_id: str, frame_id: str, request: Request, db: Session = Depends(get_db)):
+    """Grid-size thumbnail; frames extracted before thumbnails existed get the full image."""
     frame = db.get(VideoFrame, frame_id)
     if not frame or frame.job_id != job_id:
         raise HTTPException(status_code=404, detail="frame not found")
-    if not os.path.exists(frame.frame_url):
+    path = frame.thumb_url if frame.thumb_url and os.path.exists(frame.thumb_url) else frame.frame_url
+    return _file_response(request, path)
+
+
+@router.get("/frame_jobs/{job_id}/sprites")
+def get_frame_sprites(job_id: str, db: Session = Depends(get_db)):
+    """Contact-sheet index: each listed frame's sheet and tile offset, plus the sheet URLs."""
+    job = db.get(FrameJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="job not found")
+    sprite_dir = os.path.join(job.output_dir or "", frame_files.SPRITE_DIR)
+    try:
+        with open(os.path.join(sprite_dir, frame_files.SPRITE_INDEX), encoding="utf-8") as fh:
+            index = json.load(fh)
+    except (OSError, ValueError):
+        raise HTTPException(status_code=404, detail="SPRITES_NOT_AVAILABLE")
+    for sheet in index["sprites"]:
+        path = os.path.join(sprite_dir, sheet["file"])
+        sheet["url"] = frame_files.static_url(path) or f"/api/frame_jobs/{job_id}/sprites/{sheet['file']}"
+    return {"job_id": job_id, **index}
+
+
+@router.get("/frame_jobs/{job_id}/sprites/{name}")
+def view_frame_sprite(job_id: str, name: str, request: Request, db: Session = Depends(get_db)):
+    job = db.get(FrameJob, job_id)
+    if not job or not job.output_dir:
+        raise HTTPException(status_code=404, detail="job not found")
+    if os.path.basename(name) != name or not name.startswith("sprite_"):
         raise HTTPException(status_code=404, detail="file not found")
-    return StreamingResponse(open(frame.frame_url, "rb"), media_type="image/jpeg")
+    return _file_response(request, os.path.join(job.output_dir, frame_files.SPRITE_DIR, name))
+
+
+@router.get("/frames/static/{path:path}")
+def view_frame_static(path: str, request: Request, sig: str = Query("")):
+    """Signed frame/thumbnail URL from a listing; no database lookup."""
+    target = frame_files.resolve(path, sig)
+    if target is None:
+        raise HTTPException(status_code=403, detail="invalid signature")
+    return _file_response(request, str(target))
 
 
 @router.post("/frame_jobs/{job_id}/cancel")
@@ -137,6 +275,11 @@ def cancel_job(job_id: str, db: Session = Depends(get_db)):
     job.updated_at = datetime.utcnow()
     db.add(job)
     db.commit()
+    try:
+        request_frame_cancel(job_id)
+    except redis.RedisError:
+        # The worker falls back to reading the job status when Redis is unavailable.
+        pass
     return {"ok": True}
 
 
@@ -276,13 +419,17 @@ def list_frame_favorites(
     rows = db.execute(query.offset((page - 1) * page_size).limit(page_size)).all()
     items = []
     for fav, frame, video in rows:
+        frame_url, thumb_url = _frame_urls(frame)
         items.append(
             {
                 "id": fav.id,
                 "frame_id": frame.id,
                 "bvid": frame.bvid,
                 "timestamp_ms": frame.timestamp_ms,
-                "frame_url": f"/api/frame_jobs/{frame.job_id}/frames/{frame.id}/image",
+                "frame_url": frame_url,
+                "thumb_url": thumb_url,
+                "width": frame.width,
+                "height": frame.height,
                 "created_at": fav.created_at,
                 "video_title": video.title if video else None,
                 "video_url": (video.video_url if video else None) or f"https://www.bilibili.com/video/{frame.bvid}",
@@ -291,6 +438,28 @@ def list_frame_favorites(
     return {"items": items, "page": page, "page_size": page_size, "total": total}
 
 
+@router.get("/frames/storage")
+def frame_storage():
+    """Disk usage as of the last GC run, plus that run's report (reclaimed bytes etc.)."""
+    report = frame_gc.last_report()
+    return {
+        "usage_bytes": report.get("usage_bytes") if report else None,
+        "quota_bytes": frame_gc.quota_bytes(),
+        "last_gc": report,
+    }
+
+
+@router.post("/frames/storage/gc")
+def run_frame_storage_gc():
+    celery_app.send_task("gc_frame_storage")
+    return {"ok": True}
+
+
+@router.get("/frames/source_cache")
+def source_cache_stats():
+    return source_cache.read_stats()
+
+
 def _serialize_job(job: FrameJob | None) -> dict | None:
     if not job:
         return None
@@ -10,12 +10,21 @@ from app.schemas.run import RunOut
 from app.schemas.pagination import Page
 from app.services.defaults import default_rules, default_scope, default_schedule
 from app.services.task_runner import TaskRunner
+from app.services.keyword_matcher import invalidate_task_matcher
+from app.services.task_schedule import compute_next_run, refresh_next_run
 from app.workers.tasks import run_task as celery_run_task
 from app.workers.tasks import refresh_all_videos as celery_refresh_all_videos
 
 router = APIRouter()
 
 
+def _validate_schedule(schedule: dict | None) -> None:
+    try:
+        compute_next_run(schedule, datetime.utcnow())
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=f"invalid schedule: {exc}")
+
+
 @router.get("", response_model=Page)
 
 def list_tasks(
@@ -143,7 +152,10 @@ def create_task(payload: TaskCreate, db: Session = Depends(get_db)):
         rules=payload.rules or default_rules(),
         status="enabled",
     )
+    _validate_schedule(task.schedule)
     db.add(task)
+    db.flush()
+    refresh_next_run(task)
     db.commit()
     db.refresh(task)
     return TaskOut.model_validate(task)
@@ -166,13 +178,17 @@ def update_task(task_id: str, payload: TaskUpdate, db: Session = Depends(get_db)
         raise HTTPException(status_code=404, detail="Task not found")
 
     data = payload.model_dump(exclude_unset=True)
+    if "schedule" in data:
+        _validate_schedule(data["schedule"])
     for key, value in data.items():
         setattr(task, key, value)
 
     task.updated_at = datetime.utcnow()
+    refresh_next_run(task)
     db.add(task)
     db.commit()
     db.refresh(task)
+    invalidate_task_matcher(task.id)
     return TaskOut.model_validate(task)
 
 
@@ -183,6 +199,7 @@ def enable_task(task_id: str, db: Session = Depends(get_db)):
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     task.status = "enabled"
+    refresh_next_run(task)
     db.add(task)
     db.commit()
     db.refresh(task)
@@ -196,6 +213,7 @@ def disable_task(task_id: str, db: Session = Depends(get_db)):
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     task.status = "disabled"
+    refresh_next_run(task)
     db.add(task)
     db.commit()
     db.refresh(task)
@@ -261,6 +279,8 @@ def clone_task(task_id: str, db: Session = Depends(get_db)):
         status=task.status,
     )
     db.add(cloned)
+    db.flush()
+    refresh_next_run(cloned)
     db.commit()
     db.refresh(cloned)
     return {"new_task_id": cloned.id}
@@ -273,6 +293,7 @@ def delete_task(task_id: str, db: Session = Depends(get_db)):
         return {"ok": False}
     db.delete(task)
     db.commit()
+    invalidate_task_matcher(task_id)
     return {"ok": True}
 
 
@@ -5,6 +5,7 @@ import zipfile
 import json
 from urllib.parse import urlparse
 from datetime import datetime, timedelta
+from uuid import uuid4
 from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import StreamingResponse
 import httpx
@@ -17,7 +18,11 @@ from app.schemas.video import VideoOut
 from app.schemas.subtitle import SubtitleOut
 from app.schemas.pagination import Page
 from app.core.config import settings
-from app.workers.tasks import extract_subtitle as celery_extract_subtitle
+from app.services.rule_engine import compile_rules
+from app.services import transcript_segments
+from app.workers.celery_app import PRIORITY_HIGH
+from app.workers.tasks import read_subtitle_batch, start_subtitle_batch
+from app.workers.tasks import resolve_native_subtitles as celery_resolve_native_subtitles
 
 router = APIRouter()
 
@@ -34,6 +39,8 @@ def list_videos(
     creator_group: str | None = None,
     days: int | None = None,
     tag: str | None = None,
+    rules_of_task: str | None = None,
+    rules: str | None = None,
     process_status: str | None = None,
     status: str | None = None,
     is_favorited: bool | None = None,
@@ -54,6 +61,8 @@ def list_videos(
     min_fav_fan_ratio: float | None = None,
     min_fans: int | None = None,
     fan_max: int | None = None,
+    exclude_words: str | None = None,
+    match_words: str | None = None,
     sort: str | None = None,
     order: str | None = None,
     page: int = Query(1, ge=1),
@@ -85,10 +94,7 @@ def list_videos(
         query = query.join(FollowedCreator, FollowedCreator.up_id == Video.up_id).where(
             lowered.like(f'%\"{creator_group.strip().lower()}\"%')
         )
-    if tag == "basic_hot":
-        query = query.where(Video.basic_hot == True)  # noqa: E712
-    if tag == "low_fan_hot":
-        query = query.where(Video.low_fan_hot == True)  # noqa: E712
+    query = _filter_hot(query, db, tag, rules_of_task, rules)
     status_param = status or process_status
     if status_param and status_param != "all":
         status_list = [s.strip() for s in status_param.split(",") if s.strip()]
@@ -215,6 +221,13 @@ def list_videos(
     else:
         query = query.order_by(Video.publish_time.desc())
 
+    exclude_filter = _title_words_clause(exclude_words)
+    if exclude_filter is not None:
+        query = query.where(~exclude_filter)
+    match_filter = _title_words_clause(match_words)
+    if match_filter is not None:
+        query = query.where(match_filter)
+
     total = db.execute(select(func.count()).select_from(query.subquery())).scalar()
     rows = (
         db.execute(query.offset((page - 1) * page_size).limit(page_size))
@@ -222,6 +235,15 @@ def list_videos(
         .all()
     )
 
+    hits_map = {}
+    if task_id and rows:
+        hit_rows = db.execute(
+            select(TaskVideo.bvid, TaskVideo.keyword_hits).where(
+                TaskVideo.task_id == task_id, TaskVideo.bvid.in_([v.bvid for v in rows])
+            )
+        ).all()
+        hits_map = {r.bvid: r.keyword_hits or [] for r in hit_rows}
+
     task_ids = set()
     for v in rows:
         for tid in v.source_task_ids or []:
@@ -237,7 +259,7 @@ def list_videos(
         covers = db.execute(select(CoverFavorite).where(CoverFavorite.bvid.in_(bvids))).scalars().all()
         cover_map = {c.bvid: c for c in covers}
 
-    items = [video_to_out(v, task_map, cover_map.get(v.bvid)) for v in rows]
+    items = [video_to_out(v, task_map, cover_map.get(v.bvid), hits_map.get(v.bvid)) for v in rows]
     return {"items": items, "page": page, "page_size": page_size, "total": total}
 
 
@@ -251,6 +273,8 @@ def export_csv(
     title: str | None = None,
     task_id: str | None = None,
     tag: str | None = None,
+    rules_of_task: str | None = None,
+    rules: str | None = None,
     process_status: str | None = None,
     labels: str | None = None,
     tags: str | None = None,
@@ -290,10 +314,7 @@ def export_csv(
             query = query.where(Video.title.ilike(f"%{keyword}%"))
     if task_id:
         query = query.join(TaskVideo).where(TaskVideo.task_id == task_id)
-    if tag == "basic_hot":
-        query = query.where(Video.basic_hot == True)  # noqa: E712
-    if tag == "low_fan_hot":
-        query = query.where(Video.low_fan_hot == True)  # noqa: E712
+    query = _filter_hot(query, db, tag, rules_of_task, rules)
     if process_status:
         query = query.where(Video.process_status == process_status)
     label_list: list[str] = []
@@ -548,13 +569,14 @@ def batch_extract_subtitles(payload: dict, db: Session = Depends(get_db)):
     videos = db.execute(select(Video).where(Video.bvid.in_(bvids))).scalars().all()
     existing = {v.bvid for v in videos}
     missing = [bvid for bvid in bvids if bvid not in existing]
+    subtitles = {s.bvid: s for s in db.execute(select(Subtitle).where(Subtitle.bvid.in_(bvids))).scalars()}
 
-    queued = 0
+    to_resolve: list[str] = []
     skipped = 0
-    for bvid in bvids:
+    for bvid in dict.fromkeys(bvids):
         if bvid not in existing:
             continue
-        subtitle = db.get(Subtitle, bvid)
+        subtitle = subtitles.get(bvid)
         if subtitle and subtitle.status == "done" and subtitle.text and not force:
             skipped += 1
             continue
@@ -566,11 +588,37 @@ def batch_extract_subtitles(payload: dict, db: Session = Depends(get_db)):
         subtitle.status = "extracting"
         subtitle.error = None
         db.add(subtitle)
-        db.commit()
-        celery_extract_subtitle.delay(bvid)
-        queued += 1
+        to_resolve.append(bvid)
+    db.commit()
+
+    # Phase 1 resolves platform subtitles in bulk; only misses reach the ASR queue.
+    batch_id = uuid4().hex
+    if to_resolve:
+        start_subtitle_batch(
+            batch_id,
+            {"total": len(bvids), "queued": len(to_resolve), "skipped": skipped, "missing": len(missing)},
+        )
+        size = max(1, int(settings.subtitle_native_batch_size or 100))
+        for start in range(0, len(to_resolve), size):
+            celery_resolve_native_subtitles.delay(to_resolve[start : start + size], batch_id)
+
+    return {
+        "ok": True,
+        "batch_id": batch_id if to_resolve else None,
+        "queued": len(to_resolve),
+        "skipped": skipped,
+        "missing": missing,
+        "total": len(bvids),
+        "phases": {"native": {"queued": len(to_resolve)}, "asr": {"queued": 0}},
+    }
 
-    return {"ok": True, "queued": queued, "skipped": skipped, "missing": missing, "total": len(bvids)}
+
+@router.get("/subtitle/extract/batch/{batch_id}")
+def batch_extract_subtitles_status(batch_id: str):
+    status = read_subtitle_batch(batch_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="batch not found")
+    return status
 
 
 @router.get("/cover/download/batch")
@@ -628,6 +676,74 @@ def batch_cover_download(bvids: str, db: Session = Depends(get_db)):
     )
 
 
+def _filter_hot(query, db: Session, tag: str | None, rules_of_task: str | None, rules: str | None):
+    """Restrict ``query`` to hot videos: under given rules in SQL, else by the stored flags."""
+    hot_rules = _resolve_hot_rules(db, rules_of_task, rules)
+    if hot_rules is None:
+        if tag == "basic_hot":
+            query = query.where(Video.basic_hot == True)  # noqa: E712
+        if tag == "low_fan_hot":
+            query = query.where(Video.low_fan_hot == True)  # noqa: E712
+        return query
+    compiled = compile_rules(hot_rules)
+    if tag in compiled:
+        return query.where(compiled[tag])
+    return query.where(or_(compiled["basic_hot"], compiled["low_fan_hot"]))
+
+
+def _title_words_clause(words: str | None):
+    """Case-insensitive "title contains any of the comma-separated ``words``"; ``None`` if empty."""
+    items = {w.strip().lower() for w in (words or "").split(",") if w.strip()}
+    if not items:
+        return None
+    escaped = [w.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") for w in sorted(items)]
+    return or_(*[Video.title.ilike(f"%{w}%", escape="\\") for w in escaped])
+
+
+_LOW_FAN_HOT_KEYS = ("fan_max", "views_min", "fav_rate", "coin_rate", "reply_rate", "fav_fan_ratio")
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _validate_hot_rules(rules: dict) -> None:
+    """Reject inline rules whose thresholds are not numbers (they would fail while compiling)."""
+    basic = rules.get("basic_hot")
+    if basic is not None:
+        thresholds = basic.get("thresholds", {}) if isinstance(basic, dict) else None
+        if not isinstance(thresholds, dict):
+            raise HTTPException(status_code=400, detail="invalid rules: basic_hot.thresholds")
+        for field, threshold in thresholds.items():
+            if not _is_number(threshold):
+                raise HTTPException(status_code=400, detail=f"invalid rules: basic_hot.thresholds.{field}")
+    low_fan = rules.get("low_fan_hot")
+    if low_fan is not None:
+        if not isinstance(low_fan, dict):
+            raise HTTPException(status_code=400, detail="invalid rules: low_fan_hot")
+        for key in _LOW_FAN_HOT_KEYS:
+            if key in low_fan and not _is_number(low_fan[key]):
+                raise HTTPException(status_code=400, detail=f"invalid rules: low_fan_hot.{key}")
+
+
+def _resolve_hot_rules(db: Session, rules_of_task: str | None, rules: str | None) -> dict | None:
+    if rules:
+        try:
+            parsed = json.loads(rules)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="invalid rules")
+        if not isinstance(parsed, dict):
+            raise HTTPException(status_code=400, detail="invalid rules")
+        _validate_hot_rules(parsed)
+        return parsed
+    if rules_of_task:
+        task = db.get(Task, rules_of_task)
+        if not task:
+            raise HTTPException(status_code=404, detail="Task not found")
+        return task.rules or {}
+    return None
+
+
 def _cover_headers() -> dict[str, str]:
     headers = {
         "User-Agent": settings.bili_user_agent,
@@ -646,6 +762,15 @@ def _normalize_cover_url(url: str | None) -> str:
     return url
 
 
+def _cover_thumb_url(url: str, width: int) -> str | None:
+    """Bilibili's image CDN resizes on request: ``{cover}@{width}w.webp``."""
+    parsed = urlparse(url)
+    host = (parsed.hostname or "").lower()
+    if not (host == "hdslb.com" or host.endswith(".hdslb.com")) or "@" in parsed.path or parsed.query:
+        return None
+    return f"{url}@{width}w.webp"
+
+
 def _infer_ext(url: str) -> str:
     path = urlparse(url).path
     ext = os.path.splitext(path)[1]
@@ -685,7 +810,11 @@ def get_video(bvid: str, db: Session = Depends(get_db)):
 
 @router.get("/{bvid}/cover")
 
-def view_cover(bvid: str, db: Session = Depends(get_db)):
+def view_cover(
+    bvid: str,
+    width: int | None = Query(None, ge=16, le=1920),
+    db: Session = Depends(get_db),
+):
     video = db.get(Video, bvid)
     if not video:
         raise HTTPException(status_code=404, detail="Video not found")
@@ -693,7 +822,12 @@ def view_cover(bvid: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="cover not found")
     url = _normalize_cover_url(video.cover_url)
     try:
-        res = httpx.get(url, timeout=10, headers=_cover_headers(), follow_redirects=True)
+        res = None
+        thumb_url = _cover_thumb_url(url, width) if width else None
+        if thumb_url:
+            res = httpx.get(thumb_url, timeout=10, headers=_cover_headers(), follow_redirects=True)
+        if res is None or res.status_code != 200:
+            res = httpx.get(url, timeout=10, headers=_cover_headers(), follow_redirects=True)
         if res.status_code != 200:
             raise HTTPException(status_code=502, detail="cover download failed")
         return StreamingResponse(
@@ -784,17 +918,47 @@ def extract_subtitle(bvid: str, db: Session = Depends(get_db), force: bool = Fal
     db.add(subtitle)
     db.commit()
 
-    job = celery_extract_subtitle.delay(bvid)
+    job = celery_resolve_native_subtitles.apply_async(
+        args=[[bvid]], kwargs={"priority": PRIORITY_HIGH}, priority=PRIORITY_HIGH
+    )
     return {"status": "extracting", "queued": True, "task_id": job.id}
 
 
 @router.get("/{bvid}/subtitle", response_model=SubtitleOut)
 
-def get_subtitle(bvid: str, db: Session = Depends(get_db)):
-    subtitle = db.get(Subtitle, bvid)
-    if not subtitle:
+def get_subtitle(
+    bvid: str,
+    db: Session = Depends(get_db),
+    from_ms: int | None = Query(None, ge=0),
+    to_ms: int | None = Query(None, ge=0),
+):
+    """With ``from_ms`` / ``to_ms`` only the segments in that window (and their text) are returned."""
+    if from_ms is not None and to_ms is not None and to_ms < from_ms:
+        raise HTTPException(status_code=400, detail="to_ms must be >= from_ms")
+    row = db.execute(
+        select(
+            Subtitle.bvid,
+            Subtitle.status,
+            Subtitle.format,
+            Subtitle.updated_at,
+            Subtitle.error,
+            Subtitle.segments,
+        ).where(Subtitle.bvid == bvid)
+    ).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Subtitle not found")
-    return SubtitleOut.model_validate(subtitle)
+    data = dict(row._mapping)
+    blob = data.pop("segments")
+    if blob:
+        data.update(transcript_segments.info(blob))
+    windowed = from_ms is not None or to_ms is not None
+    if windowed and blob:
+        data["segments"] = transcript_segments.window(blob, from_ms, to_ms)
+        data["text"] = transcript_segments.to_text(data["segments"])
+    else:
+        # Full text; also the fallback for transcripts stored before segment times were kept.
+        data["text"] = db.execute(select(Subtitle.text).where(Subtitle.bvid == bvid)).scalar()
+    return SubtitleOut(**data)
 
 
 @router.get("/{bvid}/cover/download")
@@ -823,6 +987,7 @@ def video_to_out(
     video: Video,
     task_map: dict[str, str] | None = None,
     cover: CoverFavorite | None = None,
+    keyword_hits: list[str] | None = None,
 ) -> VideoOut:
     task_map = task_map or {}
     stats = {
@@ -865,4 +1030,5 @@ def video_to_out(
         source_task_names=[task_map.get(tid, "") for tid in (video.source_task_ids or []) if task_map.get(tid)],
         process_status=video.process_status,
         note=video.note,
+        keyword_hits=keyword_hits or [],
     )
@@ -2,6 +2,12 @@ from datetime import datetime
 from pydantic import BaseModel, ConfigDict
 
 
+class SubtitleSegmentOut(BaseModel):
+    start_ms: int
+    end_ms: int
+    text: str
+
+
 class SubtitleOut(BaseModel):
     bvid: str
     status: str
@@ -9,5 +15,8 @@ class SubtitleOut(BaseModel):
     format: str
     updated_at: datetime
     error: str | None
+    segment_count: int = 0
+    duration_ms: int | None = None
+    segments: list[SubtitleSegmentOut] | None = None
 
     model_config = ConfigDict(from_attributes=True)
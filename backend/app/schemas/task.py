@@ -34,6 +34,7 @@ class TaskOut(TaskBase):
     id: str
     status: str
     consecutive_failures: int
+    next_run_at: datetime | None = None
     created_at: datetime
     updated_at: datetime
 
@@ -27,5 +27,6 @@ class VideoOut(BaseModel):
     source_task_names: list[str]
     process_status: str
     note: str | None
+    keyword_hits: list[str] = []
 
     model_config = ConfigDict(from_attributes=True)
@@ -1,31 +1,55 @@
 from __future__ import annotations
 
-import glob
+import hashlib
+import io
+import json
 import os
 import shutil
 import subprocess
 import tempfile
+import threading
 import time
 import uuid
+import wave
 from base64 import b64encode
-from typing import Iterable
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterable, Iterator
 from urllib.parse import urlparse
 
 import httpx
+import redis
+from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.services.audio_vad import TimeMap, to_source_ms, trim_silence, vad_available
 
 _model_cache = None
 _baidu_token_cache = {"token": None, "expires_at": 0.0}
-
-
-def _iter_text(segments: Iterable) -> str:
-    parts = []
-    for seg in segments:
-        text = getattr(seg, "text", None)
+# Every provider is fed 16 kHz mono signed 16-bit PCM.
+PCM_RATE = 16000
+PCM_WIDTH = 2
+# server_api err_no worth retrying: backend busy, QPS exceeded, recognition error.
+_BAIDU_RETRY_ERRORS = {"3303", "3304", "3307"}
+_BAIDU_BACKOFF_BASE = 1.0
+_BAIDU_BACKOFF_MAX = 10.0
+_SPOOL_CHUNK_SECONDS = 60
+_VAD_WINDOW_SECONDS = 30
+
+
+def whisper_segments(parts: Iterable, offset_ms: int = 0) -> list[dict]:
+    """faster-whisper segments as ``{start_ms, end_ms, text}``, shifted by the window offset."""
+    segments = []
+    for part in parts:
+        text = (getattr(part, "text", None) or "").strip()
         if text:
-            parts.append(text.strip())
-    return "\n".join([p for p in parts if p])
+            segments.append(
+                {
+                    "start_ms": offset_ms + int(part.start * 1000),
+                    "end_ms": offset_ms + int(part.end * 1000),
+                    "text": text,
+                }
+            )
+    return segments
 
 
 def _get_model():
@@ -73,8 +97,18 @@ def _guess_suffix(url: str) -> str:
     return ".m4a"
 
 
+def _is_local(audio_url: str) -> bool:
+    """A path (e.g. a source-cache entry) rather than a URL."""
+    return not audio_url.startswith(("http://", "https://"))
+
+
 def _download_audio_bytes(audio_url: str) -> bytes:
     max_bytes = int(settings.asr_max_audio_mb or 100) * 1024 * 1024
+    if _is_local(audio_url):
+        if os.path.getsize(audio_url) > max_bytes:
+            raise RuntimeError("audio too large")
+        with open(audio_url, "rb") as fp:
+            return fp.read()
     data = bytearray()
     with httpx.stream("GET", audio_url, headers=_bili_headers(), timeout=30) as res:
         res.raise_for_status()
@@ -85,97 +119,252 @@ def _download_audio_bytes(audio_url: str) -> bytes:
     return bytes(data)
 
 
-def _maybe_transcode_to_wav(audio_bytes: bytes, suffix: str) -> bytes:
-    if not settings.asr_transcode:
-        return audio_bytes
-    ffmpeg_bin = _get_ffmpeg_bin()
-    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as src:
-        src.write(audio_bytes)
-        src.flush()
-        src_path = src.name
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as dst:
-        dst_path = dst.name
+def _feed_ffmpeg(audio_url: str, stdin, errors: list[BaseException]) -> None:
+    max_bytes = int(settings.asr_max_audio_mb or 100) * 1024 * 1024
+    total = 0
     try:
-        subprocess.run(
-            [ffmpeg_bin, "-y", "-i", src_path, "-ac", "1", "-ar", "16000", dst_path],
-            check=True,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-        )
-        with open(dst_path, "rb") as fp:
-            return fp.read()
+        with httpx.stream("GET", audio_url, headers=_bili_headers(), timeout=30) as res:
+            res.raise_for_status()
+            for chunk in res.iter_bytes():
+                total += len(chunk)
+                if total > max_bytes:
+                    raise RuntimeError("audio too large")
+                stdin.write(chunk)
+    except (BrokenPipeError, ValueError):
+        # ffmpeg exited or the consumer stopped reading; the reader side reports why.
+        pass
+    except Exception as exc:  # noqa: BLE001
+        errors.append(exc)
     finally:
-        for path in (src_path, dst_path):
-            try:
-                os.remove(path)
-            except OSError:
-                pass
+        try:
+            stdin.close()
+        except OSError:
+            pass
+
+
+class _FfmpegError(RuntimeError):
+    def __init__(self, detail: str, produced: bool):
+        super().__init__(f"ffmpeg failed: {detail}")
+        self.produced = produced
+
+
+def _ffmpeg_headers() -> str:
+    return "".join(f"{key}: {value}\r\n" for key, value in _bili_headers().items())
 
 
-def _split_wav_bytes(wav_bytes: bytes, segment_seconds: int) -> list[bytes]:
-    if segment_seconds <= 0:
-        return [wav_bytes]
+def _ffmpeg_pcm(audio_url: str, segment_bytes: int, from_url: bool) -> Iterator[bytes]:
     ffmpeg_bin = _get_ffmpeg_bin()
-    with tempfile.TemporaryDirectory() as tmpdir:
-        src_path = os.path.join(tmpdir, "input.wav")
-        with open(src_path, "wb") as fp:
-            fp.write(wav_bytes)
-        pattern = os.path.join(tmpdir, "seg_%03d.wav")
-        subprocess.run(
+    if from_url and _is_local(audio_url):
+        source = ["-i", audio_url]
+    elif from_url:
+        source = ["-headers", _ffmpeg_headers(), "-i", audio_url]
+    else:
+        source = ["-i", "pipe:0"]
+    with tempfile.TemporaryFile() as stderr:
+        proc = subprocess.Popen(
             [
                 ffmpeg_bin,
-                "-y",
-                "-i",
-                src_path,
-                "-f",
-                "segment",
-                "-segment_time",
-                str(segment_seconds),
-                "-reset_timestamps",
-                "1",
+                "-hide_banner",
+                "-loglevel",
+                "error",
+                *source,
+                "-vn",
                 "-ac",
                 "1",
                 "-ar",
-                "16000",
+                str(PCM_RATE),
+                "-f",
+                "s16le",
                 "-c:a",
                 "pcm_s16le",
-                pattern,
+                "pipe:1",
             ],
-            check=True,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
+            stdin=subprocess.DEVNULL if from_url else subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=stderr,
         )
-        segments = sorted(glob.glob(os.path.join(tmpdir, "seg_*.wav")))
-        if not segments:
-            return [wav_bytes]
-        out = []
-        for path in segments:
-            with open(path, "rb") as fp:
-                out.append(fp.read())
-        return out
-
-
-def _transcribe_with_faster_whisper(audio_url: str) -> str | None:
+        errors: list[BaseException] = []
+        feeder = None
+        if not from_url:
+            feeder = threading.Thread(target=_feed_ffmpeg, args=(audio_url, proc.stdin, errors), daemon=True)
+            feeder.start()
+        produced = False
+        try:
+            while True:
+                chunk = proc.stdout.read(segment_bytes) if segment_bytes else proc.stdout.read()
+                if errors:
+                    raise errors[0]
+                if not chunk:
+                    break
+                produced = True
+                yield chunk
+                if not segment_bytes:
+                    break
+            if feeder is not None:
+                feeder.join()
+            if errors:
+                raise errors[0]
+            returncode = proc.wait()
+            if returncode != 0 or not produced:
+                stderr.seek(0)
+                detail = stderr.read().decode("utf-8", "replace").strip().splitlines()
+                raise _FfmpegError(detail[-1] if detail else f"exit code {returncode}", produced)
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+            proc.stdout.close()
+            if feeder is not None:
+                feeder.join(timeout=5)
+
+
+def stream_pcm(audio_url: str, segment_seconds: int) -> Iterator[bytes]:
+    """Yield 16 kHz mono s16le PCM of ``audio_url`` in ``segment_seconds`` chunks.
+
+    The download is piped through ffmpeg (httpx -> stdin -> stdout) and cut in-process, so
+    only one segment is held in memory and the first one is ready before the download
+    finishes. ``segment_seconds <= 0`` yields the whole track as a single chunk.
+    Containers that need seeking (MP4 with the index at the end) cannot be decoded from
+    a pipe; those are retried with ffmpeg reading the URL itself using HTTP range requests.
+    A local path (a source-cache entry) is handed to ffmpeg directly.
+    """
+    segment_bytes = max(0, int(segment_seconds or 0)) * PCM_RATE * PCM_WIDTH
+    if _is_local(audio_url):
+        yield from _ffmpeg_pcm(audio_url, segment_bytes, from_url=True)
+        return
+    try:
+        yield from _ffmpeg_pcm(audio_url, segment_bytes, from_url=False)
+    except _FfmpegError as exc:
+        if exc.produced:
+            raise
+        yield from _ffmpeg_pcm(audio_url, segment_bytes, from_url=True)
+
+
+class PcmSource:
+    """Decoded PCM of one audio URL, read live from the ffmpeg pipe or from a spooled file.
+
+    A live read hashes the PCM as it goes: once a pass reaches the end, ``audio_hash`` and
+    ``duration_ms`` identify the audio for the transcript cache without a separate decode.
+    """
+
+    def __init__(self, audio_url: str, spool_path: str | None = None):
+        self.audio_url = audio_url
+        self.spool_path = spool_path
+        self.audio_hash: str | None = None
+        self.duration_ms = 0
+
+    def chunks(self, segment_seconds: int) -> Iterator[bytes]:
+        if self.spool_path is None:
+            digest = hashlib.sha256()
+            size = 0
+            for chunk in stream_pcm(self.audio_url, segment_seconds):
+                digest.update(chunk)
+                size += len(chunk)
+                yield chunk
+            self.audio_hash = digest.hexdigest()
+            self.duration_ms = size * 1000 // (PCM_RATE * PCM_WIDTH)
+            return
+        segment_bytes = max(0, int(segment_seconds or 0)) * PCM_RATE * PCM_WIDTH
+        with open(self.spool_path, "rb") as fp:
+            while True:
+                chunk = fp.read(segment_bytes) if segment_bytes else fp.read()
+                if not chunk:
+                    break
+                yield chunk
+                if not segment_bytes:
+                    break
+
+
+def _spool_pcm(audio_url: str, fp) -> tuple[str, int]:
+    """Decode ``audio_url`` into ``fp``; returns ``(sha256 of the PCM, duration_ms)``."""
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in stream_pcm(audio_url, _SPOOL_CHUNK_SECONDS):
+        digest.update(chunk)
+        fp.write(chunk)
+        size += len(chunk)
+    fp.flush()
+    return digest.hexdigest(), size * 1000 // (PCM_RATE * PCM_WIDTH)
+
+
+def _pcm_to_wav(pcm: bytes) -> bytes:
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as fp:
+        fp.setnchannels(1)
+        fp.setsampwidth(PCM_WIDTH)
+        fp.setframerate(PCM_RATE)
+        fp.writeframes(pcm)
+    return buf.getvalue()
+
+
+def _encode_opus(pcm: bytes) -> bytes:
+    proc = subprocess.run(
+        [
+            _get_ffmpeg_bin(),
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-f",
+            "s16le",
+            "-ar",
+            str(PCM_RATE),
+            "-ac",
+            "1",
+            "-i",
+            "pipe:0",
+            "-c:a",
+            "libopus",
+            "-b:a",
+            f"{max(6, int(settings.asr_upload_opus_kbps or 24))}k",
+            "-application",
+            "voip",
+            "-f",
+            "ogg",
+            "pipe:1",
+        ],
+        input=pcm,
+        capture_output=True,
+        check=True,
+    )
+    return proc.stdout
+
+
+def _load_upload_audio(source: PcmSource) -> tuple[bytes, str, TimeMap | None]:
+    """Whole-file audio for providers that take one payload.
+
+    Returns ``(bytes, suffix, time_map)``. With ``asr_vad_enabled`` non-speech is cut out
+    first and ``time_map`` maps provider timestamps back to the video; with
+    ``asr_upload_codec=opus`` the speech is sent as low-bitrate Ogg/Opus instead of WAV.
+    """
+    if not settings.asr_transcode:
+        return _download_audio_bytes(source.audio_url), _guess_suffix(source.audio_url), None
+    time_map = None
+    pcm = b""
+    if settings.asr_vad_enabled and vad_available():
+        pcm, time_map = trim_silence(source.chunks(_VAD_WINDOW_SECONDS))
+    if not time_map:
+        # VAD off or found no speech: let the provider judge the original.
+        pcm, time_map = b"".join(source.chunks(0)), None
+    if settings.asr_upload_codec == "opus":
+        return _encode_opus(pcm), ".ogg", time_map
+    return _pcm_to_wav(pcm), ".wav", time_map
+
+
+def _transcribe_with_faster_whisper(source: PcmSource) -> list[dict] | None:
     model = _get_model()
     if model is None:
         return None
-    with tempfile.NamedTemporaryFile(delete=False, suffix=_guess_suffix(audio_url)) as fp:
-        tmp_path = fp.name
-        with httpx.stream("GET", audio_url, headers=_bili_headers(), timeout=30) as res:
-            res.raise_for_status()
-            for chunk in res.iter_bytes():
-                fp.write(chunk)
+    import numpy as np
 
-    try:
-        language = settings.asr_language or None
-        segments, _info = model.transcribe(tmp_path, language=language)
-        text = _iter_text(segments)
-        return text.strip() if text else None
-    finally:
-        try:
-            os.remove(tmp_path)
-        except OSError:
-            pass
+    language = settings.asr_language or None
+    segments = []
+    offset_ms = 0
+    for pcm in source.chunks(int(settings.asr_stream_segment_seconds or 0)):
+        audio = np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+        parts, _info = model.transcribe(audio, language=language)
+        segments.extend(whisper_segments(parts, offset_ms))
+        offset_ms += len(audio) * 1000 // PCM_RATE
+    return segments
 
 
 def _extract_text_from_result(result) -> str | None:
@@ -196,6 +385,31 @@ def _extract_text_from_result(result) -> str | None:
     return None
 
 
+def _segments_from_result(result, time_map: TimeMap | None = None) -> list[dict]:
+    """Doubao sentence ``utterances`` mapped back to the video timeline; bare text is one untimed segment."""
+    item = result[0] if isinstance(result, list) and result and isinstance(result[0], dict) else result
+    utterances = item.get("utterances") if isinstance(item, dict) else None
+    segments = []
+    for utt in utterances if isinstance(utterances, list) else []:
+        text = str(utt.get("text") or "").strip() if isinstance(utt, dict) else ""
+        if not text:
+            continue
+        start = int(utt.get("start_time") or 0)
+        end = int(utt.get("end_time") or 0)
+        segments.append(
+            {
+                "start_ms": to_source_ms(time_map, start),
+                # An end on a cut boundary belongs to the range before it.
+                "end_ms": to_source_ms(time_map, end - 1) + 1 if end > 0 else 0,
+                "text": text,
+            }
+        )
+    if segments:
+        return segments
+    text = _extract_text_from_result(result)
+    return [{"start_ms": 0, "end_ms": 0, "text": text}] if text else []
+
+
 def _doubao_headers(request_id: str) -> dict[str, str]:
     return {
         "X-Api-App-Key": settings.doubao_app_key or "",
@@ -232,11 +446,10 @@ def _baidu_get_access_token() -> str:
     return token
 
 
-def _transcribe_with_doubao_flash(audio_url: str) -> str | None:
+def _transcribe_with_doubao_flash(source: PcmSource) -> list[dict] | None:
     if not settings.doubao_app_key or not settings.doubao_access_key:
         return None
-    audio_bytes = _download_audio_bytes(audio_url)
-    audio_bytes = _maybe_transcode_to_wav(audio_bytes, _guess_suffix(audio_url))
+    audio_bytes, _suffix, time_map = _load_upload_audio(source)
     audio_b64 = b64encode(audio_bytes).decode("utf-8")
 
     request_id = str(uuid.uuid4())
@@ -244,7 +457,7 @@ def _transcribe_with_doubao_flash(audio_url: str) -> str | None:
     payload = {
         "user": {"uid": settings.doubao_app_key},
         "audio": {"data": audio_b64},
-        "request": {"model_name": "bigmodel"},
+        "request": {"model_name": "bigmodel", "show_utterances": True},
     }
     res = httpx.post(settings.doubao_endpoint, headers=headers, json=payload, timeout=60)
     res.raise_for_status()
@@ -254,31 +467,49 @@ def _transcribe_with_doubao_flash(audio_url: str) -> str | None:
         raise RuntimeError(f"doubao api error: {api_code} {api_msg}")
     data = res.json()
     result = data.get("result") if isinstance(data, dict) else None
-    return _extract_text_from_result(result)
+    return _segments_from_result(result, time_map)
+
+
+class PendingTranscript:
+    """The provider accepted the audio asynchronously; ``poll_transcript`` resolves it later."""
+
+    def __init__(self, provider: str, model: str, task_id: str):
+        self.provider = provider
+        self.model = model
+        self.task_id = task_id
+        self.audio_hash: str | None = None
+        self.duration_ms = 0
+        self.time_map: TimeMap | None = None
+
+    def to_job(self) -> dict:
+        return {
+            "provider": self.provider,
+            "model": self.model,
+            "task_id": self.task_id,
+            "audio_hash": self.audio_hash,
+            "duration_ms": self.duration_ms,
+            "time_map": self.time_map,
+        }
 
 
-def _transcribe_with_doubao_standard(audio_url: str) -> str | None:
+def _transcribe_with_doubao_standard(source: PcmSource) -> PendingTranscript:
     from app.services.tos_service import upload_bytes, guess_content_type
 
-    audio_bytes = _download_audio_bytes(audio_url)
-    suffix = _guess_suffix(audio_url)
-    if settings.asr_transcode:
-        audio_bytes = _maybe_transcode_to_wav(audio_bytes, suffix)
-        upload_suffix = ".wav"
-        audio_format = "wav"
-    else:
-        upload_suffix = suffix
-        audio_format = suffix.lstrip(".") or "wav"
+    audio_bytes, upload_suffix, time_map = _load_upload_audio(source)
+    audio_format = upload_suffix.lstrip(".") or "wav"
 
     content_type = guess_content_type(upload_suffix)
     public_url = upload_bytes(audio_bytes, upload_suffix, content_type=content_type)
 
+    audio = {"url": public_url, "format": audio_format}
+    if audio_format == "ogg":
+        audio["codec"] = "opus"
     request_id = str(uuid.uuid4())
     headers = _doubao_headers(request_id)
     payload = {
         "user": {"uid": settings.doubao_app_key},
-        "audio": {"url": public_url, "format": audio_format},
-        "request": {"model_name": "bigmodel"},
+        "audio": audio,
+        "request": {"model_name": "bigmodel", "show_utterances": True},
     }
     res = httpx.post(settings.doubao_submit_endpoint, headers=headers, json=payload, timeout=60)
     res.raise_for_status()
@@ -287,84 +518,283 @@ def _transcribe_with_doubao_standard(audio_url: str) -> str | None:
         api_msg = res.headers.get("X-Api-Message", "")
         raise RuntimeError(f"doubao api error: {api_code} {api_msg}")
     task_id = res.headers.get("X-Api-Request-Id") or request_id
-    query_headers = _doubao_headers(task_id)
-
-    for _ in range(30):
-        query_res = httpx.post(settings.doubao_query_endpoint, headers=query_headers, json={}, timeout=30)
-        query_res.raise_for_status()
-        query_code = query_res.headers.get("X-Api-Status-Code")
-        data = query_res.json() if query_res.content else {}
-        result = data.get("result") if isinstance(data, dict) else None
-        text = _extract_text_from_result(result)
-        if query_code == "20000000" and text:
-            return text
-        if query_code and query_code not in {"20000000", "20000001", "20000002"}:
-            query_msg = query_res.headers.get("X-Api-Message", "")
-            raise RuntimeError(f"doubao api error: {query_code} {query_msg}")
-        # not ready yet
-        import time
-
-        time.sleep(2)
-    raise RuntimeError("doubao api timeout")
-
-
-def _transcribe_with_baidu(audio_url: str) -> str | None:
-    token = _baidu_get_access_token()
-    audio_bytes = _download_audio_bytes(audio_url)
-    audio_bytes = _maybe_transcode_to_wav(audio_bytes, _guess_suffix(audio_url))
-    segments = _split_wav_bytes(audio_bytes, int(settings.baidu_segment_seconds or 55))
-    results = []
-    last_err = None
-    for chunk in segments:
-        payload = {
-            "format": "wav",
-            "rate": 16000,
-            "channel": 1,
-            "token": token,
-            "cuid": settings.baidu_cuid or "bili-admin",
-            "len": len(chunk),
-            "speech": b64encode(chunk).decode("utf-8"),
-            "dev_pid": int(settings.baidu_dev_pid or 1537),
-        }
-        data = {}
-        last_exc = None
-        for attempt in range(3):
-            try:
-                res = httpx.post(settings.baidu_asr_endpoint, json=payload, timeout=120)
-                res.raise_for_status()
-                data = res.json() if res.content else {}
-                last_exc = None
-                break
-            except httpx.TimeoutException as exc:
-                last_exc = exc
-                time.sleep(1 + attempt)
-        if last_exc is not None:
-            raise RuntimeError("baidu asr timeout")
+    pending = PendingTranscript("doubao", settings.doubao_resource_id or "", task_id)
+    pending.time_map = time_map
+    return pending
+
+
+def _query_doubao_standard(task_id: str, time_map: TimeMap | None = None) -> list[dict] | None:
+    """One status query; the segments once finished, ``None`` while queued/processing.
+
+    A finished job without utterances raises, so the poller fails it at once.
+    """
+    query_res = httpx.post(settings.doubao_query_endpoint, headers=_doubao_headers(task_id), json={}, timeout=30)
+    query_res.raise_for_status()
+    query_code = query_res.headers.get("X-Api-Status-Code")
+    data = query_res.json() if query_res.content else {}
+    result = data.get("result") if isinstance(data, dict) else None
+    segments = _segments_from_result(result, time_map)
+    if query_code == "20000000":
+        if not segments:
+            # Finished with nothing recognised: terminal, not a job still running.
+            raise RuntimeError("doubao asr empty result: no speech")
+        return segments
+    if query_code and query_code not in {"20000000", "20000001", "20000002"}:
+        query_msg = query_res.headers.get("X-Api-Message", "")
+        raise RuntimeError(f"doubao api error: {query_code} {query_msg}")
+    return None
+
+
+def poll_transcript(job: dict) -> list[dict] | None:
+    """Check a job stored from ``PendingTranscript.to_job``; network only, safe in threads."""
+    if job.get("provider") == "doubao":
+        return _query_doubao_standard(job["task_id"], job.get("time_map"))
+    raise RuntimeError(f"unsupported async asr provider: {job.get('provider')}")
+
+
+class _RateLimiter:
+    """Spaces calls at least ``1 / qps`` seconds apart across threads (0 disables)."""
+
+    def __init__(self, qps: float):
+        self._interval = 1.0 / qps if qps > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+
+    def wait(self) -> None:
+        if not self._interval:
+            return
+        with self._lock:
+            slot = max(time.monotonic(), self._next_at)
+            self._next_at = slot + self._interval
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+_baidu_limiter_cache: dict = {"qps": None, "limiter": None}
+_baidu_limiter_lock = threading.Lock()
+
+
+def _baidu_limiter() -> _RateLimiter:
+    """Process-wide limiter for ``baidu_qps``, shared by concurrent transcriptions in a worker.
+
+    The QPS quota is per API key, not per call, so every ``_baidu_transcribe_segments`` call
+    must draw from the same limiter; it is rebuilt only when the configured QPS changes.
+    """
+    qps = float(settings.baidu_qps or 0)
+    with _baidu_limiter_lock:
+        if _baidu_limiter_cache["limiter"] is None or _baidu_limiter_cache["qps"] != qps:
+            _baidu_limiter_cache["qps"] = qps
+            _baidu_limiter_cache["limiter"] = _RateLimiter(qps)
+        return _baidu_limiter_cache["limiter"]
+
+
+class _BaiduSegmentError(RuntimeError):
+    pass
+
+
+def _baidu_recognize_segment(chunk: bytes, token: str, limiter: _RateLimiter) -> tuple[str | None, str | None]:
+    """Recognize one PCM segment; returns ``(text, empty_reason)`` or raises after retries."""
+    payload = {
+        "format": "pcm",
+        "rate": PCM_RATE,
+        "channel": 1,
+        "token": token,
+        "cuid": settings.baidu_cuid or "bili-admin",
+        "len": len(chunk),
+        "speech": b64encode(chunk).decode("utf-8"),
+        "dev_pid": int(settings.baidu_dev_pid or 1537),
+    }
+    attempts = max(1, int(settings.baidu_retry_times or 0) + 1)
+    timeout = float(settings.baidu_timeout_seconds or 120)
+    last_err = "no attempt"
+    for attempt in range(attempts):
+        if attempt:
+            time.sleep(min(_BAIDU_BACKOFF_MAX, _BAIDU_BACKOFF_BASE * 2 ** (attempt - 1)))
+        limiter.wait()
+        try:
+            res = httpx.post(settings.baidu_asr_endpoint, json=payload, timeout=timeout)
+            if res.status_code >= 500 or res.status_code == 429:
+                last_err = f"http {res.status_code}"
+                continue
+            res.raise_for_status()
+            data = res.json() if res.content else {}
+        except (httpx.TimeoutException, httpx.TransportError) as exc:
+            last_err = f"{type(exc).__name__}: {exc}".rstrip(": ")
+            continue
         err_no = data.get("err_no")
-        if err_no not in (0, "0", None):
-            err_no = data.get("err_no")
-            err_msg = data.get("err_msg", "")
-            raise RuntimeError(f"baidu asr error: {err_no} {err_msg}".strip())
-        text = _extract_text_from_result(data.get("result"))
-        if text:
-            results.append(text)
-        else:
-            last_err = data.get("err_msg") or f"empty result (err_no={err_no})"
-    if results:
-        return "\n".join(results).strip()
-    if last_err:
-        raise RuntimeError(f"baidu asr empty result: {last_err}")
+        if err_no in (0, "0", None):
+            text = _extract_text_from_result(data.get("result"))
+            if text:
+                return text, None
+            return None, data.get("err_msg") or f"empty result (err_no={err_no})"
+        err_msg = data.get("err_msg", "")
+        last_err = f"{err_no} {err_msg}".strip()
+        if str(err_no) not in _BAIDU_RETRY_ERRORS:
+            raise _BaiduSegmentError(f"baidu asr error: {last_err}")
+    raise _BaiduSegmentError(f"baidu asr error after {attempts} attempts: {last_err}")
+
+
+def _baidu_transcribe_segments(chunks: Iterable[bytes], token: str) -> list[dict]:
+    """Recognize segments concurrently (``baidu_concurrency`` / ``baidu_qps``), in order.
+
+    Each PCM segment becomes one transcript segment spanning its position in the audio.
+    At most ``2 * baidu_concurrency`` segments are buffered, so memory stays bounded while the
+    producer (the ffmpeg pipe) runs ahead. With ``baidu_allow_partial`` failed segments are
+    dropped from the text as long as at least one segment was recognized.
+    """
+    workers = max(1, int(settings.baidu_concurrency or 1))
+    limiter = _baidu_limiter()
+    texts: dict[int, str] = {}
+    spans: dict[int, tuple[int, int]] = {}
+    failures: dict[int, str] = {}
+    in_flight: dict = {}
+    empty_reason = None
+
+    def collect(done) -> None:
+        nonlocal empty_reason
+        for future in done:
+            idx = in_flight.pop(future)
+            try:
+                text, reason = future.result()
+            except Exception as exc:  # noqa: BLE001
+                failures[idx] = str(exc)
+                continue
+            if text:
+                texts[idx] = text
+            else:
+                empty_reason = reason
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        offset_ms = 0
+        for idx, chunk in enumerate(chunks):
+            length_ms = len(chunk) // PCM_WIDTH * 1000 // PCM_RATE
+            spans[idx] = (offset_ms, offset_ms + length_ms)
+            offset_ms += length_ms
+            in_flight[pool.submit(_baidu_recognize_segment, chunk, token, limiter)] = idx
+            if len(in_flight) >= workers * 2:
+                done, _pending = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(done)
+        done, _pending = wait(in_flight)
+        collect(done)
+
+    if failures and (not texts or not settings.baidu_allow_partial):
+        first = failures[min(failures)]
+        raise RuntimeError(f"{first} ({len(failures)} segment(s) failed)")
+    if texts:
+        return [
+            {"start_ms": spans[idx][0], "end_ms": spans[idx][1], "text": texts[idx].strip()}
+            for idx in sorted(texts)
+        ]
+    if empty_reason:
+        raise RuntimeError(f"baidu asr empty result: {empty_reason}")
+    return []
+
+
+def _transcribe_with_baidu(source: PcmSource) -> list[dict]:
+    token = _baidu_get_access_token()
+    # On a live source segments are posted as ffmpeg produces them, overlapping the download.
+    return _baidu_transcribe_segments(source.chunks(int(settings.baidu_segment_seconds or 55)), token)
+
+
+def _transcribe_with_whisper_service(source: PcmSource) -> dict:
+    """Submit to the standalone whisper service (``app.workers.whisper_server``) and wait.
+
+    When the PCM is already spooled its path goes along as ``pcm_path``; a service that can
+    see the file (same host, or ``ASR_SPOOL_DIR`` on a shared volume) reads it instead of
+    downloading and decoding ``audio_url`` a second time.
+    """
+    r = redis.Redis.from_url(settings.redis_url)
+    job_id = str(uuid.uuid4())
+    reply_key = f"{settings.whisper_queue_key}:reply:{job_id}"
+    job = {
+        "id": job_id,
+        "audio_url": source.audio_url,
+        "pcm_path": source.spool_path,
+        "language": settings.asr_language or None,
+        "reply_key": reply_key,
+        "submitted_at": time.time(),
+    }
+    r.rpush(settings.whisper_queue_key, json.dumps(job))
+    item = r.blpop(reply_key, timeout=int(settings.whisper_job_timeout_seconds or 0))
+    if not item:
+        raise RuntimeError("whisper service timeout")
+    reply = json.loads(item[1])
+    if not reply.get("ok"):
+        raise RuntimeError(f"whisper service error: {reply.get('error')}")
+    return reply
+
+
+def _provider_key() -> tuple[str, str] | None:
+    """``(provider, model)`` identifying whose output a cached transcript is; ``None`` if disabled."""
+    provider = settings.asr_provider
+    if provider == "faster_whisper":
+        return provider, settings.asr_model or "base"
+    if provider == "doubao":
+        return provider, settings.doubao_resource_id or ""
+    if provider == "baidu":
+        return provider, str(settings.baidu_dev_pid or 1537)
     return None
 
 
-def transcribe_audio_url(audio_url: str) -> str | None:
+def _transcribe_source(source: PcmSource) -> list[dict] | PendingTranscript | None:
     if settings.asr_provider == "faster_whisper":
-        return _transcribe_with_faster_whisper(audio_url)
+        if settings.whisper_service_enabled:
+            return _transcribe_with_whisper_service(source).get("segments") or None
+        return _transcribe_with_faster_whisper(source)
     if settings.asr_provider == "doubao":
         resource = settings.doubao_resource_id or ""
         if resource.endswith("_turbo"):
-            return _transcribe_with_doubao_flash(audio_url)
-        return _transcribe_with_doubao_standard(audio_url)
+            return _transcribe_with_doubao_flash(source)
+        return _transcribe_with_doubao_standard(source)
     if settings.asr_provider == "baidu":
-        return _transcribe_with_baidu(audio_url)
+        return _transcribe_with_baidu(source)
     return None
+
+
+def transcribe_audio_url(audio_url: str, db: Session | None = None) -> list[dict] | PendingTranscript | None:
+    """Transcribe with the configured provider into ``{start_ms, end_ms, text}`` segments.
+
+    Asynchronous providers (Doubao standard) return a ``PendingTranscript`` right after
+    submitting; the caller stores it and ``poll_transcript`` finishes the job. With a session
+    and ``asr_cache_enabled`` a local file (a source-cache entry) is first decoded to a temp
+    file while hashing the PCM, and a transcript already stored for that hash and
+    provider/model is returned without calling the provider. A remote URL is not decoded
+    ahead: it streams straight to the provider, hashed on the way, and the result is stored
+    under that hash for later lookups.
+    """
+    key = _provider_key()
+    if key is None:
+        return None
+    if db is None or not settings.asr_cache_enabled:
+        return _transcribe_source(PcmSource(audio_url))
+
+    from app.services import transcript_cache
+
+    provider, model = key
+    if _is_local(audio_url):
+        with tempfile.NamedTemporaryFile(suffix=".pcm", dir=settings.asr_spool_dir or None) as spool:
+            audio_hash, duration_ms = _spool_pcm(audio_url, spool)
+            cached = transcript_cache.lookup(db, audio_hash, provider, model)
+            if cached is not None:
+                db.commit()
+                return transcript_cache.segments_of(cached)
+            segments = _transcribe_source(PcmSource(audio_url, spool.name))
+    else:
+        source = PcmSource(audio_url)
+        segments = _transcribe_source(source)
+        # ``None`` when the provider did not read the audio through ``source`` (whisper service).
+        audio_hash, duration_ms = source.audio_hash, source.duration_ms
+    if isinstance(segments, PendingTranscript):
+        # Cached by the poller once the provider finishes.
+        segments.audio_hash = audio_hash
+        segments.duration_ms = duration_ms
+        return segments
+    if segments and audio_hash:
+        transcript_cache.store(db, audio_hash, provider, model, segments, duration_ms)
+        db.commit()
+    return segments
+    if segments:
+        transcript_cache.store(db, audio_hash, provider, model, segments, duration_ms)
+        db.commit()
+    return segments
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from typing import Iterable
+
+from app.core.config import settings
+
+# 16 kHz mono s16le, same as asr_service.PCM_RATE / PCM_WIDTH.
+_RATE = 16000
+_WIDTH = 2
+_FRAME_MS = 30
+
+# A time map is a list of kept source ranges ``[src_start_ms, src_end_ms]``; the trimmed
+# audio is those ranges back to back.
+TimeMap = list[list[int]]
+
+
+def _speech_regions(pcm: bytes) -> list[tuple[int, int]]:
+    """Energy VAD over 30 ms frames; returns speech ranges in ms relative to ``pcm``."""
+    import numpy as np
+
+    frame = _RATE * _FRAME_MS // 1000
+    samples = np.frombuffer(pcm[: len(pcm) - len(pcm) % _WIDTH], dtype=np.int16)
+    count = len(samples) // frame
+    if count == 0:
+        return []
+    frames = samples[: count * frame].astype(np.float32).reshape(count, frame)
+    rms = np.sqrt(np.mean(frames * frames, axis=1)) + 1e-9
+    level_db = 20 * np.log10(rms / 32768.0)
+    # Adaptive: well above this window's noise floor, but never below an absolute floor. The
+    # window's floor alone is not enough: narration over a steady music bed never rises
+    # ``margin`` above it, so anything clearly audible (``floor + margin``) always counts.
+    floor_db = float(settings.asr_vad_floor_db)
+    margin_db = float(settings.asr_vad_margin_db)
+    threshold = max(floor_db, min(float(np.percentile(level_db, 10)) + margin_db, floor_db + margin_db))
+    speech = level_db > threshold
+    if not speech.any():
+        # Quiet but not silent throughout: keep it rather than drop words from the transcript.
+        speech = level_db > floor_db
+        if not speech.any():
+            return []
+
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], speech.astype(np.int8), [0]))))
+    runs = edges.reshape(-1, 2)
+    min_silence = max(1, int(settings.asr_vad_min_silence_ms) // _FRAME_MS)
+    padding = max(0, int(settings.asr_vad_padding_ms) // _FRAME_MS)
+
+    regions: list[list[int]] = []
+    for start, end in runs.tolist():
+        start = max(0, start - padding)
+        end = min(count, end + padding)
+        if regions and start - regions[-1][1] < min_silence:
+            regions[-1][1] = max(regions[-1][1], end)
+        else:
+            regions.append([start, end])
+    total_ms = len(samples) * 1000 // _RATE
+    return [
+        (start * _FRAME_MS, total_ms if end == count else end * _FRAME_MS)
+        for start, end in regions
+    ]
+
+
+def vad_available() -> bool:
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def trim_silence(chunks: Iterable[bytes]) -> tuple[bytes, TimeMap]:
+    """Drop non-speech from a PCM stream; returns ``(speech_pcm, time_map)``.
+
+    Works window by window, so it follows the decoder instead of needing the whole track.
+    An empty time map means no speech was detected. Requires NumPy (see ``vad_available``).
+    """
+    kept = bytearray()
+    time_map: TimeMap = []
+    offset_ms = 0
+    for chunk in chunks:
+        for start_ms, end_ms in _speech_regions(chunk):
+            kept.extend(chunk[start_ms * _RATE // 1000 * _WIDTH : end_ms * _RATE // 1000 * _WIDTH])
+            src_start, src_end = offset_ms + start_ms, offset_ms + end_ms
+            if time_map and time_map[-1][1] == src_start:
+                time_map[-1][1] = src_end
+            else:
+                time_map.append([src_start, src_end])
+        offset_ms += len(chunk) // _WIDTH * 1000 // _RATE
+    return bytes(kept), time_map
+
+
+def to_source_ms(time_map: TimeMap | None, ms: int) -> int:
+    """Map a timestamp in the trimmed audio back to the original timeline."""
+    if not time_map:
+        return ms
+    out = 0
+    for src_start, src_end in time_map:
+        length = src_end - src_start
+        if ms < out + length:
+            return src_start + (ms - out)
+        out += length
+    src_start, src_end = time_map[-1]
+    return src_end + (ms - out)
@@ -1,4 +1,5 @@
 from __future__ import annotations
+from datetime import datetime
 from typing import Any
 
 
@@ -31,16 +32,25 @@ class BiliClient:
     def get_subtitle(self, bvid: str) -> str | None:
         raise NotImplementedError
 
+    def get_subtitle_segments(self, bvid: str) -> list[dict[str, Any]] | None:
+        raise NotImplementedError
+
     def get_audio_url(self, bvid: str) -> str | None:
         raise NotImplementedError
 
+    def get_audio_stream(self, bvid: str) -> dict[str, Any] | None:
+        raise NotImplementedError
+
     def get_video_url(self, bvid: str) -> str | None:
         raise NotImplementedError
 
+    def get_video_stream(self, bvid: str, min_width: int | None = None) -> dict[str, Any] | None:
+        raise NotImplementedError
+
     def get_video_comments(self, bvid: str, limit: int = 500) -> list[dict]:
         raise NotImplementedError
 
-    def get_creator_videos(self, up_id: str, limit: int = 20) -> list[dict[str, Any]]:
+    def get_creator_videos(self, up_id: str, limit: int = 20, since: datetime | None = None) -> list[dict[str, Any]]:
         raise NotImplementedError
 
     def get_creator_videos_recent(self, up_id: str, days_limit: int = 30) -> list[dict[str, Any]]:
@@ -69,16 +79,25 @@ class MockBiliClient(BiliClient):
     def get_subtitle(self, bvid: str) -> str | None:
         return None
 
+    def get_subtitle_segments(self, bvid: str) -> list[dict[str, Any]] | None:
+        return None
+
     def get_audio_url(self, bvid: str) -> str | None:
         return None
 
+    def get_audio_stream(self, bvid: str) -> dict[str, Any] | None:
+        return None
+
     def get_video_url(self, bvid: str) -> str | None:
         return None
 
+    def get_video_stream(self, bvid: str, min_width: int | None = None) -> dict[str, Any] | None:
+        return None
+
     def get_video_comments(self, bvid: str, limit: int = 500) -> list[dict]:
         return []
 
-    def get_creator_videos(self, up_id: str, limit: int = 20) -> list[dict[str, Any]]:
+    def get_creator_videos(self, up_id: str, limit: int = 20, since: datetime | None = None) -> list[dict[str, Any]]:
         return []
 
     def get_creator_videos_recent(self, up_id: str, days_limit: int = 30) -> list[dict[str, Any]]:
@@ -3,6 +3,7 @@ from __future__ import annotations
 import html
 import json
 import re
+import threading
 import time
 from datetime import datetime, timedelta
 from typing import Any
@@ -29,6 +30,7 @@ class CrawlerBiliClient(BiliClient):
         self.timeout_seconds = max(1, int(timeout_seconds))
         self.min_interval = 1.0 / self.rate_limit_per_sec
         self._last_request = 0.0
+        self._rate_lock = threading.Lock()
 
         headers = {
             "User-Agent": user_agent or settings.bili_user_agent,
@@ -182,6 +184,12 @@ class CrawlerBiliClient(BiliClient):
         return {"view_count": view_count, "like_count": like_count}
 
     def get_subtitle(self, bvid: str) -> str | None:
+        segments = self.get_subtitle_segments(bvid)
+        if segments is None:
+            return None
+        return "\n".join(seg["text"] for seg in segments)
+
+    def get_subtitle_segments(self, bvid: str) -> list[dict[str, Any]] | None:
         detail = self.get_video_detail(bvid)
         cid = detail.get("cid")
         if not cid:
@@ -208,24 +216,41 @@ class CrawlerBiliClient(BiliClient):
         body = sub_json.get("body") if isinstance(sub_json, dict) else []
         if not isinstance(body, list):
             return None
-        return "\n".join([line.get("content", "") for line in body if isinstance(line, dict)])
+        # ``from`` / ``to`` are seconds (floats).
+        return [
+            {
+                "start_ms": int(float(line.get("from") or 0) * 1000),
+                "end_ms": int(float(line.get("to") or 0) * 1000),
+                "text": line.get("content", ""),
+            }
+            for line in body
+            if isinstance(line, dict)
+        ]
 
     def get_audio_url(self, bvid: str) -> str | None:
+        stream = self.get_audio_stream(bvid)
+        return stream["url"] if stream else None
+
+    def get_audio_stream(self, bvid: str) -> dict[str, Any] | None:
+        """The audio URL with its ``cid`` and ``representation``.
+
+        Both are ``None`` when the URL was scraped from the video page instead of ``playurl``.
+        """
         detail = self.get_video_detail(bvid)
         cid = detail.get("cid")
         if not cid:
             cid = self._get_cid_by_pagelist(bvid)
         if not cid:
             # Fallback: try parse playinfo from video page directly.
-            return self._get_audio_url_from_page(bvid)
+            return self._page_audio_stream(bvid)
         url = "https://api.bilibili.com/x/player/playurl"
         params = {"bvid": bvid, "cid": cid, "fnval": 16, "fnver": 0, "fourk": 1}
         data = self._request_json(url, params)
         if not data:
-            return self._get_audio_url_from_page(bvid)
+            return self._page_audio_stream(bvid)
         payload = data.get("data") if isinstance(data, dict) else {}
         if not isinstance(payload, dict):
-            return self._get_audio_url_from_page(bvid)
+            return self._page_audio_stream(bvid)
         dash = payload.get("dash")
         if isinstance(dash, dict):
             audios = dash.get("audio") if isinstance(dash.get("audio"), list) else []
@@ -234,15 +259,30 @@ class CrawlerBiliClient(BiliClient):
                     continue
                 base_url = audio.get("baseUrl") or audio.get("base_url")
                 if base_url:
-                    return base_url
+                    return {"url": base_url, "cid": cid, "representation": f"audio-{audio.get('id') or 0}"}
         durl = payload.get("durl")
         if isinstance(durl, list) and durl:
             first = durl[0]
-            if isinstance(first, dict):
-                return first.get("url")
-        return self._get_audio_url_from_page(bvid)
+            if isinstance(first, dict) and first.get("url"):
+                # Muxed stream: the same file a frame job would cache for this quality.
+                return {"url": first.get("url"), "cid": cid, "representation": f"durl-{payload.get('quality') or 0}"}
+        return self._page_audio_stream(bvid)
+
+    def _page_audio_stream(self, bvid: str) -> dict[str, Any] | None:
+        url = self._get_audio_url_from_page(bvid)
+        return {"url": url, "cid": None, "representation": None} if url else None
 
     def get_video_url(self, bvid: str) -> str | None:
+        stream = self.get_video_stream(bvid)
+        return stream["url"] if stream else None
+
+    def get_video_stream(self, bvid: str, min_width: int | None = None) -> dict[str, Any] | None:
+        """Pick one video representation and describe it.
+
+        With ``min_width`` the narrowest DASH representation at least that wide wins (the widest
+        one if none is), so frames are not decoded from a larger stream than needed; without it
+        the highest bandwidth one does.
+        """
         detail = self.get_video_detail(bvid)
         cid = detail.get("cid")
         if not cid:
@@ -255,20 +295,45 @@ class CrawlerBiliClient(BiliClient):
         payload = data.get("data") if isinstance(data, dict) else {}
         if not isinstance(payload, dict):
             return None
+        duration_ms = int(payload.get("timelength") or 0)
         dash = payload.get("dash")
         if isinstance(dash, dict):
             videos = dash.get("video") if isinstance(dash.get("video"), list) else []
-            if videos:
-                best = max(videos, key=lambda item: item.get("bandwidth", 0) if isinstance(item, dict) else 0)
-                if isinstance(best, dict):
-                    base_url = best.get("baseUrl") or best.get("base_url")
-                    if base_url:
-                        return base_url
+            reps = [item for item in videos if isinstance(item, dict) and (item.get("baseUrl") or item.get("base_url"))]
+            if reps:
+                def size(item: dict) -> tuple[int, int]:
+                    return int(item.get("width") or 0), int(item.get("bandwidth") or 0)
+
+                if min_width:
+                    wide = [item for item in reps if size(item)[0] >= min_width]
+                    if wide:
+                        best = min(wide, key=size)
+                    else:
+                        best = max(reps, key=lambda item: (size(item)[0], -size(item)[1]))
+                else:
+                    best = max(reps, key=lambda item: size(item)[1])
+                return {
+                    "url": best.get("baseUrl") or best.get("base_url"),
+                    "cid": cid,
+                    "representation": f"{best.get('id') or 0}-{best.get('codecid') or 0}",
+                    "width": int(best.get("width") or 0),
+                    "height": int(best.get("height") or 0),
+                    "bandwidth": int(best.get("bandwidth") or 0),
+                    "duration_ms": duration_ms,
+                }
         durl = payload.get("durl")
         if isinstance(durl, list) and durl:
             first = durl[0]
-            if isinstance(first, dict):
-                return first.get("url")
+            if isinstance(first, dict) and first.get("url"):
+                return {
+                    "url": first.get("url"),
+                    "cid": cid,
+                    "representation": f"durl-{payload.get('quality') or 0}",
+                    "width": 0,
+                    "height": 0,
+                    "bandwidth": 0,
+                    "duration_ms": duration_ms,
+                }
         return None
 
     def get_video_comments(self, bvid: str, limit: int = 500) -> list[dict]:
@@ -315,7 +380,7 @@ class CrawlerBiliClient(BiliClient):
             _collect_comment(reply, normalized)
         return normalized
 
-    def get_creator_videos(self, up_id: str, limit: int = 20) -> list[dict[str, Any]]:
+    def get_creator_videos(self, up_id: str, limit: int = 20, since: datetime | None = None) -> list[dict[str, Any]]:
         if not up_id:
             return []
         page_size = max(1, min(int(limit), 50))
@@ -336,16 +401,20 @@ class CrawlerBiliClient(BiliClient):
             vlist = listing.get("vlist") if isinstance(listing, dict) else []
             if not isinstance(vlist, list) or not vlist:
                 break
+            reached_known = False
             for item in vlist:
                 if not isinstance(item, dict):
                     continue
+                publish_time = _parse_time(item.get("created"))
+                if since and publish_time and publish_time <= since:
+                    reached_known = True
                 results.append(
                     {
                         "bvid": item.get("bvid") or "",
                         "title": _strip_html(item.get("title") or ""),
                         "up_id": str(item.get("mid") or up_id),
                         "up_name": item.get("author") or "",
-                        "publish_time": _parse_time(item.get("created")),
+                        "publish_time": publish_time,
                         "cover_url": _normalize_url(item.get("pic")),
                         "stats": {
                             "views": int(item.get("play", 0) or 0),
@@ -359,6 +428,9 @@ class CrawlerBiliClient(BiliClient):
                 )
             if len(vlist) < page_size:
                 break
+            # Listing is newest-first: once a page reaches the watermark, older pages are known.
+            if reached_known:
+                break
             page += 1
 
         return results[: int(limit)]
@@ -478,11 +550,14 @@ class CrawlerBiliClient(BiliClient):
         return self._wbi_mixin_key
 
     def _rate_limit(self) -> None:
-        now = time.time()
-        elapsed = now - self._last_request
-        if elapsed < self.min_interval:
-            time.sleep(self.min_interval - elapsed)
-        self._last_request = time.time()
+        # Reserve the next slot under the lock and sleep outside it, so threads sharing
+        # one client keep requests in flight concurrently without exceeding the rate.
+        with self._rate_lock:
+            now = time.time()
+            slot = max(now, self._last_request + self.min_interval)
+            self._last_request = slot
+        if slot > now:
+            time.sleep(slot - now)
 
     def _get_cid_by_pagelist(self, bvid: str) -> int | None:
         data = self._request_json("https://api.bilibili.com/x/player/pagelist", {"bvid": bvid})
@@ -1,13 +1,169 @@
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Any
 
+from statistics import median
+
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
+from app.core.database import dialect_insert
 from app.models import FollowedCreator, Video
 from app.services.bili_client import BiliClient
 
+# How many checks to spend per expected post; higher means lower detection latency.
+_CHECKS_PER_POST = 4
+_CADENCE_SAMPLE = 12
+# Stay well below SQLite's bound-parameter limit for IN lookups.
+_PRELOAD_CHUNK = 500
+
+
+def fetch_creator_videos(
+    client: BiliClient,
+    up_id: str,
+    *,
+    limit: int | None = None,
+    days_limit: int | None = None,
+    since: datetime | None = None,
+) -> list[dict[str, Any]]:
+    """Network half of the sync; safe to call from worker threads (no DB access)."""
+    if days_limit is not None:
+        return client.get_creator_videos_recent(up_id, days_limit=days_limit) or []
+    safe_limit = max(1, int(limit or 20))
+    return client.get_creator_videos(up_id, limit=safe_limit, since=since) or []
+
+
+def fetch_creator_profile(client: BiliClient, up_id: str) -> dict[str, Any]:
+    return {
+        "profile": client.get_up_profile(up_id) or {},
+        "up_info": client.get_up_info(up_id) or {},
+        "stats": client.get_up_stats(up_id) or {},
+    }
+
+
+def apply_creator_profile(creator: FollowedCreator, data: dict[str, Any], now: datetime) -> None:
+    profile = data.get("profile") or {}
+    if profile.get("up_name"):
+        creator.up_name = profile.get("up_name") or creator.up_name
+    if profile.get("avatar"):
+        creator.avatar = profile.get("avatar") or creator.avatar
+    up_info = data.get("up_info") or {}
+    creator.follower_count = int(up_info.get("follower_count", 0) or 0)
+    creator.following_count = int(up_info.get("following_count", 0) or 0)
+    stats = data.get("stats") or {}
+    creator.view_count = int(stats.get("view_count", creator.view_count) or 0)
+    creator.like_count = int(stats.get("like_count", creator.like_count) or 0)
+    creator.profile_refreshed_at = now
+
+
+def profile_is_stale(creator: FollowedCreator, now: datetime, ttl_hours: int) -> bool:
+    refreshed = creator.profile_refreshed_at
+    return refreshed is None or now - refreshed >= timedelta(hours=max(0, ttl_hours))
+
+
+def _advance_watermark(creator: FollowedCreator, items: list[dict[str, Any]]) -> None:
+    for item in items:
+        publish_time = item.get("publish_time")
+        if not item.get("bvid") or not isinstance(publish_time, datetime):
+            continue
+        if creator.latest_publish_at is None or publish_time > creator.latest_publish_at:
+            creator.latest_publish_at = publish_time
+            creator.latest_bvid = item.get("bvid")
+
+
+_PRELOAD_COLUMNS = (
+    Video.bvid,
+    Video.title,
+    Video.cover_url,
+    Video.publish_time,
+    Video.follower_count,
+    Video.views,
+    Video.views_delta_1d,
+    Video.like,
+    Video.fav,
+    Video.coin,
+    Video.reply,
+    Video.share,
+    Video.fav_fan_ratio,
+)
+# Columns an upsert overwrites on an existing row; up_id/up_name and user state are kept.
+_UPSERT_COLUMNS = (
+    "title",
+    "cover_url",
+    "publish_time",
+    "follower_count",
+    "views",
+    "views_delta_1d",
+    "like",
+    "fav",
+    "coin",
+    "reply",
+    "share",
+    "fav_rate",
+    "coin_rate",
+    "reply_rate",
+    "fav_fan_ratio",
+    "source",
+    "fetch_time",
+)
+
+
+def _preload_videos(db: Session, bvids: list[str | None]) -> dict[str, Any]:
+    """Current stats of every already-known video of a page, with ``IN`` queries instead of one get per item."""
+    wanted = list(dict.fromkeys(b for b in bvids if b))
+    found: dict[str, Any] = {}
+    for start in range(0, len(wanted), _PRELOAD_CHUNK):
+        chunk = wanted[start : start + _PRELOAD_CHUNK]
+        for row in db.execute(select(*_PRELOAD_COLUMNS).where(Video.bvid.in_(chunk))):
+            found[row.bvid] = row
+    return found
+
+
+def _upsert_videos(db: Session, rows: list[dict[str, Any]]) -> None:
+    """Insert new videos and update known ones in one ``INSERT ... ON CONFLICT DO UPDATE``."""
+    stmt = dialect_insert(db)(Video)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Video.bvid],
+        set_={name: stmt.excluded[name] for name in _UPSERT_COLUMNS},
+    )
+    db.execute(stmt, rows)
+
+
+def _video_row(item: dict[str, Any], creator: FollowedCreator, old: Any, follower_count: int, now: datetime) -> dict[str, Any]:
+    stats = item.get("stats") or {}
+    old_views = int(old.views or 0) if old else 0
+    views = int(stats.get("views", old_views) or 0)
+    counts = {
+        name: int(stats.get(name, getattr(old, name) if old else 0) or 0)
+        for name in ("like", "fav", "coin", "reply", "share")
+    }
+    if follower_count > 0:
+        followers = follower_count
+        fav_fan_ratio = counts["fav"] / follower_count
+    else:
+        followers = int(old.follower_count or 0) if old else 0
+        fav_fan_ratio = float(old.fav_fan_ratio or 0.0) if old else 0.0
+    return {
+        "bvid": item["bvid"],
+        "up_id": creator.up_id,
+        "up_name": item.get("up_name") or creator.up_name or "",
+        "title": item.get("title") or (old.title if old else ""),
+        "cover_url": item.get("cover_url") or (old.cover_url if old else None),
+        "publish_time": (old.publish_time if old else None) or item.get("publish_time"),
+        "follower_count": followers,
+        "views": views,
+        "views_delta_1d": max(0, views - old_views) if old_views > 0 else (old.views_delta_1d if old else None),
+        **counts,
+        "fav_rate": counts["fav"] / views if views > 0 else 0.0,
+        "coin_rate": counts["coin"] / views if views > 0 else 0.0,
+        "reply_rate": counts["reply"] / views if views > 0 else 0.0,
+        "fav_fan_ratio": fav_fan_ratio,
+        "source": "creator_watch",
+        "fetch_time": now,
+    }
+
 
 def sync_creator_videos(
     db: Session,
@@ -17,78 +173,36 @@ def sync_creator_videos(
     limit: int | None = None,
     days_limit: int | None = None,
     now: datetime | None = None,
+    items: list[dict[str, Any]] | None = None,
 ) -> dict[str, int]:
     now = now or datetime.utcnow()
     inserted = 0
     updated = 0
     failed = 0
 
-    try:
-        if days_limit is not None:
-            items = client.get_creator_videos_recent(creator.up_id, days_limit=days_limit) or []
-        else:
-            safe_limit = max(1, int(limit or 20))
-            items = client.get_creator_videos(creator.up_id, limit=safe_limit) or []
-    except Exception:
-        return {"inserted": 0, "updated": 0, "failed": 1}
+    if items is None:
+        try:
+            items = fetch_creator_videos(
+                client,
+                creator.up_id,
+                limit=limit,
+                days_limit=days_limit,
+                since=creator.latest_publish_at,
+            )
+        except Exception:
+            return {"inserted": 0, "updated": 0, "failed": 1}
 
     follower_count = int(getattr(creator, "follower_count", 0) or 0)
+    existing = _preload_videos(db, [item.get("bvid") for item in items])
+    rows: dict[str, dict[str, Any]] = {}
 
     for item in items:
         try:
             bvid = item.get("bvid")
             if not bvid:
                 continue
-            video = db.get(Video, bvid)
-            is_new = video is None
-            if not video:
-                video = Video(
-                    bvid=bvid,
-                    title=item.get("title") or "",
-                    up_id=creator.up_id,
-                    up_name=item.get("up_name") or creator.up_name or "",
-                    publish_time=item.get("publish_time"),
-                    cover_url=item.get("cover_url"),
-                    fetch_time=now,
-                    source="creator_watch",
-                )
-
-            stats = item.get("stats") or {}
-            old_views = int(video.views or 0)
-            new_views = int(stats.get("views", old_views) or 0)
-            if old_views > 0:
-                video.views_delta_1d = max(0, new_views - old_views)
-
-            video.views = new_views
-            video.like = int(stats.get("like", video.like) or 0)
-            video.fav = int(stats.get("fav", video.fav) or 0)
-            video.coin = int(stats.get("coin", video.coin) or 0)
-            video.reply = int(stats.get("reply", video.reply) or 0)
-            video.share = int(stats.get("share", video.share) or 0)
-
-            if item.get("title"):
-                video.title = item.get("title") or video.title
-            if item.get("cover_url"):
-                video.cover_url = item.get("cover_url") or video.cover_url
-            if item.get("publish_time") and not video.publish_time:
-                video.publish_time = item.get("publish_time")
-
-            if follower_count > 0:
-                video.follower_count = follower_count
-                video.fav_fan_ratio = video.fav / follower_count if follower_count > 0 else 0.0
-
-            if video.views > 0:
-                video.fav_rate = video.fav / video.views
-                video.coin_rate = video.coin / video.views
-                video.reply_rate = video.reply / video.views
-            else:
-                video.fav_rate = 0.0
-                video.coin_rate = 0.0
-                video.reply_rate = 0.0
-
-            video.source = "creator_watch"
-            video.fetch_time = now
-            db.add(video)
+            is_new = bvid not in existing and bvid not in rows
+            rows[bvid] = _video_row(item, creator, existing.get(bvid), follower_count, now)
             if is_new:
                 inserted += 1
             else:
@@ -96,4 +210,44 @@ def sync_creator_videos(
         except Exception:
             failed += 1
 
+    if rows:
+        _upsert_videos(db, list(rows.values()))
+    _advance_watermark(creator, items)
     return {"inserted": inserted, "updated": updated, "failed": failed}
+
+
+def learn_post_interval(db: Session, up_id: str) -> float | None:
+    """Median hours between the creator's recent uploads already stored in ``videos``."""
+    times = (
+        db.execute(
+            select(Video.publish_time)
+            .where(Video.up_id == up_id, Video.publish_time.isnot(None))
+            .order_by(Video.publish_time.desc())
+            .limit(_CADENCE_SAMPLE)
+        )
+        .scalars()
+        .all()
+    )
+    gaps = [(a - b).total_seconds() / 3600 for a, b in zip(times, times[1:]) if a > b]
+    if not gaps:
+        return None
+    return max(median(gaps), 0.1)
+
+
+def schedule_next_check(creator: FollowedCreator, now: datetime) -> datetime:
+    min_minutes = max(1, int(settings.creator_watch_min_interval_minutes or 15))
+    max_minutes = max(min_minutes, int(settings.creator_watch_max_interval_hours or 24) * 60)
+    if creator.boost:
+        minutes = min_minutes
+    elif creator.post_interval_hours:
+        gap_hours = creator.post_interval_hours
+        if creator.latest_publish_at:
+            # A creator silent for much longer than usual is treated as going dormant.
+            silent_hours = (now - creator.latest_publish_at).total_seconds() / 3600
+            gap_hours = max(gap_hours, silent_hours / 2)
+        minutes = gap_hours * 60 / _CHECKS_PER_POST
+    else:
+        minutes = int(settings.creator_watch_interval_minutes or 45)
+    minutes = max(min_minutes, min(max_minutes, minutes))
+    creator.next_check_at = now + timedelta(minutes=minutes)
+    return creator.next_check_at
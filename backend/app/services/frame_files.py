@@ -0,0 +1,81 @@
+"""Extracted frame files on disk and the URLs they are served under.
+
+Frames and thumbnails never change once written (every job has its own directory), so they
+are served with a strong ETag and ``Cache-Control: immutable``. With ``FRAME_URL_SECRET``
+set, listings hand out ``/api/frames/static/{path}?sig=...`` URLs, where ``sig`` is an
+HMAC-SHA256 of the path relative to ``FRAMES_DIR``; that route checks the signature and
+serves the file without touching the database.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Sequence
+from urllib.parse import quote
+
+from app.core.config import settings
+
+STATIC_PREFIX = "/api/frames/static/"
+SPRITE_DIR = "sprites"
+SPRITE_INDEX = "index.json"
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def root() -> Path:
+    base = Path(__file__).resolve().parents[2]
+    return base / (settings.frames_dir or "frames")
+
+
+def media_type(path: str) -> str:
+    return "image/webp" if path.endswith(".webp") else "image/jpeg"
+
+
+def etag(stat: os.stat_result) -> str:
+    # Files are written once under a fresh job directory, so size + mtime identify the bytes.
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def _sign(rel: str) -> str:
+    key = (settings.frame_url_secret or "").encode("utf-8")
+    return hmac.new(key, rel.encode("utf-8"), hashlib.sha256).hexdigest()[:32]
+
+
+def static_url(path: str | None) -> str | None:
+    """Signed database-free URL for a file under ``FRAMES_DIR``; ``None`` when signing is off."""
+    if not path or not settings.frame_url_secret:
+        return None
+    try:
+        rel = Path(path).resolve().relative_to(root().resolve()).as_posix()
+    except ValueError:
+        return None
+    return f"{STATIC_PREFIX}{quote(rel)}?sig={_sign(rel)}"
+
+
+def resolve(rel: str, sig: str) -> Path | None:
+    """The file a signed static URL points at, or ``None`` if the signature does not match."""
+    if not settings.frame_url_secret or not hmac.compare_digest(_sign(rel), sig or ""):
+        return None
+    base = root().resolve()
+    path = (base / rel).resolve()
+    if base not in path.parents:
+        return None
+    return path
+
+
+@contextmanager
+def concat_list(paths: Sequence[str]) -> Iterator[str]:
+    """A temporary ffmpeg concat-demuxer list of ``paths``; one process then reads them all in order."""
+    fd, list_path = tempfile.mkstemp(suffix=".txt", prefix="frames_")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            for path in paths:
+                escaped = os.path.abspath(path).replace("'", "'\\''")
+                fh.write(f"file '{escaped}'\n")
+        yield list_path
+    finally:
+        os.unlink(list_path)
@@ -0,0 +1,388 @@
+"""Garbage collection of extracted frames under ``FRAMES_DIR``.
+
+``collect`` runs three passes, all bounded by one deadline so the Beat task stays within its
+budget:
+
+* retention: keep the newest ``FRAME_KEEP_JOBS_PER_VIDEO`` successful jobs of each video
+  (``prune_video`` also runs after every extraction);
+* reconcile disk with the database: job directories without a job row, failed/canceled jobs,
+  and files of finished jobs that no frame row references (``source.mp4`` downloads, slice
+  leftovers) are removed, as are frame rows whose file is gone. Video directories are
+  visited in name order and the last finished one is kept in Redis, so a walk cut short by
+  the deadline resumes there next run instead of starting over;
+* quota: whole jobs are evicted across all videos, least recently viewed first, until usage
+  fits ``FRAME_STORAGE_MAX_MB``. Usage is the sum of ``frame_jobs.storage_bytes`` (measured
+  at extraction, refreshed by reconcile), so this pass runs every time, walk finished or not.
+
+Favorited frames are never removed. A job holding favorites keeps its row and those files,
+loses everything else and becomes ``expired``. Rows go in bulk ``DELETE ... WHERE ... IN``
+statements. The last run's report, including usage, is kept in Redis for the storage
+endpoint.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterable, Iterator, Sequence
+
+import redis
+from sqlalchemy import bindparam, delete, func, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import FrameFavorite, FrameJob, VideoFrame
+from app.services import frame_files
+
+_REPORT_KEY = "frame_gc:last"
+_CURSOR_KEY = "frame_gc:cursor"
+# Directories younger than this are left alone: the job row may be mid-commit or the worker
+# still writing.
+_GRACE_SECONDS = 3600
+_CHUNK = 500
+_FINISHED = ("success", "expired")
+_ABANDONED = ("failed", "canceled")
+
+
+def quota_bytes() -> int:
+    return max(0, int(settings.frame_storage_max_mb or 0)) * 1024 * 1024
+
+
+def _chunks(items: Sequence[str]) -> Iterator[Sequence[str]]:
+    for start in range(0, len(items), _CHUNK):
+        yield items[start : start + _CHUNK]
+
+
+def tree_bytes(path: Path) -> int:
+    total = 0
+    for dirpath, _dirnames, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                total += os.lstat(os.path.join(dirpath, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def _remove_except(path: Path, keep: set[str]) -> int:
+    """Delete everything under ``path`` except the files in ``keep``; returns bytes freed."""
+    if not keep:
+        size = tree_bytes(path)
+        shutil.rmtree(path, ignore_errors=True)
+        return size
+    keep = {os.path.realpath(file_path) for file_path in keep}
+    freed = 0
+    for dirpath, _dirnames, filenames in os.walk(path, topdown=False):
+        for name in filenames:
+            file_path = os.path.join(dirpath, name)
+            if os.path.realpath(file_path) in keep:
+                continue
+            try:
+                size = os.lstat(file_path).st_size
+                os.remove(file_path)
+            except OSError:
+                continue
+            freed += size
+        if dirpath != str(path):
+            try:
+                os.rmdir(dirpath)
+            except OSError:
+                pass
+    return freed
+
+
+def _favorite_files(db: Session, job_ids: Sequence[str]) -> dict[str, set[str]]:
+    keep: dict[str, set[str]] = defaultdict(set)
+    for chunk in _chunks(job_ids):
+        rows = db.execute(
+            select(VideoFrame.job_id, VideoFrame.frame_url, VideoFrame.thumb_url)
+            .join(FrameFavorite, FrameFavorite.frame_id == VideoFrame.id)
+            .where(VideoFrame.job_id.in_(chunk))
+        ).all()
+        for job_id, frame_url, thumb_url in rows:
+            keep[job_id].update(path for path in (frame_url, thumb_url) if path)
+    return keep
+
+
+def drop_jobs(db: Session, jobs: Iterable[FrameJob]) -> int:
+    """Remove the jobs' frames (rows and files) except favorites; returns bytes freed.
+
+    Jobs without favorites are deleted; the others are kept as ``expired``.
+    """
+    jobs = list(jobs)
+    if not jobs:
+        return 0
+    ids = [job.id for job in jobs]
+    keep = _favorite_files(db, ids)
+    freed = 0
+    for job in jobs:
+        if job.output_dir and os.path.isdir(job.output_dir):
+            freed += _remove_except(Path(job.output_dir), keep.get(job.id, set()))
+    favorited = select(FrameFavorite.frame_id)
+    for chunk in _chunks(ids):
+        db.execute(
+            delete(VideoFrame)
+            .where(VideoFrame.job_id.in_(chunk), VideoFrame.id.not_in(favorited))
+            .execution_options(synchronize_session=False)
+        )
+    gone = [job_id for job_id in ids if job_id not in keep]
+    for chunk in _chunks(gone):
+        db.execute(delete(FrameJob).where(FrameJob.id.in_(chunk)).execution_options(synchronize_session=False))
+    for job in jobs:
+        if job.id in keep:
+            job.status = "expired"
+            job.frame_count = (
+                db.execute(select(func.count()).select_from(VideoFrame).where(VideoFrame.job_id == job.id)).scalar() or 0
+            )
+            job.source_video_path = None
+            job.storage_bytes = tree_bytes(Path(job.output_dir)) if job.output_dir else 0
+            job.updated_at = datetime.utcnow()
+    db.commit()
+    return freed
+
+
+def prune_video(db: Session, bvid: str, keep: int | None = None) -> int:
+    """Drop all but the newest ``keep`` successful jobs of one video; returns bytes freed."""
+    keep = int(settings.frame_keep_jobs_per_video if keep is None else keep)
+    jobs = (
+        db.execute(
+            select(FrameJob).where(FrameJob.bvid == bvid, FrameJob.status == "success").order_by(FrameJob.created_at.desc())
+        )
+        .scalars()
+        .all()
+    )
+    return drop_jobs(db, jobs[max(keep, 0) :])
+
+
+def _prune_all(db: Session, deadline: float) -> tuple[int, bool]:
+    keep = max(int(settings.frame_keep_jobs_per_video or 0), 0)
+    bvids = (
+        db.execute(
+            select(FrameJob.bvid).where(FrameJob.status == "success").group_by(FrameJob.bvid).having(func.count() > keep)
+        )
+        .scalars()
+        .all()
+    )
+    freed = 0
+    for bvid in bvids:
+        if time.monotonic() > deadline:
+            return freed, False
+        freed += prune_video(db, bvid, keep)
+    return freed, True
+
+
+def _reconcile_job_dir(db: Session, job_dir: Path, job_id: str) -> int:
+    """Remove files of a finished job that no frame row references, and rows without a file."""
+    rows = db.execute(
+        select(VideoFrame.id, VideoFrame.frame_url, VideoFrame.thumb_url).where(VideoFrame.job_id == job_id)
+    ).all()
+    referenced = {os.path.realpath(path) for _, frame_url, thumb_url in rows for path in (frame_url, thumb_url) if path}
+    sprite_dir = str(job_dir / frame_files.SPRITE_DIR)
+    files = [os.path.join(dirpath, name) for dirpath, _dirnames, filenames in os.walk(job_dir) for name in filenames]
+    on_disk = {os.path.realpath(file_path) for file_path in files}
+    if rows and not referenced & on_disk:
+        # Rows point somewhere else (FRAMES_DIR moved?); deleting would wipe a healthy job.
+        return 0
+    freed = 0
+    for file_path in files:
+        if os.path.realpath(file_path) in referenced or os.path.dirname(file_path) == sprite_dir:
+            continue
+        try:
+            size = os.lstat(file_path).st_size
+            os.remove(file_path)
+        except OSError:
+            continue
+        freed += size
+    missing = [frame_id for frame_id, frame_url, _ in rows if os.path.realpath(frame_url) not in on_disk]
+    if missing:
+        favorited = select(FrameFavorite.frame_id)
+        for chunk in _chunks(missing):
+            db.execute(
+                delete(VideoFrame)
+                .where(VideoFrame.id.in_(chunk), VideoFrame.id.not_in(favorited))
+                .execution_options(synchronize_session=False)
+            )
+        db.commit()
+    return freed
+
+
+def _save_sizes(db: Session, sizes: dict[str, int]) -> None:
+    """Store measured directory sizes; a Core UPDATE so ``updated_at`` keeps meaning "job changed"."""
+    if not sizes:
+        return
+    table = FrameJob.__table__
+    stmt = (
+        update(table)
+        .where(table.c.id == bindparam("job_id"))
+        .values(storage_bytes=bindparam("size"), updated_at=table.c.updated_at)
+    )
+    # On the connection: an executemany, not the ORM's per-row bulk update by primary key.
+    db.connection().execute(stmt, [{"job_id": job_id, "size": size} for job_id, size in sizes.items()])
+    db.commit()
+
+
+def _get_cursor() -> str:
+    try:
+        raw = redis.Redis.from_url(settings.redis_url).get(_CURSOR_KEY)
+    except redis.RedisError:
+        return ""
+    return raw.decode("utf-8") if raw else ""
+
+
+def _set_cursor(value: str | None) -> None:
+    try:
+        r = redis.Redis.from_url(settings.redis_url)
+        if value:
+            r.set(_CURSOR_KEY, value)
+        else:
+            r.delete(_CURSOR_KEY)
+    except redis.RedisError:
+        pass
+
+
+def _reconcile(db: Session, deadline: float) -> tuple[dict[str, int], bool]:
+    """Walk ``FRAMES_DIR`` against the job table from the saved cursor; returns (counters, walk finished)."""
+    stats = {"orphan_dirs": 0, "abandoned_jobs": 0, "orphan_bytes": 0}
+    root = frame_files.root()
+    if not root.is_dir():
+        _set_cursor(None)
+        return stats, True
+    jobs = {job_id: status for job_id, status in db.execute(select(FrameJob.id, FrameJob.status)).all()}
+    cursor = _get_cursor()
+    now = time.time()
+    for bvid_dir in sorted(path for path in root.iterdir() if path.name > cursor):
+        if not bvid_dir.is_dir():
+            continue
+        sizes: dict[str, int] = {}
+        for job_dir in bvid_dir.iterdir():
+            if time.monotonic() > deadline:
+                # This video directory is redone from the start next run.
+                _save_sizes(db, sizes)
+                _set_cursor(cursor)
+                return stats, False
+            try:
+                age = now - job_dir.stat().st_mtime
+            except OSError:
+                continue
+            status = jobs.get(job_dir.name)
+            if not job_dir.is_dir() or status is None:
+                if age < _GRACE_SECONDS:
+                    continue
+                stats["orphan_dirs"] += 1
+                if job_dir.is_dir():
+                    stats["orphan_bytes"] += _remove_except(job_dir, set())
+                else:
+                    stats["orphan_bytes"] += job_dir.lstat().st_size
+                    job_dir.unlink(missing_ok=True)
+            elif status in _ABANDONED:
+                if age < _GRACE_SECONDS:
+                    continue
+                stats["abandoned_jobs"] += 1
+                stats["orphan_bytes"] += drop_jobs(db, [db.get(FrameJob, job_dir.name)])
+            elif status in _FINISHED:
+                stats["orphan_bytes"] += _reconcile_job_dir(db, job_dir, job_dir.name)
+                sizes[job_dir.name] = tree_bytes(job_dir)
+        _save_sizes(db, sizes)
+        cursor = bvid_dir.name
+        try:
+            bvid_dir.rmdir()
+        except OSError:
+            pass
+    _set_cursor(None)
+
+    # Abandoned jobs whose directory never existed (failed before extraction started).
+    stale = [job_id for job_id, status in jobs.items() if status in _ABANDONED]
+    if stale:
+        cutoff = datetime.utcnow() - timedelta(seconds=_GRACE_SECONDS)
+        rows = db.execute(select(FrameJob).where(FrameJob.id.in_(stale[:_CHUNK]), FrameJob.updated_at < cutoff)).scalars().all()
+        stats["abandoned_jobs"] += len(rows)
+        stats["orphan_bytes"] += drop_jobs(db, rows)
+    return stats, True
+
+
+def _measure_unknown(db: Session, deadline: float) -> None:
+    """Fill ``storage_bytes`` of finished jobs extracted before sizes were recorded."""
+    jobs = db.execute(
+        select(FrameJob.id, FrameJob.output_dir).where(FrameJob.status.in_(_FINISHED), FrameJob.storage_bytes.is_(None))
+    ).all()
+    sizes: dict[str, int] = {}
+    for job_id, output_dir in jobs:
+        if time.monotonic() > deadline:
+            break
+        sizes[job_id] = tree_bytes(Path(output_dir)) if output_dir and os.path.isdir(output_dir) else 0
+    _save_sizes(db, sizes)
+
+
+def stored_bytes(db: Session) -> int:
+    """Recorded size of every job directory (jobs not measured yet count as 0)."""
+    return int(db.execute(select(func.coalesce(func.sum(FrameJob.storage_bytes), 0))).scalar() or 0)
+
+
+def _evict_to_quota(db: Session, quota: int) -> tuple[int, int]:
+    """Evict least recently viewed successful jobs until the recorded usage fits ``quota``."""
+    excess = stored_bytes(db) - quota
+    if excess <= 0:
+        return 0, 0
+    last_used = func.coalesce(FrameJob.accessed_at, FrameJob.updated_at)
+    candidates = db.execute(
+        select(FrameJob)
+        .where(FrameJob.status == "success", FrameJob.storage_bytes > 0)
+        .order_by(last_used.asc())
+    ).scalars()
+    batch = []
+    planned = 0
+    for job in candidates:
+        if planned >= excess:
+            break
+        batch.append(job)
+        planned += int(job.storage_bytes or 0)
+    return len(batch), drop_jobs(db, batch)
+
+
+def collect(db: Session, budget_seconds: float | None = None) -> dict:
+    """One GC run: retention, disk/database reconciliation, then quota eviction."""
+    started = time.monotonic()
+    budget = float(settings.frame_gc_budget_seconds if budget_seconds is None else budget_seconds)
+    deadline = started + budget if budget > 0 else float("inf")
+
+    pruned_bytes, complete = _prune_all(db, deadline)
+    stats, reconciled = _reconcile(db, deadline) if complete else ({}, False)
+    evicted_jobs = evicted_bytes = 0
+    quota = quota_bytes()
+    if quota:
+        # Runs even when the walk ran out of time: sizes come from the job rows.
+        _measure_unknown(db, deadline)
+        evicted_jobs, evicted_bytes = _evict_to_quota(db, quota)
+
+    report = {
+        "finished_at": datetime.utcnow().isoformat(),
+        "elapsed_seconds": round(time.monotonic() - started, 3),
+        "complete": reconciled,
+        "pruned_bytes": pruned_bytes,
+        "orphan_dirs": stats.get("orphan_dirs", 0),
+        "abandoned_jobs": stats.get("abandoned_jobs", 0),
+        "orphan_bytes": stats.get("orphan_bytes", 0),
+        "evicted_jobs": evicted_jobs,
+        "evicted_bytes": evicted_bytes,
+        "reclaimed_bytes": pruned_bytes + stats.get("orphan_bytes", 0) + evicted_bytes,
+        "usage_bytes": stored_bytes(db),
+        "quota_bytes": quota,
+    }
+    try:
+        redis.Redis.from_url(settings.redis_url).set(_REPORT_KEY, json.dumps(report))
+    except redis.RedisError:
+        pass
+    return report
+
+
+def last_report() -> dict | None:
+    try:
+        raw = redis.Redis.from_url(settings.redis_url).get(_REPORT_KEY)
+    except redis.RedisError:
+        return None
+    return json.loads(raw) if raw else None
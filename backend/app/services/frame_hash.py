@@ -0,0 +1,112 @@
+"""Perceptual hashes of extracted frames, for collapsing near-identical ones.
+
+``dhash`` is the 64-bit difference hash: the image is reduced to 9x8 grayscale and each bit
+records whether a pixel's right-hand neighbour is brighter. Re-encoding, small
+crops of the overlay and lighting flicker change only a few bits, so frames within a small
+Hamming distance are treated as the same picture. Steps of at most ``_MIN_STEP`` levels
+count as "not brighter": on flat areas (plain backgrounds, fades) the plain comparison is
+decided by noise and two encodings of one frame can differ in a large share of their bits.
+
+ffmpeg does the decoding and downscaling (all of a job's images in one process); NumPy
+does the bit work. NumPy is imported lazily so workers without it still run; callers check
+``available()`` and skip hashing when it is missing.
+"""
+
+from __future__ import annotations
+
+import subprocess
+from typing import TYPE_CHECKING, Sequence
+
+from app.services import frame_files
+
+_HASH_W = 9
+_HASH_H = 8
+_MIN_STEP = 2
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+def available() -> bool:
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _decode_gray(ffmpeg_bin: str, paths: Sequence[str]) -> np.ndarray:
+    """``(n, 8, 9)`` uint8 grayscale thumbnails of ``paths``, in order."""
+    import numpy as np
+
+    with frame_files.concat_list(paths) as list_path:
+        cmd = [
+            ffmpeg_bin,
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-f",
+            "concat",
+            "-safe",
+            "0",
+            "-i",
+            list_path,
+            "-vf",
+            f"scale={_HASH_W}:{_HASH_H}:flags=area,format=gray",
+            "-fps_mode",
+            "passthrough",
+            "-f",
+            "rawvideo",
+            "-",
+        ]
+        result = subprocess.run(cmd, capture_output=True, check=False)
+    size = _HASH_W * _HASH_H
+    if result.returncode != 0 or len(result.stdout) != size * len(paths):
+        raise RuntimeError(f"frame hash decode failed: {result.stderr.decode('utf-8', 'ignore')[-300:]}")
+    return np.frombuffer(result.stdout, dtype=np.uint8).reshape(len(paths), _HASH_H, _HASH_W)
+
+
+def dhash(gray: np.ndarray) -> np.ndarray:
+    """64-bit difference hashes (``uint64``) of ``(n, 8, 9)`` grayscale images."""
+    import numpy as np
+
+    steps = gray[:, :, 1:].astype(np.int16) - gray[:, :, :-1]
+    bits = (steps > _MIN_STEP).reshape(len(gray), 64)
+    weights = np.uint64(1) << np.arange(63, -1, -1, dtype=np.uint64)
+    return (bits.astype(np.uint64) * weights).sum(axis=1, dtype=np.uint64)
+
+
+def hash_files(ffmpeg_bin: str, paths: Sequence[str]) -> np.ndarray:
+    import numpy as np
+
+    if not paths:
+        return np.zeros(0, dtype=np.uint64)
+    return dhash(_decode_gray(ffmpeg_bin, paths))
+
+
+def to_hex(value) -> str:
+    return f"{int(value):016x}"
+
+
+def duplicates(hashes: np.ndarray, max_distance: int) -> list[int | None]:
+    """For each hash, the index of an earlier kept frame within ``max_distance`` bits, else ``None``.
+
+    Every frame is compared with all frames kept so far, not just the previous one, so a shot
+    that returns later in the video (a product close-up between cuts) also collapses.
+    """
+    import numpy as np
+
+    out: list[int | None] = []
+    kept_idx: list[int] = []
+    kept = np.zeros(len(hashes), dtype=np.uint64)
+    for idx, value in enumerate(hashes):
+        if kept_idx:
+            dist = np.bitwise_count(kept[: len(kept_idx)] ^ value)
+            nearest = int(dist.argmin())
+            if int(dist[nearest]) <= max_distance:
+                out.append(kept_idx[nearest])
+                continue
+        kept[len(kept_idx)] = value
+        kept_idx.append(idx)
+        out.append(None)
+    return out
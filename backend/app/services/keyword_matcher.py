@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict, deque
+from typing import Iterable, Iterator
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models import Task, TaskVideo, Subtitle, Video
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton over a fixed word list (case-insensitive substring hits).
+
+    Scanning a text costs O(len(text) + hits) no matter how many words are compiled in.
+    """
+
+    def __init__(self, words: Iterable[str]):
+        cleaned: list[str] = []
+        seen: set[str] = set()
+        for word in words or []:
+            if not isinstance(word, str):
+                continue
+            norm = word.strip().lower()
+            if norm and norm not in seen:
+                seen.add(norm)
+                cleaned.append(norm)
+        self.words: tuple[str, ...] = tuple(cleaned)
+
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[tuple[int, ...]] = [()]
+        for idx, word in enumerate(self.words):
+            self._insert(idx, word)
+        self._link()
+
+    def __bool__(self) -> bool:
+        return bool(self.words)
+
+    def _insert(self, idx: int, word: str) -> None:
+        node = 0
+        for ch in word:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            node = nxt
+        self._out[node] = self._out[node] + (idx,)
+
+    def _link(self) -> None:
+        queue: deque[int] = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                if self._out[self._fail[child]]:
+                    self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def _scan(self, text: str) -> Iterator[int]:
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        node = 0
+        for ch in text.lower():
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                yield from out[node]
+
+    def search(self, text: str | None) -> bool:
+        if not text or not self.words:
+            return False
+        for _ in self._scan(text):
+            return True
+        return False
+
+    def find(self, *texts: str | None) -> list[str]:
+        if not self.words:
+            return []
+        hit: set[int] = set()
+        for text in texts:
+            if text:
+                hit.update(self._scan(text))
+                if len(hit) == len(self.words):
+                    break
+        return [self.words[idx] for idx in sorted(hit)]
+
+
+# Bounded LRU: one entry per (task, field) in use, oldest dropped past the limit.
+_TASK_MATCHERS_MAX = 256
+_task_matchers: OrderedDict[tuple[str, str], tuple[tuple[str, ...], KeywordMatcher]] = OrderedDict()
+_task_matchers_lock = threading.Lock()
+
+
+def matcher_for_task(task: Task, field: str = "exclude_words") -> KeywordMatcher:
+    """Per-task matcher for ``exclude_words`` or ``keywords``.
+
+    Cached by task id; a changed word list (e.g. edited in another process) rebuilds it.
+    """
+    words = tuple(w for w in (getattr(task, field, None) or []) if isinstance(w, str))
+    key = (task.id, field)
+    with _task_matchers_lock:
+        cached = _task_matchers.get(key)
+        if cached and cached[0] == words:
+            _task_matchers.move_to_end(key)
+            return cached[1]
+    matcher = KeywordMatcher(words)
+    with _task_matchers_lock:
+        _task_matchers[key] = (words, matcher)
+        _task_matchers.move_to_end(key)
+        while len(_task_matchers) > _TASK_MATCHERS_MAX:
+            _task_matchers.popitem(last=False)
+    return matcher
+
+
+def invalidate_task_matcher(task_id: str) -> None:
+    with _task_matchers_lock:
+        for key in [k for k in _task_matchers if k[0] == task_id]:
+            _task_matchers.pop(key, None)
+
+
+def annotate_keyword_hits(db: Session, bvid: str) -> int:
+    """Recompute ``TaskVideo.keyword_hits`` for one video from its title and subtitle text."""
+    video = db.get(Video, bvid)
+    if not video:
+        return 0
+    subtitle = db.get(Subtitle, bvid)
+    subtitle_text = subtitle.text if subtitle else None
+    rows = db.execute(
+        select(TaskVideo, Task).join(Task, Task.id == TaskVideo.task_id).where(TaskVideo.bvid == bvid)
+    ).all()
+    updated = 0
+    for link, task in rows:
+        hits = matcher_for_task(task, "keywords").find(video.title, subtitle_text)
+        if hits != (link.keyword_hits or []):
+            link.keyword_hits = hits
+            db.add(link)
+            updated += 1
+    return updated
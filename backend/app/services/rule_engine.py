@@ -1,6 +1,10 @@
 from __future__ import annotations
 from typing import Any
 
+from sqlalchemy import and_, false, or_, true
+
+from app.models import Video
+
 
 def evaluate_basic_hot(stats: dict[str, Any], rules: dict[str, Any]) -> tuple[bool, list[str]]:
     cfg = rules.get("basic_hot") or {}
@@ -74,3 +78,66 @@ def evaluate_rules(stats: dict[str, Any], follower_count: int, rules: dict[str,
         "basic_hot": {"is_hit": basic_hit, "reason": basic_reason},
         "low_fan_hot": {"is_hit": low_hit, "reason": low_reason},
     }
+
+
+_STAT_COLUMNS = ("views", "like", "fav", "coin", "reply", "share")
+
+
+def _stat_column(field: str):
+    if field not in _STAT_COLUMNS:
+        return None
+    return getattr(Video, field)
+
+
+def _const(value: bool):
+    return true() if value else false()
+
+
+def compile_basic_hot(rules: dict[str, Any]):
+    """SQL counterpart of ``evaluate_basic_hot`` over stored ``Video`` columns."""
+    cfg = rules.get("basic_hot") or {}
+    if not cfg.get("enabled", True):
+        return false()
+
+    thresholds: dict[str, float] = cfg.get("thresholds", {})
+    if not thresholds:
+        return false()
+
+    conditions = []
+    for field, threshold in thresholds.items():
+        col = _stat_column(field)
+        # Unknown fields read as 0 in evaluate_basic_hot.
+        conditions.append(col >= threshold if col is not None else _const(0 >= threshold))
+
+    if cfg.get("mode", "any") == "all":
+        return and_(*conditions)
+    return or_(*conditions)
+
+
+def compile_low_fan_hot(rules: dict[str, Any]):
+    """SQL counterpart of ``evaluate_low_fan_hot``.
+
+    Rates use the precomputed ``fav_rate``/``coin_rate``/``reply_rate``/``fav_fan_ratio``
+    columns, which hold the same quotients the Python evaluator derives from raw stats.
+    """
+    cfg = rules.get("low_fan_hot") or {}
+    if not cfg.get("enabled", True):
+        return false()
+
+    return and_(
+        Video.views > 0,
+        Video.follower_count > 0,
+        Video.follower_count <= cfg.get("fan_max", 50000),
+        Video.views >= cfg.get("views_min", 30000),
+        Video.fav_rate >= cfg.get("fav_rate", 0.012),
+        Video.coin_rate >= cfg.get("coin_rate", 0.0025),
+        Video.reply_rate >= cfg.get("reply_rate", 0.0020),
+        Video.fav_fan_ratio >= cfg.get("fav_fan_ratio", 0.02),
+    )
+
+
+def compile_rules(rules: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "basic_hot": compile_basic_hot(rules),
+        "low_fan_hot": compile_low_fan_hot(rules),
+    }
@@ -0,0 +1,57 @@
+"""Packed pass-1 scene scores of a video.
+
+``pack`` stores ``(pts_ms, score)`` pairs as ``header | pts_ms int32[n] | score uint16[n]``
+(score scaled by 65535), zlib-compressed. Frames scoring below ``FLOOR`` are dropped: no
+useful threshold is that low, and it keeps a long video's scores to a few kilobytes.
+"""
+
+from __future__ import annotations
+
+import struct
+import sys
+import zlib
+from array import array
+from typing import Iterable
+
+_MAGIC = b"SCN1"
+_HEADER = struct.Struct("<4sI")
+_SCALE = 65535
+FLOOR = 0.02
+
+
+def _to_bytes(typecode: str, values: Iterable[int]) -> bytes:
+    arr = array(typecode, values)
+    if sys.byteorder != "little":
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _from_bytes(typecode: str, raw: bytes) -> array:
+    arr = array(typecode)
+    arr.frombytes(raw)
+    if sys.byteorder != "little":
+        arr.byteswap()
+    return arr
+
+
+def pack(points: Iterable[tuple[int, float]]) -> bytes:
+    kept = [(max(0, int(ms)), min(max(score, 0.0), 1.0)) for ms, score in points if score >= FLOOR]
+    kept.sort()
+    body = _to_bytes("i", (ms for ms, _ in kept)) + _to_bytes("H", (round(score * _SCALE) for _, score in kept))
+    return _HEADER.pack(_MAGIC, len(kept)) + zlib.compress(body, 9)
+
+
+def unpack(blob: bytes) -> list[tuple[int, float]]:
+    magic, count = _HEADER.unpack_from(blob)
+    if magic != _MAGIC:
+        raise ValueError("not packed scene scores")
+    body = zlib.decompress(blob[_HEADER.size :])
+    times = _from_bytes("i", body[: count * 4])
+    scores = _from_bytes("H", body[count * 4 :])
+    return [(ms, score / _SCALE) for ms, score in zip(times, scores)]
+
+
+def cuts(blob: bytes, threshold: float, limit: int | None = None) -> list[int]:
+    """Timestamps (ms) scoring above ``threshold``, like ``select='gt(scene,threshold)'``."""
+    out = [ms for ms, score in unpack(blob) if score > threshold]
+    return out[:limit] if limit else out
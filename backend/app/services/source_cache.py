@@ -0,0 +1,193 @@
+"""Shared on-disk cache of downloaded source media.
+
+Entries live at ``{SOURCE_CACHE_DIR}/{bvid}/{cid}-{representation}{suffix}``, one per CDN
+representation, so frame jobs with a different mode or threshold and the ASR path reuse
+a single download. Each entry has a sibling ``.lock`` file:
+
+* readers hold a shared ``flock`` for as long as they use the file, so eviction skips it;
+* the first worker to miss upgrades to exclusive and downloads into ``.part``; workers
+  arriving meanwhile block on the lock and then find the finished file.
+
+Total size is kept under ``SOURCE_CACHE_MAX_MB`` by evicting least recently used entries
+(mtime, refreshed on every hit). Hit/miss counters are kept in Redis.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import os
+import re
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator
+from urllib.parse import urlparse
+
+import redis
+
+from app.core.config import settings
+
+_STATS_KEY = "source_cache:stats"
+_LOCK_SUFFIX = ".lock"
+_PART_SUFFIX = ".part"
+
+
+def enabled() -> bool:
+    return int(settings.source_cache_max_mb or 0) > 0
+
+
+def cache_dir() -> Path:
+    base = Path(__file__).resolve().parents[2]
+    return base / (settings.source_cache_dir or "source_cache")
+
+
+def _quota_bytes() -> int:
+    return max(0, int(settings.source_cache_max_mb or 0)) * 1024 * 1024
+
+
+def _safe(value) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", str(value))
+
+
+def entry_path(bvid: str, cid, representation: str, suffix: str = "") -> Path:
+    return cache_dir() / _safe(bvid) / f"{_safe(cid)}-{_safe(representation)}{_safe(suffix)}"
+
+
+def suffix_for(url: str) -> str:
+    """File extension of a CDN URL (``.m4s``, ``.mp4``, ``.flv``), kept so tools can guess the format."""
+    return os.path.splitext(urlparse(url).path)[1][:8]
+
+
+def _lock_path(path: Path) -> Path:
+    return path.with_name(path.name + _LOCK_SUFFIX)
+
+
+def _is_entry(path: Path) -> bool:
+    return path.is_file() and not path.name.endswith((_LOCK_SUFFIX, _PART_SUFFIX))
+
+
+def _record(fields: dict[str, int]) -> None:
+    try:
+        pipe = redis.Redis.from_url(settings.redis_url).pipeline()
+        for field, amount in fields.items():
+            pipe.hincrby(_STATS_KEY, field, amount)
+        pipe.execute()
+    except redis.RedisError:
+        pass
+
+
+@contextmanager
+def open_source(
+    bvid: str,
+    cid,
+    representation: str,
+    download: Callable[[str], None] | None = None,
+    suffix: str = "",
+) -> Iterator[str | None]:
+    """Yield a local path for one representation, downloading it at most once across workers.
+
+    ``download(path)`` writes the file; without it this is a lookup that yields ``None`` on a
+    miss (and does not count it). The entry cannot be evicted until the block exits.
+    """
+    path = entry_path(bvid, cid, representation, suffix)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(_lock_path(path), "a+b") as lock:
+        fcntl.flock(lock, fcntl.LOCK_SH)
+        downloaded = False
+        if not path.exists():
+            if download is None:
+                yield None
+                return
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            # Another worker may have finished the download while this one waited.
+            if not path.exists():
+                part = path.with_name(path.name + _PART_SUFFIX)
+                try:
+                    download(str(part))
+                    os.replace(part, path)
+                except BaseException:
+                    part.unlink(missing_ok=True)
+                    raise
+                downloaded = True
+            fcntl.flock(lock, fcntl.LOCK_SH)
+        os.utime(path)
+        size = path.stat().st_size
+        if downloaded:
+            _record({"misses": 1, "bytes_downloaded": size})
+            evict()
+        else:
+            _record({"hits": 1, "bytes_saved": size})
+        yield str(path)
+
+
+def _entries() -> list[tuple[float, int, Path]]:
+    root = cache_dir()
+    if not root.exists():
+        return []
+    out = []
+    for path in root.glob("*/*"):
+        if not _is_entry(path):
+            continue
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        out.append((stat.st_mtime, stat.st_size, path))
+    return out
+
+
+def evict(quota_bytes: int | None = None) -> dict[str, int]:
+    """Remove least recently used entries until the cache fits the quota.
+
+    Entries that are being read or downloaded are skipped, as are ``.part`` files whose
+    download is still running; orphaned ones (a worker died mid-download) are removed.
+    """
+    quota = _quota_bytes() if quota_bytes is None else quota_bytes
+    entries = sorted(_entries())
+    total = sum(size for _, size, _ in entries)
+    evicted = 0
+    evicted_bytes = 0
+    for _, size, path in entries:
+        if total <= quota:
+            break
+        with open(_lock_path(path), "a+b") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                continue
+            path.unlink(missing_ok=True)
+        total -= size
+        evicted += 1
+        evicted_bytes += size
+
+    for part in cache_dir().glob(f"*/*{_PART_SUFFIX}"):
+        target = part.with_name(part.name[: -len(_PART_SUFFIX)])
+        with open(_lock_path(target), "a+b") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                continue
+            part.unlink(missing_ok=True)
+
+    if evicted:
+        _record({"evictions": evicted, "evicted_bytes": evicted_bytes})
+    return {"evicted": evicted, "evicted_bytes": evicted_bytes, "bytes": total}
+
+
+def read_stats() -> dict[str, int | float]:
+    """Counters since the Redis key was created, plus current disk usage."""
+    stats = {"hits": 0, "misses": 0, "bytes_saved": 0, "bytes_downloaded": 0, "evictions": 0, "evicted_bytes": 0}
+    try:
+        raw = redis.Redis.from_url(settings.redis_url).hgetall(_STATS_KEY)
+    except redis.RedisError:
+        raw = {}
+    for key, value in raw.items():
+        stats[key.decode()] = int(value)
+    lookups = stats["hits"] + stats["misses"]
+    entries = _entries()
+    return {
+        **stats,
+        "hit_rate": round(stats["hits"] / lookups, 4) if lookups else 0.0,
+        "entries": len(entries),
+        "bytes": sum(size for _, size, _ in entries),
+        "quota_bytes": _quota_bytes(),
+    }
@@ -12,6 +12,7 @@ from app.services.bili_crawler import CrawlerBiliClient
 from app.core.config import settings
 from app.services.settings_service import get_or_create_settings
 from app.services.rule_engine import evaluate_rules
+from app.services.keyword_matcher import matcher_for_task
 
 
 class TaskRunner:
@@ -46,6 +47,7 @@ class TaskRunner:
             "low_fan_hot": 0,
             "failed_items": 0,
             "excluded": 0,
+            "keyword_hits": 0,
         }
         error_samples: list[dict[str, str]] = []
 
@@ -80,12 +82,12 @@ class TaskRunner:
                     record_error("search", str(exc), {"keyword": keyword})
 
             counts["fetched"] = len(candidates)
-            exclude_words = [w.strip().lower() for w in (task.exclude_words or []) if w and w.strip()]
-            if exclude_words:
+            exclude_matcher = matcher_for_task(task, "exclude_words")
+            if exclude_matcher:
                 filtered: list[dict[str, Any]] = []
                 for item in candidates:
-                    title = (item.get("title") or "").lower()
-                    if title and any(word in title for word in exclude_words):
+                    title = item.get("title") or ""
+                    if title and exclude_matcher.search(title):
                         counts["excluded"] += 1
                         continue
                     filtered.append(item)
@@ -344,6 +346,12 @@ class TaskRunner:
             if is_new:
                 counts["inserted"] += 1
 
+        subtitle_text = video.subtitle.text if video.subtitle else None
+        hits = matcher_for_task(task, "keywords").find(video.title, subtitle_text)
+        link.keyword_hits = hits
+        if hits:
+            counts["keyword_hits"] = counts.get("keyword_hits", 0) + 1
+
         if not video.subtitle:
             subtitle = Subtitle(bvid=bvid, status="none")
             self.db.add(subtitle)
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime, timedelta
+from typing import Any
+
+from celery.schedules import crontab_parser
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models import Task
+
+# All schedule times are evaluated against naive UTC datetimes, like every other
+# timestamp stored by the app (``datetime.utcnow()``).
+_INTERVAL_EPOCH = datetime(2000, 1, 1)
+_CRON_SEARCH_DAYS = 366 * 5
+
+
+def _parse_hhmm(value: str | None) -> tuple[int, int]:
+    raw = (value or "09:00").strip()
+    parts = raw.split(":")
+    try:
+        hour = int(parts[0])
+        minute = int(parts[1]) if len(parts) > 1 else 0
+    except ValueError:
+        raise ValueError(f"invalid time: {value}")
+    if not (0 <= hour <= 23 and 0 <= minute <= 59):
+        raise ValueError(f"invalid time: {value}")
+    return hour, minute
+
+
+def _parse_cron(expr: str | None) -> tuple[set[int], set[int], set[int], set[int], set[int], bool, bool]:
+    fields = (expr or "").split()
+    if len(fields) != 5:
+        raise ValueError(f"invalid cron expression: {expr}")
+    minute, hour, dom, month, dow = fields
+    days_of_week = {d % 7 for d in crontab_parser(8).parse(dow)}
+    return (
+        crontab_parser(60).parse(minute),
+        crontab_parser(24).parse(hour),
+        crontab_parser(31, 1).parse(dom),
+        crontab_parser(12, 1).parse(month),
+        days_of_week,
+        dom.strip() != "*",
+        dow.strip() != "*",
+    )
+
+
+def _spread_offset(schedule: dict[str, Any], task_id: str | None) -> timedelta:
+    """Stable per-task offset in ``[0, spread_minutes)`` to flatten bursts at popular times."""
+    spread = int(schedule.get("spread_minutes") or 0)
+    if spread <= 0 or not task_id:
+        return timedelta(0)
+    digest = int(hashlib.sha1(task_id.encode("utf-8")).hexdigest(), 16)
+    return timedelta(seconds=digest % (spread * 60))
+
+
+def _next_daily(schedule: dict[str, Any], after: datetime) -> datetime:
+    hour, minute = _parse_hhmm(schedule.get("time"))
+    candidate = after.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if candidate <= after:
+        candidate += timedelta(days=1)
+    return candidate
+
+
+def _next_interval(schedule: dict[str, Any], after: datetime) -> datetime:
+    minutes = int(schedule.get("minutes") or 0)
+    if minutes <= 0:
+        raise ValueError("interval schedule requires minutes > 0")
+    step = timedelta(minutes=minutes)
+    # Slots are aligned to a fixed epoch so restarts and edits do not drift them.
+    slots = (after - _INTERVAL_EPOCH) // step + 1
+    return _INTERVAL_EPOCH + slots * step
+
+
+def _next_cron(schedule: dict[str, Any], after: datetime) -> datetime:
+    minutes, hours, days, months, weekdays, dom_set, dow_set = _parse_cron(schedule.get("cron"))
+    start = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    day = start.replace(hour=0, minute=0)
+    for _ in range(_CRON_SEARCH_DAYS):
+        if day.month in months:
+            dom_hit = day.day in days
+            dow_hit = (day.weekday() + 1) % 7 in weekdays
+            # Standard cron: when both day fields are restricted, either may match.
+            day_hit = (dom_hit or dow_hit) if (dom_set and dow_set) else (dom_hit and dow_hit)
+            if day_hit:
+                for hour in sorted(hours):
+                    for minute in sorted(minutes):
+                        candidate = day.replace(hour=hour, minute=minute)
+                        if candidate >= start:
+                            return candidate
+        day += timedelta(days=1)
+    raise ValueError(f"cron expression never fires: {schedule.get('cron')}")
+
+
+def compute_next_run(schedule: dict[str, Any] | None, after: datetime, task_id: str | None = None) -> datetime | None:
+    """Next fire time strictly after ``after``; ``None`` for manual/unknown schedules.
+
+    Supported ``schedule`` shapes:
+    - ``{"type": "daily", "time": "HH:MM"}``
+    - ``{"type": "interval", "minutes": 90}``
+    - ``{"type": "cron", "cron": "*/30 8-22 * * 1-5"}``
+    Any of them may add ``spread_minutes`` to shift this task by a stable offset.
+    Raises ``ValueError`` for malformed schedules.
+    """
+    schedule = schedule or {}
+    kind = schedule.get("type")
+    if kind == "daily":
+        compute = _next_daily
+    elif kind == "interval":
+        compute = _next_interval
+    elif kind == "cron":
+        compute = _next_cron
+    else:
+        return None
+    offset = _spread_offset(schedule, task_id)
+    return compute(schedule, after - offset) + offset
+
+
+def refresh_next_run(task: Task, now: datetime | None = None) -> datetime | None:
+    now = now or datetime.utcnow()
+    if task.status != "enabled":
+        task.next_run_at = None
+        return None
+    try:
+        task.next_run_at = compute_next_run(task.schedule, now, task.id)
+    except ValueError:
+        task.next_run_at = None
+    return task.next_run_at
+
+
+def backfill_next_runs(db: Session) -> int:
+    """Populate ``next_run_at`` for enabled tasks created before the column existed."""
+    tasks = (
+        db.execute(select(Task).where(Task.status == "enabled", Task.next_run_at.is_(None)))
+        .scalars()
+        .all()
+    )
+    updated = 0
+    now = datetime.utcnow()
+    for task in tasks:
+        if refresh_next_run(task, now):
+            db.add(task)
+            updated += 1
+    if updated:
+        db.commit()
+    return updated
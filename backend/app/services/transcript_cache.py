@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+
+from app.core.database import dialect_insert
+from app.models import TranscriptCache
+from app.services import transcript_segments
+
+
+def lookup(db: Session, audio_hash: str, provider: str, model: str) -> TranscriptCache | None:
+    entry = db.get(TranscriptCache, (audio_hash, provider, model))
+    if entry is None:
+        return None
+    entry.hit_count = int(entry.hit_count or 0) + 1
+    entry.last_hit_at = datetime.utcnow()
+    db.add(entry)
+    return entry
+
+
+def segments_of(entry: TranscriptCache) -> list[dict]:
+    if entry.segments:
+        return transcript_segments.unpack(entry.segments)
+    # Cached before segments were stored: the whole text as one untimed segment.
+    return [{"start_ms": 0, "end_ms": int(entry.duration_ms or 0), "text": entry.text}]
+
+
+def store(db: Session, audio_hash: str, provider: str, model: str, segments: list[dict], duration_ms: int) -> None:
+    """Insert or overwrite the transcript for this key.
+
+    An upsert, so two workers finishing the same audio at once both succeed instead of the
+    second failing on the primary key; the hit counters of an existing row are kept.
+    """
+    segments = transcript_segments.normalize(segments)
+    stmt = dialect_insert(db)(TranscriptCache).values(
+        audio_hash=audio_hash,
+        provider=provider,
+        model=model,
+        text=transcript_segments.to_text(segments),
+        segments=transcript_segments.pack(segments),
+        duration_ms=duration_ms,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[TranscriptCache.audio_hash, TranscriptCache.provider, TranscriptCache.model],
+        set_={name: stmt.excluded[name] for name in ("text", "segments", "duration_ms")},
+    )
+    db.execute(stmt)
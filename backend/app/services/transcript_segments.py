@@ -0,0 +1,189 @@
+"""Packed storage for timestamped transcript segments.
+
+A segment is ``{"start_ms": int, "end_ms": int, "text": str}``. ``pack`` stores a list of
+them as::
+
+    header | starts int32[n] | ends int32[n] | block offsets uint32[b + 1] | blocks
+
+Start/end arrays stay uncompressed so a window is located by bisecting them in place; the
+texts are grouped into blocks of ``_BLOCK_SEGMENTS`` segments and each block is compressed
+on its own (zstd when ``zstandard`` is installed, zlib otherwise), so ``window`` only
+decompresses the blocks that overlap the requested range.
+"""
+
+from __future__ import annotations
+
+import struct
+import sys
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Iterable
+
+_MAGIC = b"TSG1"
+# magic, codec, count, block size, longest segment (ms), block count
+_HEADER = struct.Struct("<4sB3xIIII")
+_CODEC_ZLIB = 1
+_CODEC_ZSTD = 2
+_BLOCK_SEGMENTS = 64
+_ZSTD_LEVEL = 9
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+
+def _compress(data: bytes) -> tuple[int, bytes]:
+    zstandard = _zstd()
+    if zstandard is not None:
+        return _CODEC_ZSTD, zstandard.ZstdCompressor(level=_ZSTD_LEVEL).compress(data)
+    return _CODEC_ZLIB, zlib.compress(data, 9)
+
+
+def _decompress(codec: int, data: bytes) -> bytes:
+    if codec == _CODEC_ZSTD:
+        zstandard = _zstd()
+        if zstandard is None:
+            raise RuntimeError("transcript is zstd-compressed but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == _CODEC_ZLIB:
+        return zlib.decompress(data)
+    raise ValueError(f"unknown transcript codec: {codec}")
+
+
+def _to_bytes(typecode: str, values: Iterable[int]) -> bytes:
+    arr = array(typecode, values)
+    if sys.byteorder != "little":
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _view(blob: bytes, offset: int, count: int, typecode: str):
+    """Indexable little-endian int view over ``blob`` without copying (on little-endian hosts)."""
+    raw = memoryview(blob)[offset : offset + count * 4]
+    if sys.byteorder == "little":
+        return raw.cast(typecode)
+    arr = array(typecode)
+    arr.frombytes(raw)
+    arr.byteswap()
+    return arr
+
+
+def normalize(segments: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Drop empty texts, clamp times to ``>= 0`` / ``end >= start`` and sort by start."""
+    out = []
+    for seg in segments:
+        text = str(seg.get("text") or "").strip()
+        if not text:
+            continue
+        start = max(0, int(seg.get("start_ms") or 0))
+        end = max(start, int(seg.get("end_ms") or 0))
+        out.append({"start_ms": start, "end_ms": end, "text": text})
+    out.sort(key=lambda seg: seg["start_ms"])
+    return out
+
+
+def to_text(segments: Iterable[dict[str, Any]]) -> str:
+    """The flat ``Subtitle.text`` form: one segment per line."""
+    return "\n".join(seg["text"] for seg in segments if seg.get("text"))
+
+
+def pack(segments: Iterable[dict[str, Any]]) -> bytes:
+    segments = normalize(segments)
+    starts = [seg["start_ms"] for seg in segments]
+    ends = [seg["end_ms"] for seg in segments]
+    longest = max((end - start for start, end in zip(starts, ends)), default=0)
+
+    codec = _CODEC_ZLIB
+    blocks: list[bytes] = []
+    for first in range(0, len(segments), _BLOCK_SEGMENTS):
+        texts = [seg["text"].encode("utf-8") for seg in segments[first : first + _BLOCK_SEGMENTS]]
+        codec, block = _compress(_to_bytes("I", (len(t) for t in texts)) + b"".join(texts))
+        blocks.append(block)
+    offsets = [0]
+    for block in blocks:
+        offsets.append(offsets[-1] + len(block))
+
+    header = _HEADER.pack(_MAGIC, codec, len(segments), _BLOCK_SEGMENTS, longest, len(blocks))
+    return b"".join(
+        [header, _to_bytes("i", starts), _to_bytes("i", ends), _to_bytes("I", offsets), *blocks]
+    )
+
+
+class _Packed:
+    def __init__(self, blob: bytes):
+        magic, codec, count, block_size, longest, block_count = _HEADER.unpack_from(blob)
+        if magic != _MAGIC:
+            raise ValueError("not a packed transcript")
+        self.blob = blob
+        self.codec = codec
+        self.count = count
+        self.block_size = block_size
+        self.longest = longest
+        offset = _HEADER.size
+        self.starts = _view(blob, offset, count, "i")
+        offset += count * 4
+        self.ends = _view(blob, offset, count, "i")
+        offset += count * 4
+        self.offsets = _view(blob, offset, block_count + 1, "I")
+        self.data_at = offset + (block_count + 1) * 4
+        self._blocks: dict[int, list[str]] = {}
+
+    def text(self, index: int) -> str:
+        block_no, pos = divmod(index, self.block_size)
+        texts = self._blocks.get(block_no)
+        if texts is None:
+            raw = _decompress(
+                self.codec,
+                self.blob[self.data_at + self.offsets[block_no] : self.data_at + self.offsets[block_no + 1]],
+            )
+            size = min(self.block_size, self.count - block_no * self.block_size)
+            lengths = _view(raw, 0, size, "I")
+            texts = []
+            at = size * 4
+            for length in lengths:
+                texts.append(raw[at : at + length].decode("utf-8"))
+                at += length
+            self._blocks[block_no] = texts
+        return texts[pos]
+
+    def segment(self, index: int) -> dict[str, Any]:
+        return {"start_ms": self.starts[index], "end_ms": self.ends[index], "text": self.text(index)}
+
+
+def info(blob: bytes) -> dict[str, int]:
+    """Segment count and end of the last segment, read from the arrays only."""
+    packed = _Packed(blob)
+    duration = 0
+    if packed.count:
+        # Ends are not sorted; the last ``longest`` ms of starts bounds the candidates.
+        lo = bisect_left(packed.starts, packed.starts[packed.count - 1] - packed.longest)
+        duration = max(packed.ends[i] for i in range(lo, packed.count))
+    return {"segment_count": packed.count, "duration_ms": duration}
+
+
+def window(blob: bytes, from_ms: int | None = None, to_ms: int | None = None) -> list[dict[str, Any]]:
+    """Segments overlapping ``[from_ms, to_ms]``; only the blocks holding them are decompressed."""
+    packed = _Packed(blob)
+    if not packed.count:
+        return []
+    lo = 0
+    hi = packed.count
+    if from_ms is not None:
+        # A segment reaching ``from_ms`` cannot start more than ``longest`` ms earlier.
+        lo = bisect_left(packed.starts, from_ms - packed.longest)
+    if to_ms is not None:
+        hi = bisect_right(packed.starts, to_ms)
+    return [
+        packed.segment(index)
+        for index in range(lo, hi)
+        if from_ms is None or packed.ends[index] >= from_ms
+    ]
+
+
+def unpack(blob: bytes) -> list[dict[str, Any]]:
+    return window(blob)
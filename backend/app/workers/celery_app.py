@@ -1,5 +1,6 @@
 from celery import Celery
 from celery.schedules import crontab
+from kombu import Queue
 
 from app.core.config import settings
 
@@ -18,6 +19,10 @@ def _parse_hhmm(value: str, default: str = "03:00") -> tuple[int, int]:
     minute = max(0, min(59, minute))
     return hour, minute
 
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 9
+
 celery_app = Celery(
     "bili_admin",
     broker=settings.celery_broker_url,
@@ -42,13 +47,79 @@ if settings.refresh_all_enabled:
 
 creator_interval = int(settings.creator_watch_interval_minutes or 45)
 creator_interval = max(30, min(60, creator_interval))
+# Each tick only syncs creators whose adaptive next_check_at is due.
+creator_tick = max(1, min(creator_interval, int(settings.creator_watch_tick_minutes or 5)))
 beat_schedule["sync-creator-watch"] = {
     "task": "sync_creator_watch",
-    "schedule": float(creator_interval * 60),
+    "schedule": float(creator_tick * 60),
+}
+
+# Async ASR jobs (Doubao standard) are polled in batches instead of sleeping in a worker.
+beat_schedule["poll-asr-jobs"] = {
+    "task": "poll_asr_jobs",
+    "schedule": float(max(5, int(settings.asr_poll_tick_seconds or 15))),
+}
+
+# Frame storage GC: retention, orphan cleanup and quota eviction within a time budget.
+frame_gc_budget = max(10, int(settings.frame_gc_budget_seconds or 120))
+beat_schedule["gc-frame-storage"] = {
+    "task": "gc_frame_storage",
+    "schedule": float(max(5, int(settings.frame_gc_interval_minutes or 60)) * 60),
+}
+
+# Worker topology (see README): IO-bound crawl/comments run wide, CPU-heavy asr/frames run
+# narrow with prefetch 1, so a backlog in one queue never starves the others.
+task_queues = [
+    Queue("celery", routing_key="celery"),
+    Queue("crawl", routing_key="crawl"),
+    Queue("comments", routing_key="comments"),
+    Queue("asr", routing_key="asr"),
+    Queue("frames", routing_key="frames"),
+    Queue("maintenance", routing_key="maintenance"),
+]
+
+task_routes = {
+    "dispatch_due_tasks": {"queue": "celery"},
+    "poll_asr_jobs": {"queue": "celery"},
+    "run_task": {"queue": "crawl"},
+    "sync_creator_watch": {"queue": "crawl"},
+    "backfill_creator": {"queue": "crawl"},
+    "resolve_native_subtitles": {"queue": "crawl"},
+    "crawl_comments": {"queue": "comments"},
+    "extract_subtitle": {"queue": "asr"},
+    "extract_frames": {"queue": "frames"},
+    "refresh_all_videos": {"queue": "maintenance"},
+    "gc_frame_storage": {"queue": "maintenance"},
+}
+
+# (soft, hard) seconds; the soft limit raises inside the task so it can mark its job failed.
+task_time_limits = {
+    "dispatch_due_tasks": (50, 60),
+    "poll_asr_jobs": (110, 120),
+    "run_task": (30 * 60, 35 * 60),
+    "sync_creator_watch": (creator_interval * 60 - 120, creator_interval * 60 - 60),
+    "backfill_creator": (15 * 60, 17 * 60),
+    "resolve_native_subtitles": (10 * 60, 12 * 60),
+    "crawl_comments": (10 * 60, 12 * 60),
+    "extract_subtitle": (30 * 60, 35 * 60),
+    "extract_frames": (30 * 60, 35 * 60),
+    "refresh_all_videos": (3 * 3600, 3 * 3600 + 300),
+    "gc_frame_storage": (frame_gc_budget + 120, frame_gc_budget + 180),
 }
 
 celery_app.conf.update(
     task_track_started=True,
     timezone="Asia/Shanghai",
     beat_schedule=beat_schedule,
+    task_queues=task_queues,
+    task_default_queue="celery",
+    task_routes=task_routes,
+    task_annotations={
+        name: {"soft_time_limit": soft, "time_limit": hard} for name, (soft, hard) in task_time_limits.items()
+    },
+    # Priorities 0-9; on the Redis broker 0 is served first.
+    task_queue_max_priority=PRIORITY_LOW,
+    task_default_priority=PRIORITY_NORMAL,
+    broker_transport_options={"queue_order_strategy": "priority", "priority_steps": list(range(10))},
+    worker_prefetch_multiplier=max(1, int(settings.celery_prefetch_multiplier or 1)),
 )
@@ -1,16 +1,25 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 import redis
-from sqlalchemy import select
+from sqlalchemy import or_, select, update
 
 from app.core.config import settings
 from app.core.database import SessionLocal
+import fcntl
+import functools
 import glob
+import json
+import math
 import os
 import shutil
+import struct
 import subprocess
+import tempfile
 import time
 import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from contextlib import ExitStack, contextmanager
 from pathlib import Path
+from uuid import uuid4
 
 import httpx
 
@@ -27,10 +36,21 @@ from app.models import (
 )
 from app.services.bili_client import MockBiliClient
 from app.services.bili_crawler import CrawlerBiliClient
-from app.services.asr_service import transcribe_audio_url
+from app.services import frame_files, frame_gc, frame_hash, scene_scores, source_cache, transcript_cache, transcript_segments
+from app.services.asr_service import PendingTranscript, poll_transcript, transcribe_audio_url
 from app.services.settings_service import get_or_create_settings
-from app.services.creator_sync import sync_creator_videos
+from app.services.creator_sync import (
+    apply_creator_profile,
+    fetch_creator_profile,
+    fetch_creator_videos,
+    learn_post_interval,
+    profile_is_stale,
+    schedule_next_check,
+    sync_creator_videos,
+)
+from app.services.keyword_matcher import annotate_keyword_hits
 from app.services.task_runner import TaskRunner
+from app.services.task_schedule import backfill_next_runs, refresh_next_run
 from app.services.product_links import (
     build_product_key,
     expand_url,
@@ -39,7 +59,18 @@ from app.services.product_links import (
     product_domain_whitelist,
     short_link_domains,
 )
-from app.workers.celery_app import celery_app
+from app.workers.celery_app import PRIORITY_HIGH, PRIORITY_NORMAL, celery_app
+
+_DISPATCH_BATCH_SIZE = 500
+_CATCH_UP_GRACE_SECONDS = 300
+_CREATOR_WATCH_LOCK = "sync_creator_watch:running"
+_BACKFILL_CHUNK = 50
+_ASR_POLL_LOCK = "poll_asr_jobs:running"
+_SUBTITLE_BATCH_TTL_SECONDS = 24 * 3600
+_FRAME_PROGRESS_TTL_SECONDS = 3600
+_FRAME_CANCEL_TTL_SECONDS = 24 * 3600
+# Set once this worker process has filled ``next_run_at`` for tasks that predate the column.
+_next_runs_backfilled = False
 
 
 @celery_app.task(name="run_task")
@@ -58,24 +89,53 @@ def run_task(task_id: str, trigger: str = "schedule"):
 
 @celery_app.task(name="dispatch_due_tasks")
 def dispatch_due_tasks():
+    global _next_runs_backfilled
     db = SessionLocal()
     r = redis.Redis.from_url(settings.redis_url)
     try:
-        tasks = db.execute(select(Task).where(Task.status == "enabled")).scalars().all()
+        if not _next_runs_backfilled:
+            backfill_next_runs(db)
+            _next_runs_backfilled = True
         now = datetime.utcnow()
-        today = now.strftime("%Y-%m-%d")
+        query = (
+            select(Task)
+            .where(Task.status == "enabled", Task.next_run_at.isnot(None), Task.next_run_at <= now)
+            .order_by(Task.next_run_at.asc())
+            .limit(_DISPATCH_BATCH_SIZE)
+        )
+        if db.bind.dialect.name != "sqlite":
+            query = query.with_for_update(skip_locked=True)
+        tasks = db.execute(query).scalars().all()
 
+        dispatched = 0
+        skipped = 0
+        failed = 0
         for task in tasks:
+            due_at = task.next_run_at
             schedule = task.schedule or {}
-            if schedule.get("type") != "daily":
-                continue
-            time_str = schedule.get("time") or "09:00"
-            if time_str != now.strftime("%H:%M"):
-                continue
-            lock_key = f"task:{task.id}:{today}:{time_str}"
-            if not r.set(lock_key, "1", nx=True, ex=48 * 3600):
-                continue
-            run_task.delay(task.id, trigger="schedule")
+            # Missed windows (Beat/worker downtime) collapse into a single catch-up run.
+            late = (now - due_at).total_seconds() > _CATCH_UP_GRACE_SECONDS
+            if schedule.get("catch_up", True) or not late:
+                # The lock is keyed by the due time, so a run enqueued before a failed commit
+                # is not enqueued again when the next tick sees the same ``next_run_at``.
+                lock_key = f"task:{task.id}:{due_at.isoformat()}"
+                if r.set(lock_key, "1", nx=True, ex=48 * 3600):
+                    try:
+                        run_task.delay(task.id, trigger="schedule")
+                    except Exception:  # noqa: BLE001
+                        # Broker unreachable: keep ``next_run_at`` so the next tick retries.
+                        r.delete(lock_key)
+                        failed += 1
+                        continue
+                    dispatched += 1
+                else:
+                    skipped += 1
+            else:
+                skipped += 1
+            refresh_next_run(task, now)
+            db.add(task)
+        db.commit()
+        return {"dispatched": dispatched, "skipped": skipped, "failed": failed}
     finally:
         db.close()
 
@@ -169,69 +229,184 @@ def refresh_all_videos():
         db.close()
 
 
+def _creator_watch_lock_seconds() -> int:
+    return max(30, min(60, int(settings.creator_watch_interval_minutes or 45))) * 60
+
+
+def _fetch_creator_watch(client, up_id: str, since, limit: int, refresh_profile: bool) -> dict:
+    # Runs in a worker thread: network only, results are applied on the caller's session.
+    result: dict = {"profile": None, "items": None, "error": None}
+    try:
+        if refresh_profile:
+            result["profile"] = fetch_creator_profile(client, up_id)
+        result["items"] = fetch_creator_videos(client, up_id, limit=limit, since=since)
+    except Exception as exc:  # noqa: BLE001
+        result["error"] = str(exc)
+    return result
+
+
 @celery_app.task(name="sync_creator_watch")
 def sync_creator_watch():
     db = SessionLocal()
+    lock_key = None
     try:
+        now = datetime.utcnow()
         creators = (
-            db.execute(select(FollowedCreator).where(FollowedCreator.monitor_enabled == True))  # noqa: E712
+            db.execute(
+                select(FollowedCreator).where(
+                    FollowedCreator.monitor_enabled == True,  # noqa: E712
+                    or_(FollowedCreator.next_check_at.is_(None), FollowedCreator.next_check_at <= now),
+                )
+            )
             .scalars()
             .all()
         )
         if not creators:
-            return {"status": "skipped", "reason": "no creators"}
+            return {"status": "skipped", "reason": "no creators due"}
+
+        r = redis.Redis.from_url(settings.redis_url)
+        if not r.set(_CREATOR_WATCH_LOCK, "1", nx=True, ex=_creator_watch_lock_seconds()):
+            return {"status": "skipped", "reason": "already running"}
+        lock_key = _CREATOR_WATCH_LOCK
 
         client = _build_creator_client(db)
         limit = max(1, int(settings.creator_watch_fetch_limit or 20))
-        now = datetime.utcnow()
+        ttl_hours = int(settings.creator_profile_ttl_hours or 0)
+        workers = max(1, int(settings.creator_watch_concurrency or 1))
         updated = 0
         inserted = 0
         failed = 0
+        profiles_refreshed = 0
 
-        for creator in creators:
-            creator.last_checked_at = now
-            try:
-                profile = client.get_up_profile(creator.up_id) if creator.up_id else {}
-                if profile:
-                    if profile.get("up_name"):
-                        creator.up_name = profile.get("up_name") or creator.up_name
-                    if profile.get("avatar"):
-                        creator.avatar = profile.get("avatar") or creator.avatar
-
-                up_info = client.get_up_info(creator.up_id) if creator.up_id else {}
-                follower_count = int(up_info.get("follower_count", 0) or 0)
-                following_count = int(up_info.get("following_count", 0) or 0)
-
-                stats = client.get_up_stats(creator.up_id) if creator.up_id else {}
-                creator.follower_count = follower_count
-                creator.following_count = following_count
-                creator.view_count = int(stats.get("view_count", creator.view_count) or 0)
-                creator.like_count = int(stats.get("like_count", creator.like_count) or 0)
-
-                sync_result = sync_creator_videos(
-                    db,
-                    creator,
+        by_id = {creator.up_id: creator for creator in creators if creator.up_id}
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(
+                    _fetch_creator_watch,
                     client,
-                    limit=limit,
-                    now=now,
-                )
-                inserted += sync_result["inserted"]
-                updated += sync_result["updated"]
-                failed += sync_result["failed"]
+                    creator.up_id,
+                    creator.latest_publish_at,
+                    limit,
+                    profile_is_stale(creator, now, ttl_hours),
+                ): creator.up_id
+                for creator in by_id.values()
+            }
+            for future in as_completed(futures):
+                creator = by_id[futures[future]]
+                result = future.result()
+                creator.last_checked_at = now
+                try:
+                    if result["error"]:
+                        raise RuntimeError(result["error"])
+                    if result["profile"] is not None:
+                        apply_creator_profile(creator, result["profile"], now)
+                        profiles_refreshed += 1
+
+                    sync_result = sync_creator_videos(
+                        db,
+                        creator,
+                        client,
+                        now=now,
+                        items=result["items"],
+                    )
+                    inserted += sync_result["inserted"]
+                    updated += sync_result["updated"]
+                    failed += sync_result["failed"]
+                    if sync_result["inserted"] or creator.post_interval_hours is None:
+                        db.flush()
+                        creator.post_interval_hours = learn_post_interval(db, creator.up_id)
+
+                    creator.last_success_at = now
+                    creator.last_error_at = None
+                    creator.last_error_msg = None
+                    schedule_next_check(creator, now)
+                    db.add(creator)
+                    db.commit()
+                except Exception as exc:  # noqa: BLE001
+                    db.rollback()
+                    failed += 1
+                    creator.last_checked_at = now
+                    creator.last_error_at = now
+                    creator.last_error_msg = str(exc)
+                    schedule_next_check(creator, now)
+                    db.add(creator)
+                    db.commit()
+
+        return {
+            "status": "done",
+            "inserted": inserted,
+            "updated": updated,
+            "failed": failed,
+            "profiles_refreshed": profiles_refreshed,
+        }
+    finally:
+        if lock_key:
+            r.delete(lock_key)
+        db.close()
+
+
+@celery_app.task(name="backfill_creator")
+def backfill_creator(up_id: str, days_limit: int = 30, refresh_profile: bool = True):
+    """Pull a creator's recent videos after follow/refresh, reporting progress on the creator row."""
+    db = SessionLocal()
+    try:
+        creator = db.get(FollowedCreator, up_id)
+        if not creator:
+            return {"status": "skipped", "reason": "creator not found"}
+
+        now = datetime.utcnow()
+        creator.backfill_status = "running"
+        creator.backfill_total = 0
+        creator.backfill_done = 0
+        db.add(creator)
+        db.commit()
 
-                creator.last_success_at = now
-                creator.last_error_at = None
-                creator.last_error_msg = None
+        inserted = 0
+        updated = 0
+        failed = 0
+        try:
+            client = _build_creator_client(db)
+            if refresh_profile:
+                # Committed before the video pull, so the name is right even if the pull fails.
+                apply_creator_profile(creator, fetch_creator_profile(client, up_id), now)
                 db.add(creator)
                 db.commit()
-            except Exception as exc:  # noqa: BLE001
-                failed += 1
-                creator.last_error_at = now
-                creator.last_error_msg = str(exc)
+            items = fetch_creator_videos(client, up_id, days_limit=days_limit)
+            creator.backfill_total = len(items)
+            db.add(creator)
+            db.commit()
+
+            for start in range(0, len(items), _BACKFILL_CHUNK):
+                chunk = items[start : start + _BACKFILL_CHUNK]
+                result = sync_creator_videos(db, creator, client, now=now, items=chunk)
+                inserted += result["inserted"]
+                updated += result["updated"]
+                failed += result["failed"]
+                creator.backfill_done = start + len(chunk)
                 db.add(creator)
                 db.commit()
 
-        return {"status": "done", "inserted": inserted, "updated": updated, "failed": failed}
+            creator.post_interval_hours = learn_post_interval(db, up_id)
+            creator.last_checked_at = now
+            creator.last_success_at = now
+            creator.last_error_at = None
+            creator.last_error_msg = None
+            creator.backfill_status = "done"
+            schedule_next_check(creator, now)
+        except Exception as exc:  # noqa: BLE001
+            db.rollback()
+            creator.last_checked_at = now
+            creator.last_error_at = now
+            creator.last_error_msg = str(exc)
+            creator.backfill_status = "failed"
+        db.add(creator)
+        db.commit()
+        return {
+            "status": creator.backfill_status,
+            "inserted": inserted,
+            "updated": updated,
+            "failed": failed,
+        }
     finally:
         db.close()
 
@@ -265,56 +440,361 @@ def _comment_crawl_limit() -> int:
     return limit
 
 
-def _mark_subtitle(db, bvid: str, status: str, text: str | None = None, error: str | None = None) -> Subtitle:
+def _set_transcript(subtitle: Subtitle, segments: list[dict] | None) -> None:
+    if segments:
+        segments = transcript_segments.normalize(segments)
+    subtitle.text = transcript_segments.to_text(segments) if segments else None
+    subtitle.segments = transcript_segments.pack(segments) if segments else None
+
+
+def _mark_subtitle(
+    db, bvid: str, status: str, segments: list[dict] | None = None, error: str | None = None
+) -> Subtitle:
     subtitle = db.get(Subtitle, bvid)
     if not subtitle:
         subtitle = Subtitle(bvid=bvid, status=status)
     subtitle.status = status
-    subtitle.text = text
+    _set_transcript(subtitle, segments)
     subtitle.error = error
+    subtitle.asr_job = None
+    subtitle.asr_next_poll_at = None
     db.add(subtitle)
     db.commit()
     return subtitle
 
 
-@celery_app.task(name="extract_subtitle")
-def extract_subtitle(bvid: str):
-    db = SessionLocal()
+def _asr_poll_delay(attempts: int) -> timedelta:
+    base = max(1, int(settings.doubao_poll_initial_seconds or 5))
+    cap = max(base, int(settings.doubao_poll_max_seconds or 60))
+    return timedelta(seconds=min(cap, base * 2 ** min(attempts, 16)))
+
+
+def _mark_subtitle_pending(db, bvid: str, pending: PendingTranscript, batch_id: str | None = None) -> None:
+    now = datetime.utcnow()
+    subtitle = _mark_subtitle(db, bvid, "extracting")
+    subtitle.asr_job = {**pending.to_job(), "submitted_at": now.isoformat(), "attempts": 0, "batch_id": batch_id}
+    subtitle.asr_next_poll_at = now + _asr_poll_delay(0)
+    db.add(subtitle)
+    db.commit()
+
+
+def _annotate_subtitle_hits(db, bvid: str) -> None:
     try:
-        video = db.get(Video, bvid)
-        if not video:
-            _mark_subtitle(db, bvid, "failed", error="video not found")
-            return {"error": "video not found"}
+        if annotate_keyword_hits(db, bvid):
+            db.commit()
+    except Exception:  # noqa: BLE001
+        db.rollback()
 
-        _mark_subtitle(db, bvid, "extracting")
+
+def _subtitle_batch_key(batch_id: str) -> str:
+    return f"subtitle_batch:{batch_id}"
+
+
+def start_subtitle_batch(batch_id: str, counts: dict[str, int]) -> None:
+    r = redis.Redis.from_url(settings.redis_url)
+    key = _subtitle_batch_key(batch_id)
+    pipe = r.pipeline()
+    pipe.hset(key, mapping=counts)
+    pipe.expire(key, _SUBTITLE_BATCH_TTL_SECONDS)
+    pipe.execute()
+
+
+def _bump_subtitle_batch(batch_id: str | None, counts: dict[str, int]) -> None:
+    if not batch_id:
+        return
+    try:
+        r = redis.Redis.from_url(settings.redis_url)
+        pipe = r.pipeline()
+        for field, amount in counts.items():
+            if amount:
+                pipe.hincrby(_subtitle_batch_key(batch_id), field, amount)
+        pipe.execute()
+    except redis.RedisError:
+        pass
+
+
+def read_subtitle_batch(batch_id: str) -> dict | None:
+    r = redis.Redis.from_url(settings.redis_url)
+    raw = r.hgetall(_subtitle_batch_key(batch_id))
+    if not raw:
+        return None
+    counts = {k.decode(): int(v) for k, v in raw.items()}
+
+    def get(field: str) -> int:
+        return counts.get(field, 0)
+
+    native_resolved = get("native_done") + get("asr_queued") + get("asr_disabled")
+    return {
+        "batch_id": batch_id,
+        "total": get("total"),
+        "queued": get("queued"),
+        "skipped": get("skipped"),
+        "missing": get("missing"),
+        "phases": {
+            "native": {
+                "done": get("native_done"),
+                "missed": get("asr_queued") + get("asr_disabled"),
+                "pending": max(0, get("queued") - native_resolved),
+            },
+            "asr": {
+                "queued": get("asr_queued"),
+                "done": get("asr_done"),
+                "failed": get("asr_failed"),
+                "pending": max(0, get("asr_queued") - get("asr_done") - get("asr_failed")),
+                "disabled": get("asr_disabled"),
+            },
+        },
+    }
+
+
+def _asr_priority(video: Video) -> int:
+    # Hot and favorited videos get ASR capacity first.
+    if video.basic_hot or video.low_fan_hot or video.is_favorited:
+        return PRIORITY_HIGH
+    return PRIORITY_NORMAL
+
+
+def _fetch_native_subtitle(client, bvid: str) -> list[dict] | None:
+    try:
+        return client.get_subtitle_segments(bvid) or None
+    except Exception:  # noqa: BLE001
+        return None
+
+
+@celery_app.task(name="resolve_native_subtitles")
+def resolve_native_subtitles(bvids: list[str], batch_id: str | None = None, priority: int | None = None):
+    """Phase 1: fetch platform subtitles concurrently; only the misses are queued for ASR."""
+    db = SessionLocal()
+    try:
+        videos = {v.bvid: v for v in db.execute(select(Video).where(Video.bvid.in_(bvids))).scalars()}
+        subtitles = {s.bvid: s for s in db.execute(select(Subtitle).where(Subtitle.bvid.in_(bvids))).scalars()}
         client = _build_subtitle_client(db)
-        text = client.get_subtitle(bvid)
-        if text:
-            _mark_subtitle(db, bvid, "done", text=text, error=None)
+        workers = max(1, int(settings.subtitle_native_concurrency or 1))
+
+        found: dict[str, list[dict]] = {}
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_fetch_native_subtitle, client, bvid): bvid for bvid in videos}
+            for future in as_completed(futures):
+                segments = future.result()
+                if segments:
+                    found[futures[future]] = segments
+
+        asr_enabled = bool(settings.asr_provider)
+        misses = [video for bvid, video in videos.items() if bvid not in found]
+        for bvid in videos:
+            if bvid not in found and asr_enabled:
+                continue
+            subtitle = subtitles.get(bvid) or Subtitle(bvid=bvid)
+            subtitle.status = "done" if bvid in found else "failed"
+            _set_transcript(subtitle, found.get(bvid))
+            subtitle.error = None if bvid in found else "asr disabled"
+            subtitle.asr_job = None
+            subtitle.asr_next_poll_at = None
+            db.add(subtitle)
+        db.commit()
+        for bvid in found:
+            _annotate_subtitle_hits(db, bvid)
+
+        queued = 0
+        if asr_enabled:
+            misses.sort(key=lambda v: (_asr_priority(v), -int(v.views or 0)))
+            for video in misses:
+                extract_subtitle.apply_async(
+                    args=[video.bvid],
+                    kwargs={"skip_native": True, "batch_id": batch_id},
+                    priority=priority if priority is not None else _asr_priority(video),
+                )
+                queued += 1
+
+        disabled = 0 if asr_enabled else len(misses)
+        _bump_subtitle_batch(batch_id, {"native_done": len(found), "asr_queued": queued, "asr_disabled": disabled})
+        return {"status": "done", "native": len(found), "asr_queued": queued, "asr_disabled": disabled}
+    finally:
+        db.close()
+
+
+@celery_app.task(name="extract_subtitle")
+def extract_subtitle(bvid: str, skip_native: bool = False, batch_id: str | None = None):
+    db = SessionLocal()
+    try:
+        result = _extract_subtitle(db, bvid, skip_native, batch_id)
+    finally:
+        db.close()
+    if result.get("status") == "done":
+        _bump_subtitle_batch(batch_id, {"asr_done": 1})
+    elif result.get("status") != "pending":
+        _bump_subtitle_batch(batch_id, {"asr_failed": 1})
+    return result
+
+
+@contextmanager
+def _cached_audio(bvid: str, audio: dict):
+    """Path of the audio if the shared source cache already holds it, else its URL.
+
+    ASR never downloads into the cache: a miss streams the URL through ffmpeg so
+    transcription starts before the download finishes. A muxed (``durl``) stream cached by a
+    frame job, or a DASH track left by an earlier run, is reused.
+    """
+    if (
+        not source_cache.enabled()
+        or not audio.get("representation")
+        # The whisper service may run on another host and fetches the URL itself.
+        or (settings.asr_provider == "faster_whisper" and settings.whisper_service_enabled)
+    ):
+        yield audio["url"]
+        return
+    with source_cache.open_source(
+        bvid,
+        audio["cid"],
+        audio["representation"],
+        suffix=source_cache.suffix_for(audio["url"]),
+    ) as path:
+        yield path or audio["url"]
+
+
+def _extract_subtitle(db, bvid: str, skip_native: bool, batch_id: str | None) -> dict:
+    video = db.get(Video, bvid)
+    if not video:
+        _mark_subtitle(db, bvid, "failed", error="video not found")
+        return {"error": "video not found"}
+
+    _mark_subtitle(db, bvid, "extracting")
+    client = _build_subtitle_client(db)
+    if not skip_native:
+        segments = client.get_subtitle_segments(bvid)
+        if segments:
+            _mark_subtitle(db, bvid, "done", segments=segments, error=None)
+            _annotate_subtitle_hits(db, bvid)
             return {"status": "done", "source": "subtitle"}
 
-        audio_url = client.get_audio_url(bvid)
-        if not audio_url:
-            _mark_subtitle(db, bvid, "failed", text=None, error="subtitle not found")
-            return {"status": "failed", "error": "subtitle not found"}
+    audio = client.get_audio_stream(bvid)
+    if not audio:
+        _mark_subtitle(db, bvid, "failed", error="subtitle not found")
+        return {"status": "failed", "error": "subtitle not found"}
 
-        if not settings.asr_provider:
-            _mark_subtitle(db, bvid, "failed", text=None, error="asr disabled")
-            return {"status": "failed", "error": "asr disabled"}
+    if not settings.asr_provider:
+        _mark_subtitle(db, bvid, "failed", error="asr disabled")
+        return {"status": "failed", "error": "asr disabled"}
 
-        try:
-            transcript = transcribe_audio_url(audio_url)
-        except Exception as exc:  # noqa: BLE001
-            _mark_subtitle(db, bvid, "failed", text=None, error=f"asr error: {exc}")
-            return {"status": "failed", "error": "asr error"}
+    try:
+        with _cached_audio(bvid, audio) as audio_source:
+            transcript = transcribe_audio_url(audio_source, db=db)
+    except Exception as exc:  # noqa: BLE001
+        _mark_subtitle(db, bvid, "failed", error=f"asr error: {exc}")
+        return {"status": "failed", "error": "asr error"}
 
-        if transcript:
-            _mark_subtitle(db, bvid, "done", text=transcript, error=None)
-            return {"status": "done", "source": "asr"}
+    if isinstance(transcript, PendingTranscript):
+        _mark_subtitle_pending(db, bvid, transcript, batch_id)
+        return {"status": "pending", "source": "asr"}
 
-        _mark_subtitle(db, bvid, "failed", text=None, error="asr failed")
-        return {"status": "failed", "error": "asr failed"}
+    if transcript:
+        _mark_subtitle(db, bvid, "done", segments=transcript, error=None)
+        _annotate_subtitle_hits(db, bvid)
+        return {"status": "done", "source": "asr"}
+
+    _mark_subtitle(db, bvid, "failed", error="asr failed")
+    return {"status": "failed", "error": "asr failed"}
+
+
+def _asr_poll_transient(exc: Exception) -> bool:
+    """Network trouble reaching the provider, as opposed to the provider rejecting the job."""
+    if isinstance(exc, httpx.TransportError):
+        return True
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+        return status == 429 or status >= 500
+    return False
+
+
+@celery_app.task(name="poll_asr_jobs")
+def poll_asr_jobs():
+    """Check every due asynchronous ASR job in one pass, backing off the ones still running."""
+    db = SessionLocal()
+    lock_key = None
+    try:
+        now = datetime.utcnow()
+        subtitles = (
+            db.execute(
+                select(Subtitle)
+                .where(Subtitle.asr_next_poll_at.isnot(None), Subtitle.asr_next_poll_at <= now)
+                .order_by(Subtitle.asr_next_poll_at.asc())
+                .limit(max(1, int(settings.asr_poll_batch_size or 200)))
+            )
+            .scalars()
+            .all()
+        )
+        if not subtitles:
+            return {"status": "skipped", "reason": "no jobs due"}
+
+        r = redis.Redis.from_url(settings.redis_url)
+        if not r.set(_ASR_POLL_LOCK, "1", nx=True, ex=120):
+            return {"status": "skipped", "reason": "already running"}
+        lock_key = _ASR_POLL_LOCK
+
+        timeout = timedelta(minutes=max(1, int(settings.doubao_poll_timeout_minutes or 180)))
+        workers = max(1, int(settings.asr_poll_concurrency or 1))
+        done = 0
+        pending = 0
+        failed = 0
+        jobs = {subtitle.bvid: dict(subtitle.asr_job or {}) for subtitle in subtitles}
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(poll_transcript, job): bvid for bvid, job in jobs.items()}
+            for future in as_completed(futures):
+                bvid = futures[future]
+                job = jobs[bvid]
+                subtitle = db.get(Subtitle, bvid, populate_existing=True)
+                if subtitle is None:
+                    # Deleted while this poll was in flight.
+                    continue
+                if not subtitle.asr_job or subtitle.asr_job.get("task_id") != job.get("task_id"):
+                    # Re-extracted while this poll was in flight.
+                    continue
+                transient_error = None
+                try:
+                    segments = future.result()
+                except Exception as exc:  # noqa: BLE001
+                    if not _asr_poll_transient(exc):
+                        _mark_subtitle(db, bvid, "failed", error=f"asr error: {exc}")
+                        _bump_subtitle_batch(job.get("batch_id"), {"asr_failed": 1})
+                        failed += 1
+                        continue
+                    # The provider may well have finished; ask again on the normal backoff.
+                    segments = None
+                    transient_error = f"{type(exc).__name__}: {exc}"
+                if segments:
+                    if job.get("audio_hash"):
+                        transcript_cache.store(
+                            db,
+                            job["audio_hash"],
+                            job["provider"],
+                            job["model"],
+                            segments,
+                            int(job.get("duration_ms") or 0),
+                        )
+                    _mark_subtitle(db, bvid, "done", segments=segments, error=None)
+                    _annotate_subtitle_hits(db, bvid)
+                    _bump_subtitle_batch(job.get("batch_id"), {"asr_done": 1})
+                    done += 1
+                    continue
+                try:
+                    submitted_at = datetime.fromisoformat(job.get("submitted_at") or "")
+                except ValueError:
+                    submitted_at = now
+                if now - submitted_at > timeout:
+                    _mark_subtitle(db, bvid, "failed", error="asr error: doubao api timeout")
+                    _bump_subtitle_batch(job.get("batch_id"), {"asr_failed": 1})
+                    failed += 1
+                    continue
+                attempts = int(job.get("attempts") or 0) + 1
+                subtitle.asr_job = {**job, "attempts": attempts, "last_error": transient_error}
+                subtitle.asr_next_poll_at = now + _asr_poll_delay(attempts)
+                db.add(subtitle)
+                db.commit()
+                pending += 1
+        return {"status": "done", "done": done, "pending": pending, "failed": failed}
     finally:
+        if lock_key:
+            r.delete(lock_key)
         db.close()
 
 
@@ -467,11 +947,6 @@ def crawl_comments(job_id: str):
         db.close()
 
 
-def _frames_dir() -> Path:
-    base = Path(__file__).resolve().parents[2]
-    return base / (settings.frames_dir or "frames")
-
-
 def _bili_headers() -> dict[str, str]:
     headers = {"User-Agent": settings.bili_user_agent, "Referer": settings.bili_referer}
     if settings.bili_cookies:
@@ -493,38 +968,697 @@ def _get_ffmpeg_bin() -> str:
     return ffmpeg_bin
 
 
-def _download_video(url: str, out_path: str) -> None:
+def _download_video(url: str, out_path: str, max_bytes: int | None = None) -> None:
+    total = 0
     with httpx.stream("GET", url, headers=_bili_headers(), timeout=60) as res:
         res.raise_for_status()
         with open(out_path, "wb") as fp:
             for chunk in res.iter_bytes():
+                total += len(chunk)
+                if max_bytes and total > max_bytes:
+                    raise RuntimeError("source too large")
                 fp.write(chunk)
 
 
-def _cleanup_old_jobs(db: SessionLocal, bvid: str, keep: int = 3):
-    jobs = (
-        db.execute(select(FrameJob).where(FrameJob.bvid == bvid, FrameJob.status == "success").order_by(FrameJob.created_at.desc()))
-        .scalars()
-        .all()
-    )
-    if len(jobs) <= keep:
+def _frame_progress_key(job_id: str) -> str:
+    return f"frame_job:{job_id}:progress"
+
+
+def _frame_cancel_key(job_id: str) -> str:
+    return f"frame_job:{job_id}:cancel"
+
+
+def _publish_frame_progress(r: redis.Redis, job_id: str, fields: dict, check_cancel: bool = False) -> bool:
+    """Write live progress to Redis in one round trip; returns whether a cancel was requested."""
+    pipe = r.pipeline()
+    pipe.hset(_frame_progress_key(job_id), mapping={**fields, "updated_at": int(time.time())})
+    pipe.expire(_frame_progress_key(job_id), _FRAME_PROGRESS_TTL_SECONDS)
+    if check_cancel:
+        pipe.exists(_frame_cancel_key(job_id))
+    results = pipe.execute()
+    return bool(check_cancel and results[-1])
+
+
+def _set_frame_status(job_id: str, status: str, **fields) -> None:
+    try:
+        _publish_frame_progress(redis.Redis.from_url(settings.redis_url), job_id, {"status": status, **fields})
+    except redis.RedisError:
+        pass
+
+
+def _frame_cancel_requested(job_id: str) -> bool:
+    try:
+        return bool(redis.Redis.from_url(settings.redis_url).exists(_frame_cancel_key(job_id)))
+    except redis.RedisError:
+        return False
+
+
+def request_frame_cancel(job_id: str) -> None:
+    r = redis.Redis.from_url(settings.redis_url)
+    r.set(_frame_cancel_key(job_id), "1", ex=_FRAME_CANCEL_TTL_SECONDS)
+    _set_frame_status(job_id, "canceled")
+
+
+def read_frame_progress(job_id: str) -> dict | None:
+    r = redis.Redis.from_url(settings.redis_url)
+    raw = r.hgetall(_frame_progress_key(job_id))
+    if not raw:
+        return None
+    data = {k.decode(): v.decode() for k, v in raw.items()}
+
+    def number(field: str, cast=int):
+        value = data.get(field)
+        return cast(value) if value not in (None, "") else None
+
+    return {
+        "id": job_id,
+        "status": data.get("status"),
+        "progress": number("progress", float),
+        "generated_frames": number("frames") or 0,
+        "out_time_ms": number("out_time_ms"),
+        "duration_ms": number("duration_ms"),
+        "updated_at": number("updated_at"),
+    }
+
+
+def _parse_ffmpeg_clock(value: str) -> int | None:
+    try:
+        hours, minutes, seconds = value.split(":")
+        return int((int(hours) * 3600 + int(minutes) * 60 + float(seconds)) * 1000)
+    except ValueError:
+        return None
+
+
+def _frame_job_progress(state: dict, max_frames: int) -> float:
+    ratios = [state["frames"] / max_frames] if max_frames else []
+    if state.get("duration_ms"):
+        ratios.append(state["out_time_ms"] / state["duration_ms"])
+    return round(min(max(ratios, default=0.0), 1.0), 4)
+
+
+def _small_images(frames: list[VideoFrame]) -> list[str]:
+    """Thumbnails when every frame has one, else the full frames: a concat list needs one codec."""
+    if all(frame.thumb_url for frame in frames):
+        return [frame.thumb_url for frame in frames]
+    return [frame.frame_url for frame in frames]
+
+
+def _dedup_frames(ffmpeg_bin: str, job: FrameJob, frames: list[VideoFrame]) -> list[VideoFrame]:
+    """Hash every frame and collapse near-duplicates within the job.
+
+    Duplicates keep their row with ``duplicate_of`` set (hidden from listings by default), or
+    with ``FRAME_DEDUP_DELETE`` are dropped together with their files. Returns the rows to store.
+    """
+    distance = settings.frame_dedup_distance if job.dedup_distance is None else job.dedup_distance
+    if not frame_hash.available():
+        return frames
+    try:
+        hashes = frame_hash.hash_files(ffmpeg_bin, _small_images(frames))
+    except (OSError, RuntimeError):
+        # Hashes only drive deduplication; the frames themselves are fine without them.
+        return frames
+    for frame, value in zip(frames, hashes):
+        frame.phash = frame_hash.to_hex(value)
+    if distance is None or int(distance) < 0:
+        return frames
+
+    kept = []
+    for frame, original in zip(frames, frame_hash.duplicates(hashes, int(distance))):
+        if original is None:
+            kept.append(frame)
+        elif settings.frame_dedup_delete:
+            for path in (frame.frame_url, frame.thumb_url):
+                if path:
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+        else:
+            frame.duplicate_of = frames[original].id
+    return kept if settings.frame_dedup_delete else frames
+
+
+def _build_sprites(ffmpeg_bin: str, output_dir: Path, frames: list[VideoFrame]) -> None:
+    """Tile the job's thumbnails into contact sheets, indexed by ``sprites/index.json``.
+
+    One ffmpeg process reads the thumbnails in order and ``tile`` emits a sheet every
+    ``columns x rows`` frames (the last one padded). The index maps every listed frame to its
+    sheet and pixel offset, so a job can be previewed or scrubbed with a handful of requests.
+    """
+    shown = [frame for frame in frames if frame.duplicate_of is None]
+    if not shown:
         return
-    for job in jobs[keep:]:
-        frames = db.execute(select(VideoFrame).where(VideoFrame.job_id == job.id)).scalars().all()
-        for frame in frames:
-            try:
-                if os.path.exists(frame.frame_url):
-                    os.remove(frame.frame_url)
-            except OSError:
-                pass
-            db.delete(frame)
-        if job.output_dir and os.path.exists(job.output_dir):
+    columns = max(1, int(settings.frame_sprite_columns or 10))
+    rows = max(1, int(settings.frame_sprite_rows or 10))
+    tile_width = max(16, int(settings.frame_sprite_tile_width or 160))
+    first = shown[0]
+    aspect = first.height / first.width if first.width and first.height else 9 / 16
+    tile_height = max(2, round(tile_width * aspect / 2) * 2)
+    ext = _thumb_ext(ffmpeg_bin)
+    codec = ["-c:v", "libwebp", "-quality", "70"] if ext == "webp" else ["-q:v", "5"]
+
+    sprite_dir = output_dir / frame_files.SPRITE_DIR
+    sprite_dir.mkdir(exist_ok=True)
+    with frame_files.concat_list(_small_images(shown)) as list_path:
+        cmd = [
+            ffmpeg_bin,
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-y",
+            "-f",
+            "concat",
+            "-safe",
+            "0",
+            "-i",
+            list_path,
+            "-vf",
+            f"scale={tile_width}:{tile_height},setsar=1,tile={columns}x{rows}",
+            "-fps_mode",
+            "passthrough",
+            *codec,
+            str(sprite_dir / f"sprite_%03d.{ext}"),
+        ]
+        try:
+            result = subprocess.run(cmd, capture_output=True, check=False)
+        except OSError:
+            result = None
+    per_sheet = columns * rows
+    sheets = sorted(sprite_dir.glob(f"sprite_*.{ext}"))
+    if result is None or result.returncode != 0 or len(sheets) != math.ceil(len(shown) / per_sheet):
+        # Sprites are a browsing aid; the frames are usable without them.
+        shutil.rmtree(sprite_dir, ignore_errors=True)
+        return
+
+    index = {
+        "columns": columns,
+        "rows": rows,
+        "tile_width": tile_width,
+        "tile_height": tile_height,
+        "sprites": [{"file": path.name, "width": columns * tile_width, "height": rows * tile_height} for path in sheets],
+        "frames": [
+            {
+                "frame_id": frame.id,
+                "idx": frame.idx,
+                "timestamp_ms": frame.timestamp_ms,
+                "sprite": pos // per_sheet,
+                "x": pos % per_sheet % columns * tile_width,
+                "y": pos % per_sheet // columns * tile_height,
+            }
+            for pos, frame in enumerate(shown)
+        ],
+    }
+    (sprite_dir / frame_files.SPRITE_INDEX).write_text(json.dumps(index), encoding="utf-8")
+
+
+class _FrameJobCanceled(Exception):
+    pass
+
+
+def _ffmpeg_input(source: str) -> list[str]:
+    """``-i`` arguments; CDN sources get the Bilibili headers and are read with range requests."""
+    if source.startswith(("http://", "https://")):
+        headers = "".join(f"{key}: {value}\r\n" for key, value in _bili_headers().items())
+        return ["-reconnect", "1", "-reconnect_delay_max", "5", "-headers", headers, "-i", source]
+    return ["-i", source]
+
+
+def _sync_frame_job(r: redis.Redis, db, job_id: str, fields: dict) -> None:
+    """Publish live progress; raises ``_FrameJobCanceled`` once a cancel has been requested."""
+    try:
+        canceled = _publish_frame_progress(r, job_id, {"status": "running", **fields}, check_cancel=True)
+    except redis.RedisError:
+        canceled = db.execute(select(FrameJob.status).where(FrameJob.id == job_id)).scalar() == "canceled"
+        db.commit()
+    if canceled:
+        raise _FrameJobCanceled()
+
+
+def _fail_frame_job(db, job_id: str, error: str) -> dict:
+    job = db.get(FrameJob, job_id)
+    job.status = "failed"
+    job.error_msg = error
+    db.commit()
+    _set_frame_status(job_id, "failed")
+    return {"status": "failed"}
+
+
+_FRAME_THUMB_DIR = "thumbs"
+
+
+@functools.lru_cache(maxsize=4)
+def _thumb_ext(ffmpeg_bin: str) -> str:
+    """``webp`` when configured and this ffmpeg has libwebp, else ``jpg``."""
+    if (settings.frame_thumb_format or "").lower() != "webp":
+        return "jpg"
+    try:
+        encoders = subprocess.run(
+            [ffmpeg_bin, "-hide_banner", "-encoders"], capture_output=True, text=True, timeout=30
+        ).stdout
+    except (OSError, subprocess.TimeoutExpired):
+        return "jpg"
+    return "webp" if "libwebp" in encoders else "jpg"
+
+
+def _thumb_path(frame_path: str, ext: str) -> str:
+    head, name = os.path.split(frame_path)
+    return os.path.join(head, _FRAME_THUMB_DIR, f"{os.path.splitext(name)[0]}.{ext}")
+
+
+def _frame_outputs(ffmpeg_bin: str, vf: str, out_path: str, frames: int) -> list[str]:
+    """Filter and output arguments: each frame at full size to ``out_path`` plus a thumbnail.
+
+    The thumbnail is split off the already-scaled frame in the same pass and written to
+    ``thumbs/`` beside it under the same name.
+    """
+    ext = _thumb_ext(ffmpeg_bin)
+    thumb_codec = ["-c:v", "libwebp", "-quality", "70"] if ext == "webp" else ["-q:v", "5"]
+    thumb_width = max(16, int(settings.frame_thumb_width or 320))
+    graph = f"[0:v]{vf},split=2[full][small];[small]scale={thumb_width}:-2[thumb]"
+    return [
+        "-filter_complex",
+        graph,
+        "-map",
+        "[full]",
+        "-frames:v",
+        str(frames),
+        "-q:v",
+        "2",
+        out_path,
+        "-map",
+        "[thumb]",
+        "-frames:v",
+        str(frames),
+        *thumb_codec,
+        _thumb_path(out_path, ext),
+    ]
+
+
+def _jpeg_size(path: str) -> tuple[int, int] | None:
+    """``(width, height)`` from a JPEG's SOF header, without decoding it."""
+    try:
+        with open(path, "rb") as fp:
+            if fp.read(2) != b"\xff\xd8":
+                return None
+            while True:
+                marker = fp.read(2)
+                if len(marker) < 2 or marker[0] != 0xFF:
+                    return None
+                if 0xC0 <= marker[1] <= 0xCF and marker[1] not in (0xC4, 0xC8, 0xCC):
+                    fp.read(3)  # segment length, sample precision
+                    height, width = struct.unpack(">HH", fp.read(4))
+                    return width, height
+                (length,) = struct.unpack(">H", fp.read(2))
+                fp.seek(length - 2, os.SEEK_CUR)
+    except (OSError, struct.error):
+        return None
+
+
+def _frame_filter_cmd(ffmpeg_bin: str, source: str, job: FrameJob, width: int, max_frames: int, out_pattern: str) -> list[str]:
+    cmd = [ffmpeg_bin, "-y", "-nostats", "-progress", "pipe:2", *_ffmpeg_input(source)]
+    if job.mode == "interval":
+        interval = max(int(job.interval_sec or 2), 1)
+        vf = f"fps=1/{interval},scale={width}:-1"
+        return cmd + _frame_outputs(ffmpeg_bin, vf, out_pattern, max_frames)
+    threshold = float(job.scene_threshold or 0.35)
+    vf = f"select='gt(scene,{threshold})',showinfo,scale={width}:-1"
+    return cmd + ["-vsync", "vfr"] + _frame_outputs(ffmpeg_bin, vf, out_pattern, max_frames)
+
+
+def _run_frame_ffmpeg(
+    db,
+    job_id: str,
+    cmd: list[str],
+    max_frames: int,
+    scores: list[float] | None = None,
+    span: tuple[float, float] = (0.0, 1.0),
+) -> tuple[int, list[float]]:
+    """Run one ffmpeg over the whole input; returns ``(returncode, showinfo/metadata pts times)``.
+
+    With ``scores`` (a scene analysis pass) ``lavfi.scene_score`` values are appended to it and
+    no frame count is reported. Progress is mapped into ``span`` of the job's progress.
+    """
+    pts_times: list[float] = []
+    # Filled from stderr: the input duration, then ``-progress`` key=value blocks.
+    state = {"frames": 0, "out_time_ms": 0, "duration_ms": None}
+
+    def _collect_pts(stream):
+        for line in stream:
+            if "pts_time:" in line:
+                try:
+                    part = line.split("pts_time:")[1]
+                    value = part.split(" ")[0].strip()
+                    pts_times.append(float(value))
+                except Exception:
+                    continue
+            elif scores is not None and "lavfi.scene_score=" in line:
+                try:
+                    scores.append(float(line.split("lavfi.scene_score=")[1]))
+                except ValueError:
+                    scores.append(0.0)
+            elif state["duration_ms"] is None and "Duration:" in line:
+                state["duration_ms"] = _parse_ffmpeg_clock(line.split("Duration:")[1].split(",")[0].strip())
+            elif line.startswith("frame="):
+                # Skips the final stats line, which also starts with ``frame=``.
+                value = line[6:].strip()
+                if value.isdigit():
+                    state["frames"] = int(value)
+            elif line.startswith("out_time_us="):
+                value = line[12:].strip()
+                if value.isdigit():
+                    state["out_time_ms"] = int(value) // 1000
+
+    process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    reader = None
+    if process.stderr:
+        reader = threading.Thread(target=_collect_pts, args=(process.stderr,), daemon=True)
+        reader.start()
+
+    # Live progress goes to Redis at a throttled rate; the DB is only written on transitions.
+    r = redis.Redis.from_url(settings.redis_url)
+    tick = max(0.2, float(settings.frame_progress_interval_seconds or 1.0))
+    while True:
+        try:
+            process.wait(timeout=tick)
+            break
+        except subprocess.TimeoutExpired:
+            pass
+        fields = {
+            "frames": 0 if scores is not None else state["frames"],
+            "progress": round(span[0] + (span[1] - span[0]) * _frame_job_progress(state, max_frames), 4),
+            "out_time_ms": state["out_time_ms"],
+            "duration_ms": state["duration_ms"] or "",
+        }
+        try:
+            _sync_frame_job(r, db, job_id, fields)
+        except _FrameJobCanceled:
+            process.terminate()
+            process.wait(timeout=5)
+            raise
+
+    if reader:
+        reader.join(timeout=2)
+    return process.returncode, pts_times
+
+
+def _grab_frame(ffmpeg_bin: str, source: str, ts_ms: int, width: int, out_path: str) -> bool:
+    # ``-ss`` before ``-i`` seeks the demuxer (HTTP range request) instead of decoding up to ``ts_ms``.
+    cmd = [
+        ffmpeg_bin,
+        "-y",
+        "-loglevel",
+        "error",
+        "-ss",
+        f"{ts_ms / 1000:.3f}",
+        *_ffmpeg_input(source),
+        *_frame_outputs(ffmpeg_bin, f"scale={width}:-1", out_path, 1),
+    ]
+    try:
+        result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=120)
+    except subprocess.TimeoutExpired:
+        return False
+    return result.returncode == 0 and os.path.exists(out_path)
+
+
+def _extract_frames_at(
+    db,
+    job_id: str,
+    ffmpeg_bin: str,
+    source: str,
+    timestamps_ms: list[int],
+    width: int,
+    output_dir: Path,
+    span: tuple[float, float] = (0.0, 1.0),
+) -> list[tuple[str, int]] | None:
+    """One seek per timestamp, ``frame_seek_concurrency`` at a time; ``None`` if the source can't seek."""
+    def grab(idx: int, ts_ms: int) -> str | None:
+        path = str(output_dir / f"frame_{idx:05d}.jpg")
+        return path if _grab_frame(ffmpeg_bin, source, ts_ms, width, path) else None
+
+    first = grab(1, timestamps_ms[0])
+    if first is None:
+        return None
+    extracted = [(first, timestamps_ms[0])]
+    r = redis.Redis.from_url(settings.redis_url)
+    tick = max(0.2, float(settings.frame_progress_interval_seconds or 1.0))
+    total = len(timestamps_ms)
+    finished = 1
+    workers = max(1, int(settings.frame_seek_concurrency or 1))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(grab, idx, ts): ts for idx, ts in enumerate(timestamps_ms[1:], start=2)}
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=tick)
+            for future in done:
+                finished += 1
+                path = future.result()
+                if path:
+                    extracted.append((path, futures[future]))
             try:
-                shutil.rmtree(job.output_dir)
-            except OSError:
-                pass
-        db.delete(job)
+                progress = span[0] + (span[1] - span[0]) * finished / total
+                _sync_frame_job(r, db, job_id, {"frames": len(extracted), "progress": round(progress, 4)})
+            except _FrameJobCanceled:
+                for future in pending:
+                    future.cancel()
+                raise
+    extracted.sort(key=lambda item: item[1])
+    return extracted
+
+
+def _probe_duration_ms(ffmpeg_bin: str, source: str) -> int:
+    """Container duration from ffmpeg's input banner; 0 if unknown."""
+    try:
+        result = subprocess.run(
+            [ffmpeg_bin, "-hide_banner", *_ffmpeg_input(source)],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+            timeout=60,
+        )
+    except subprocess.TimeoutExpired:
+        return 0
+    for line in result.stderr.splitlines():
+        if "Duration:" in line:
+            return _parse_ffmpeg_clock(line.split("Duration:")[1].split(",")[0].strip()) or 0
+    return 0
+
+
+def _acquire_cpu_slots(want: int) -> list:
+    """Take up to ``want`` of this host's ``FRAME_CPU_BUDGET`` decoder slots.
+
+    A slot is an ``flock`` on a file in the temp dir, so it is shared by every worker process
+    on the host and freed if one dies. Returns the open slot files (close them to release);
+    waits for one slot when all are taken.
+    """
+    budget = int(settings.frame_cpu_budget or 0) or os.cpu_count() or 1
+    slot_dir = Path(tempfile.gettempdir()) / "frame_cpu_slots"
+    slot_dir.mkdir(exist_ok=True)
+    held = []
+    for idx in range(budget):
+        if len(held) >= want:
+            break
+        fp = open(slot_dir / f"{idx}.lock", "a+b")
+        try:
+            fcntl.flock(fp, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            fp.close()
+            continue
+        held.append(fp)
+    if not held:
+        fp = open(slot_dir / f"{os.getpid() % budget}.lock", "a+b")
+        fcntl.flock(fp, fcntl.LOCK_EX)
+        held.append(fp)
+    return held
+
+
+def _count_progress_frames(stream, counts: list[int], idx: int) -> None:
+    """Keep ``counts[idx]`` at the latest ``frame=`` value of an ffmpeg ``-progress`` stream."""
+    for line in stream:
+        if line.startswith("frame="):
+            value = line[6:].strip()
+            if value.isdigit():
+                counts[idx] = int(value)
+
+
+def _extract_interval_slices(
+    db,
+    job_id: str,
+    ffmpeg_bin: str,
+    source: str,
+    interval: int,
+    max_frames: int,
+    duration_ms: int,
+    width: int,
+    output_dir: Path,
+    hold: ExitStack,
+) -> list[tuple[str, int]] | None:
+    """Interval frames from time slices decoded by parallel single-threaded ffmpeg processes.
+
+    The timeline is cut into as many slices as CPU slots could be taken (one per
+    ``FRAME_SLICE_MIN_SECONDS`` at most); each process seeks to its slice start and emits that
+    slice's frames, which are then renamed into one ``frame_%05d.jpg`` sequence. ``None`` when
+    the video is too short to split, only one slot is free, or a slice failed; in the last two
+    cases one slot stays held on ``hold``, so the single-pass fallback runs within the budget
+    instead of wasting the wait for it.
+    """
+    timestamps = [idx * interval * 1000 for idx in range(max_frames) if idx * interval * 1000 < duration_ms]
+    min_slice_ms = max(1, int(settings.frame_slice_min_seconds or 0)) * 1000
+    # Only the span up to the last wanted frame is decoded, not the whole video.
+    span_ms = min(duration_ms, len(timestamps) * interval * 1000)
+    want = min(len(timestamps), span_ms // min_slice_ms)
+    if want < 2:
+        return None
+    slots = _acquire_cpu_slots(want)
+    kept = None
+    procs: list[tuple[subprocess.Popen, str, list[int]]] = []
+    # Frames written so far per slice, from each process's ``-progress`` stream.
+    counts: list[int] = []
+    try:
+        if len(slots) < 2:
+            kept = slots[0]
+            return None
+        per_slice = math.ceil(len(timestamps) / len(slots))
+        for first in range(0, len(timestamps), per_slice):
+            chunk = timestamps[first : first + per_slice]
+            prefix = f"slice{first:05d}_"
+            cmd = [
+                ffmpeg_bin,
+                "-y",
+                "-loglevel",
+                "error",
+                "-nostats",
+                "-progress",
+                "pipe:1",
+                "-threads",
+                "1",
+                # Input seeking is frame-accurate: output time 0 is ``chunk[0]``.
+                "-ss",
+                f"{chunk[0] / 1000:.3f}",
+                *_ffmpeg_input(source),
+                *_frame_outputs(
+                    ffmpeg_bin, f"fps=1/{interval},scale={width}:-1", str(output_dir / f"{prefix}%05d.jpg"), len(chunk)
+                ),
+            ]
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+            counts.append(0)
+            threading.Thread(target=_count_progress_frames, args=(proc.stdout, counts, len(procs)), daemon=True).start()
+            procs.append((proc, prefix, chunk))
+
+        r = redis.Redis.from_url(settings.redis_url)
+        tick = max(0.2, float(settings.frame_progress_interval_seconds or 1.0))
+        while any(proc.poll() is None for proc, _, _ in procs):
+            time.sleep(tick)
+            done = sum(counts)
+            _sync_frame_job(r, db, job_id, {"frames": done, "progress": round(min(done / len(timestamps), 1.0), 4)})
+        if any(proc.returncode != 0 for proc, _, _ in procs):
+            for path in glob.glob(str(output_dir / "slice*")) + glob.glob(str(output_dir / _FRAME_THUMB_DIR / "slice*")):
+                os.remove(path)
+            kept = slots[0]
+            return None
+
+        ext = _thumb_ext(ffmpeg_bin)
+        extracted = []
+        for _, prefix, chunk in procs:
+            for path, ts in zip(sorted(glob.glob(str(output_dir / f"{prefix}*.jpg"))), chunk):
+                final = str(output_dir / f"frame_{len(extracted) + 1:05d}.jpg")
+                if os.path.exists(_thumb_path(path, ext)):
+                    os.replace(_thumb_path(path, ext), _thumb_path(final, ext))
+                os.replace(path, final)
+                extracted.append((final, ts))
+        return extracted
+    finally:
+        for proc, _, _ in procs:
+            if proc.poll() is None:
+                proc.terminate()
+                proc.wait(timeout=5)
+        for fp in slots:
+            if fp is kept:
+                hold.callback(fp.close)
+            else:
+                fp.close()
+
+
+def _scene_analysis_cmd(ffmpeg_bin: str, source: str) -> list[str]:
+    """Pass 1: score every decoded reference frame on a small downscale, writing no images."""
+    width = max(16, int(settings.frame_scene_analysis_width or 160))
+    vf = f"scale={width}:-2,select='gte(scene,0)',metadata=mode=print:key=lavfi.scene_score"
+    return [
+        ffmpeg_bin,
+        "-y",
+        "-nostats",
+        "-progress",
+        "pipe:2",
+        "-skip_frame",
+        "noref",
+        *_ffmpeg_input(source),
+        "-an",
+        "-sn",
+        "-dn",
+        "-vf",
+        vf,
+        "-f",
+        "null",
+        "-",
+    ]
+
+
+def _scene_scores_for(db, sources: ExitStack, job: FrameJob, client, stream: dict | None, source_path: str, ffmpeg_bin: str) -> bytes | None:
+    """Packed pass-1 scores for ``job``'s video: reused from an earlier job, else computed.
+
+    The analysis decodes the narrowest representation the CDN offers rather than the one
+    frames are taken from. ``None`` if the analysis pass failed.
+    """
+    blob = db.execute(
+        select(FrameJob.scene_scores)
+        .where(FrameJob.bvid == job.bvid, FrameJob.scene_scores.isnot(None))
+        .order_by(FrameJob.created_at.desc())
+        .limit(1)
+    ).scalar()
+    if blob:
+        return blob
+
+    analysis_source = source_path
+    if stream:
+        analysis = client.get_video_stream(job.bvid, min_width=int(settings.frame_scene_analysis_width or 160)) or stream
+        if source_cache.enabled():
+            analysis_source = _cached_frame_source(sources, job.bvid, analysis)
+        else:
+            analysis_source = analysis["url"]
+    scores: list[float] = []
+    returncode, pts_times = _run_frame_ffmpeg(
+        db, job.id, _scene_analysis_cmd(ffmpeg_bin, analysis_source), 0, scores=scores, span=(0.0, 0.5)
+    )
+    if returncode != 0 or not pts_times:
+        return None
+    blob = scene_scores.pack((int(pts * 1000), score) for pts, score in zip(pts_times, scores))
+    job = db.get(FrameJob, job.id)
+    job.scene_scores = blob
+    db.commit()
+    return blob
+
+
+def _cached_frame_source(sources: ExitStack, bvid: str, stream: dict, download: bool = True) -> str | None:
+    """Enter the shared source-cache entry for ``stream``; without ``download`` only an existing copy."""
+    return sources.enter_context(
+        source_cache.open_source(
+            bvid,
+            stream["cid"],
+            stream["representation"],
+            (lambda path: _download_video(stream["url"], path)) if download else None,
+            suffix=source_cache.suffix_for(stream["url"]),
+        )
+    )
+
+
+def _download_frame_source(db, sources: ExitStack, job: FrameJob, stream: dict, output_dir: Path) -> str:
+    """Local copy of ``stream``: the shared source-cache entry, or ``source.mp4`` in the job dir."""
+    if source_cache.enabled():
+        return _cached_frame_source(sources, job.bvid, stream)
+    source_path = str(output_dir / "source.mp4")
+    _download_video(stream["url"], source_path)
+    job.source_video_path = source_path
     db.commit()
+    return source_path
 
 
 @celery_app.task(name="extract_frames")
@@ -540,134 +1674,196 @@ def extract_frames(job_id: str):
         job.updated_at = datetime.utcnow()
         db.add(job)
         db.commit()
+        _set_frame_status(job_id, "running", frames=0, progress=0.0)
 
         video = db.get(Video, job.bvid)
         if not video:
-            job.status = "failed"
-            job.error_msg = "VIDEO_SOURCE_NOT_AVAILABLE"
-            db.commit()
-            return {"status": "failed"}
+            return _fail_frame_job(db, job_id, "VIDEO_SOURCE_NOT_AVAILABLE")
 
-        output_dir = _frames_dir() / job.bvid / job.id
-        output_dir.mkdir(parents=True, exist_ok=True)
+        output_dir = frame_files.root() / job.bvid / job.id
+        (output_dir / _FRAME_THUMB_DIR).mkdir(parents=True, exist_ok=True)
         job.output_dir = str(output_dir)
         db.commit()
 
-        source_path = job.source_video_path or video.source_video_path
-        if not source_path or not os.path.exists(source_path):
-            client = _build_subtitle_client(db)
-            video_url = client.get_video_url(job.bvid)
-            if not video_url:
-                job.status = "failed"
-                job.error_msg = "VIDEO_SOURCE_NOT_AVAILABLE"
-                db.commit()
-                return {"status": "failed"}
-            source_path = str(output_dir / "source.mp4")
-            _download_video(video_url, source_path)
-            job.source_video_path = source_path
-            db.commit()
-
         width = 1280 if job.resolution == "720p" else 1920
         max_frames = min(job.max_frames or 120, 300)
+        interval = max(int(job.interval_sec or 2), 1)
         ffmpeg_bin = _get_ffmpeg_bin()
 
-        if job.mode == "interval":
-            interval = max(int(job.interval_sec or 2), 1)
-            out_pattern = str(output_dir / "frame_%05d.jpg")
-            vf = f"fps=1/{interval},scale={width}:-1"
-            cmd = [ffmpeg_bin, "-y", "-i", source_path, "-vf", vf, "-frames:v", str(max_frames), "-q:v", "2", out_pattern]
-        else:
-            threshold = float(job.scene_threshold or 0.35)
-            out_pattern = str(output_dir / "frame_%05d.jpg")
-            vf = f"select='gt(scene,{threshold})',showinfo,scale={width}:-1"
-            cmd = [ffmpeg_bin, "-y", "-i", source_path, "-vf", vf, "-vsync", "vfr", "-frames:v", str(max_frames), "-q:v", "2", out_pattern]
-
-        pts_times: list[float] = []
-
-        def _collect_pts(stream):
-            for line in stream:
-                if "pts_time:" in line:
-                    try:
-                        part = line.split("pts_time:")[1]
-                        value = part.split(" ")[0].strip()
-                        pts_times.append(float(value))
-                    except Exception:
-                        continue
-
-        process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
-        reader = None
-        if process.stderr:
-            reader = threading.Thread(target=_collect_pts, args=(process.stderr,), daemon=True)
-            reader.start()
-
-        while process.poll() is None:
-            job = db.get(FrameJob, job_id)
-            if job and job.status == "canceled":
-                process.terminate()
-                process.wait(timeout=5)
-                db.commit()
-                return {"status": "canceled"}
-            count = len(glob.glob(str(output_dir / "*.jpg")))
-            job.generated_frames = count
-            job.frame_count = count
-            job.progress = min(count / max_frames, 1.0) if max_frames else None
-            job.updated_at = datetime.utcnow()
-            db.add(job)
-            db.commit()
-            time.sleep(0.6)
-
-        if reader:
-            reader.join(timeout=2)
-
-        if process.returncode != 0:
-            job = db.get(FrameJob, job_id)
-            job.status = "failed"
-            job.error_msg = "ffmpeg failed"
-            db.commit()
-            return {"status": "failed"}
-
-        frame_files = sorted(glob.glob(str(output_dir / "*.jpg")))
-        if not frame_files:
-            job = db.get(FrameJob, job_id)
-            job.status = "failed"
-            job.error_msg = "NO_FRAMES"
-            db.commit()
-            return {"status": "failed"}
+        # Without a local file ffmpeg reads the CDN stream directly: the narrowest representation
+        # that covers the requested width, no download before the first frame.
+        source_path = job.source_video_path or video.source_video_path
+        client = None
+        stream = None
+        if not source_path or not os.path.exists(source_path):
+            client = _build_subtitle_client(db)
+            stream = client.get_video_stream(job.bvid, min_width=width)
+            if not stream:
+                return _fail_frame_job(db, job_id, "VIDEO_SOURCE_NOT_AVAILABLE")
+            source_path = stream["url"]
+
+        duration_ms = int(stream.get("duration_ms") or 0) if stream else 0
+        seek = bool(
+            stream
+            and job.mode == "interval"
+            and duration_ms
+            and interval >= int(settings.frame_seek_min_interval_seconds or 0)
+        )
+        two_pass = job.mode == "scene" and settings.frame_scene_two_pass
+        with ExitStack() as sources:
+            if stream and source_cache.enabled():
+                if seek or two_pass:
+                    # Sparse seeks fetch little; only reuse a copy that is already cached.
+                    source_path = _cached_frame_source(sources, job.bvid, stream, download=False) or source_path
+                else:
+                    # A full pass reads the whole representation anyway; keep it for reruns.
+                    source_path = _download_frame_source(db, sources, job, stream, output_dir)
+
+            extracted = None
+            if two_pass:
+                # Pass 1 scores a small decode (or reuses stored scores); pass 2 seeks to the cuts.
+                blob = _scene_scores_for(db, sources, job, client, stream, source_path, ffmpeg_bin)
+                if blob is not None:
+                    timestamps = scene_scores.cuts(blob, float(job.scene_threshold or 0.35), max_frames)
+                    extracted = []
+                    if timestamps:
+                        extracted = _extract_frames_at(
+                            db, job_id, ffmpeg_bin, source_path, timestamps, width, output_dir, span=(0.5, 1.0)
+                        )
+                    if extracted is None and stream and source_path == stream["url"]:
+                        source_path = _download_frame_source(db, sources, job, stream, output_dir)
+                        extracted = _extract_frames_at(
+                            db, job_id, ffmpeg_bin, source_path, timestamps, width, output_dir, span=(0.5, 1.0)
+                        )
+            elif seek:
+                # Sparse sampling: seek to each timestamp, fetching roughly one GOP per frame.
+                timestamps = [idx * interval * 1000 for idx in range(max_frames) if idx * interval * 1000 < duration_ms]
+                extracted = _extract_frames_at(db, job_id, ffmpeg_bin, source_path, timestamps, width, output_dir)
+            elif job.mode == "interval":
+                # Dense sampling: long videos are decoded as parallel time slices.
+                extracted = _extract_interval_slices(
+                    db,
+                    job_id,
+                    ffmpeg_bin,
+                    source_path,
+                    interval,
+                    max_frames,
+                    duration_ms or _probe_duration_ms(ffmpeg_bin, source_path),
+                    width,
+                    output_dir,
+                    sources,
+                )
 
+            if extracted is None:
+                out_pattern = str(output_dir / "frame_%05d.jpg")
+                cmd = _frame_filter_cmd(ffmpeg_bin, source_path, job, width, max_frames, out_pattern)
+                returncode, pts_times = _run_frame_ffmpeg(db, job_id, cmd, max_frames)
+                frame_paths = sorted(glob.glob(str(output_dir / "*.jpg")))
+                if returncode != 0 and stream and source_path == stream["url"] and not frame_paths:
+                    # The CDN would not serve the stream to ffmpeg; download it once and decode locally.
+                    source_path = _download_frame_source(db, sources, job, stream, output_dir)
+                    cmd = _frame_filter_cmd(ffmpeg_bin, source_path, job, width, max_frames, out_pattern)
+                    returncode, pts_times = _run_frame_ffmpeg(db, job_id, cmd, max_frames)
+                    frame_paths = sorted(glob.glob(str(output_dir / "*.jpg")))
+                if returncode != 0:
+                    return _fail_frame_job(db, job_id, "ffmpeg failed")
+                extracted = []
+                for idx, path in enumerate(frame_paths, start=1):
+                    if job.mode == "interval":
+                        ts = int((idx - 1) * interval * 1000)
+                    else:
+                        ts = int(pts_times[idx - 1] * 1000) if idx - 1 < len(pts_times) else None
+                    extracted.append((path, ts))
+
+        if not extracted:
+            return _fail_frame_job(db, job_id, "NO_FRAMES")
+
+        thumb_ext = _thumb_ext(ffmpeg_bin)
         frames = []
-        for idx, path in enumerate(frame_files, start=1):
-            if job.mode == "interval":
-                ts = int((idx - 1) * (job.interval_sec or 2) * 1000)
-            else:
-                ts = int(pts_times[idx - 1] * 1000) if idx - 1 < len(pts_times) else None
+        for idx, (path, ts) in enumerate(extracted, start=1):
+            thumb = _thumb_path(path, thumb_ext)
+            size = _jpeg_size(path) or (None, None)
             frames.append(
                 VideoFrame(
+                    id=str(uuid4()),
                     job_id=job.id,
                     bvid=job.bvid,
                     idx=idx,
                     timestamp_ms=ts,
                     frame_url=path,
+                    thumb_url=thumb if os.path.exists(thumb) else None,
+                    width=size[0],
+                    height=size[1],
                 )
             )
 
+        frames = _dedup_frames(ffmpeg_bin, job, frames)
+        if settings.frame_sprite_enabled:
+            _build_sprites(ffmpeg_bin, output_dir, frames)
+        frame_count = sum(1 for frame in frames if frame.duplicate_of is None)
         db.add_all(frames)
-        job = db.get(FrameJob, job_id)
-        job.status = "success"
-        job.generated_frames = len(frame_files)
-        job.frame_count = len(frame_files)
-        job.progress = 1.0
-        job.updated_at = datetime.utcnow()
-        db.add(job)
+        # Conditional on "running": a cancel that landed after the last progress tick (during
+        # dedup or sprites) is not overwritten. The Redis flag covers a cancel whose row
+        # update has not committed yet.
+        finished = db.execute(
+            update(FrameJob)
+            .where(FrameJob.id == job_id, FrameJob.status == "running")
+            .values(
+                status="success",
+                generated_frames=len(extracted),
+                frame_count=frame_count,
+                progress=1.0,
+                storage_bytes=frame_gc.tree_bytes(output_dir),
+                updated_at=datetime.utcnow(),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if finished.rowcount != 1 or _frame_cancel_requested(job_id):
+            db.rollback()
+            raise _FrameJobCanceled()
         db.commit()
-
-        _cleanup_old_jobs(db, job.bvid)
-        return {"status": "success", "frames": len(frame_files)}
+        _set_frame_status(job_id, "success", frames=frame_count, progress=1.0)
+
+        frame_gc.prune_video(db, job.bvid)
+        return {"status": "success", "frames": frame_count}
+    except _FrameJobCanceled:
+        job = db.get(FrameJob, job_id, populate_existing=True)
+        if job and job.status != "canceled":
+            job.status = "canceled"
+            job.updated_at = datetime.utcnow()
+            db.commit()
+        _set_frame_status(job_id, "canceled")
+        return {"status": "canceled"}
     except Exception as exc:  # noqa: BLE001
         job = db.get(FrameJob, job_id) if db else None
         if job:
             job.status = "failed"
             job.error_msg = str(exc)
             db.commit()
+        _set_frame_status(job_id, "failed")
         return {"status": "failed", "error": str(exc)}
     finally:
         db.close()
+
+
+@celery_app.task(name="gc_frame_storage")
+def gc_frame_storage():
+    """Keep FRAMES_DIR within quota: retention, orphan cleanup, then LRU eviction (see ``frame_gc``)."""
+    budget = max(10, int(settings.frame_gc_budget_seconds or 120))
+    r = redis.Redis.from_url(settings.redis_url)
+    lock_key = "frame_gc:lock"
+    try:
+        if not r.set(lock_key, "1", nx=True, ex=budget + 300):
+            return {"status": "skipped", "reason": "already running"}
+    except redis.RedisError:
+        lock_key = None
+    db = SessionLocal()
+    try:
+        return {"status": "done", **frame_gc.collect(db, budget)}
+    finally:
+        db.close()
+        if lock_key:
+            try:
+                r.delete(lock_key)
+            except redis.RedisError:
+                pass
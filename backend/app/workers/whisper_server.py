@@ -0,0 +1,158 @@
+"""Standalone faster-whisper inference service.
+
+Run ``python -m app.workers.whisper_server``. Each process loads the model once and serves
+``WHISPER_NUM_WORKERS`` jobs concurrently from the Redis list ``WHISPER_QUEUE_KEY``; the
+``extract_subtitle`` task pushes a job and blocks on the job's reply key (see
+``asr_service._transcribe_with_whisper_service``).
+
+Jobs are not batched with each other: the worker threads only share one warm model, and with
+``WHISPER_BATCH_SIZE>1`` faster-whisper's ``BatchedInferencePipeline`` batches the 30 s chunks
+of one audio window. faster-whisper has no public API for decoding several audios in one call.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from typing import Any
+
+import redis
+
+from app.core.config import settings
+from app.services.asr_service import PCM_RATE, PcmSource, whisper_segments
+
+logger = logging.getLogger("whisper_server")
+
+_POLL_SECONDS = 5
+_REPLY_TTL_SECONDS = 3600
+
+
+def load_model(cpu_threads: int, num_workers: int):
+    from faster_whisper import WhisperModel
+
+    model = WhisperModel(
+        settings.asr_model or "base",
+        device=settings.asr_device or "cpu",
+        compute_type=settings.asr_compute_type or "int8",
+        cpu_threads=cpu_threads,
+        num_workers=num_workers,
+    )
+    batch_size = int(settings.whisper_batch_size or 0)
+    if batch_size > 1:
+        try:
+            from faster_whisper import BatchedInferencePipeline
+        except ImportError:  # faster-whisper < 1.1
+            return model, 0
+        return BatchedInferencePipeline(model=model), batch_size
+    return model, 0
+
+
+def _job_source(job: dict[str, Any]) -> PcmSource:
+    """The submitter's spooled PCM when this process can read it, else the audio URL."""
+    pcm_path = job.get("pcm_path")
+    if pcm_path and os.access(pcm_path, os.R_OK):
+        return PcmSource(job["audio_url"], pcm_path)
+    return PcmSource(job["audio_url"])
+
+
+def transcribe_job(model, batch_size: int, job: dict[str, Any]) -> dict[str, Any]:
+    import numpy as np
+
+    language = job.get("language") or None
+    window_seconds = int(settings.asr_stream_segment_seconds or 0)
+    options: dict[str, Any] = {"language": language, "vad_filter": bool(settings.whisper_vad_filter)}
+    if batch_size:
+        options["batch_size"] = batch_size
+
+    segments: list[dict[str, Any]] = []
+    offset_ms = 0
+    for pcm in _job_source(job).chunks(window_seconds):
+        audio = np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+        parts, _info = model.transcribe(audio, **options)
+        segments.extend(whisper_segments(parts, offset_ms))
+        offset_ms += len(audio) * 1000 // PCM_RATE
+    return {"text": "\n".join(seg["text"] for seg in segments), "segments": segments}
+
+
+def _serve_jobs(r: redis.Redis, model, batch_size: int, stop: threading.Event) -> None:
+    queue = settings.whisper_queue_key
+    timeout = int(settings.whisper_job_timeout_seconds or 0)
+    while not stop.is_set():
+        item = r.blpop(queue, timeout=_POLL_SECONDS)
+        if not item:
+            continue
+        try:
+            job = json.loads(item[1])
+        except ValueError:
+            continue
+        reply_key = job.get("reply_key")
+        if not reply_key:
+            continue
+        if timeout and time.time() - float(job.get("submitted_at") or 0) > timeout:
+            # The submitter has already given up waiting.
+            continue
+        started = time.perf_counter()
+        try:
+            reply = {"ok": True, **transcribe_job(model, batch_size, job)}
+        except Exception as exc:  # noqa: BLE001
+            reply = {"ok": False, "error": str(exc)}
+        logger.info("job %s ok=%s %.1fs", job.get("id"), reply["ok"], time.perf_counter() - started)
+        pipe = r.pipeline()
+        pipe.rpush(reply_key, json.dumps(reply, ensure_ascii=False))
+        pipe.expire(reply_key, _REPLY_TTL_SECONDS)
+        pipe.execute()
+
+
+def serve(cpu_threads: int, num_workers: int) -> None:
+    """One warm model shared by ``num_workers`` job threads (CTranslate2 runs them in parallel).
+
+    The threads run separate ``transcribe`` calls; they do not form a cross-job batch.
+    """
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(processName)s %(message)s")
+    model, batch_size = load_model(cpu_threads, num_workers)
+    logger.info("model %s loaded (cpu_threads=%s, num_workers=%s)", settings.asr_model, cpu_threads, num_workers)
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    r = redis.Redis.from_url(settings.redis_url)
+    threads = [
+        threading.Thread(target=_serve_jobs, args=(r, model, batch_size, stop), daemon=True)
+        for _ in range(num_workers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="faster-whisper inference service")
+    parser.add_argument("--processes", type=int, default=int(settings.whisper_processes or 1))
+    parser.add_argument("--cpu-threads", type=int, default=int(settings.whisper_cpu_threads or 0))
+    parser.add_argument("--num-workers", type=int, default=int(settings.whisper_num_workers or 1))
+    args = parser.parse_args()
+
+    num_workers = max(1, args.num_workers)
+    if args.processes <= 1:
+        serve(args.cpu_threads, num_workers)
+        return
+    ctx = multiprocessing.get_context("spawn")
+    procs = [
+        ctx.Process(target=serve, args=(args.cpu_threads, num_workers), name=f"whisper-{idx}")
+        for idx in range(args.processes)
+    ]
+    for proc in procs:
+        proc.start()
+    for proc in procs:
+        proc.join()
+
+
+if __name__ == "__main__":
+    main()
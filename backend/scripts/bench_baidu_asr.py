@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import random
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.core.config import settings
+from app.services import asr_service
+
+
+class _StandIn(BaseHTTPRequestHandler):
+    """Mimics Baidu ``server_api``: echoes the segment index, with latency and throttling errors."""
+
+    latency = 0.2
+    error_rate = 0.0
+    rng = random.Random(7)
+    lock = threading.Lock()
+
+    def do_POST(self) -> None:  # noqa: N802
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        speech = base64.b64decode(payload.get("speech") or "")
+        (index,) = struct.unpack("<I", speech[:4])
+        time.sleep(self.latency)
+        with self.lock:
+            throttled = self.rng.random() < self.error_rate
+        if throttled:
+            body = {"err_no": 3304, "err_msg": "request pv too much", "sn": str(index)}
+        else:
+            body = {
+                "err_no": 0,
+                "err_msg": "success.",
+                "corpus_no": str(index),
+                "sn": str(index),
+                "result": [f"segment {index}"],
+            }
+        raw = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def _segments(count: int, seconds: int):
+    size = seconds * 16000 * 2
+    for idx in range(count):
+        yield struct.pack("<I", idx) + bytes(size - 4)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Baidu segment transcription against a local stand-in server.")
+    parser.add_argument("--segments", type=int, default=24)
+    parser.add_argument("--segment-seconds", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--error-rate", type=float, default=0.1)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--qps", type=float, default=0)
+    args = parser.parse_args()
+
+    _StandIn.latency = args.latency
+    _StandIn.error_rate = args.error_rate
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    settings.baidu_asr_endpoint = f"http://127.0.0.1:{server.server_port}/server_api"
+    settings.baidu_qps = args.qps
+    settings.baidu_retry_times = 5
+    asr_service._BAIDU_BACKOFF_BASE = 0.05
+    expected = "\n".join(f"segment {idx}" for idx in range(args.segments))
+    try:
+        for concurrency in args.concurrency:
+            settings.baidu_concurrency = concurrency
+            start = time.perf_counter()
+            segments = asr_service._baidu_transcribe_segments(_segments(args.segments, args.segment_seconds), "token")
+            text = "\n".join(seg["text"] for seg in segments)
+            elapsed = time.perf_counter() - start
+            if text != expected:
+                raise SystemExit(f"concurrency={concurrency}: segments out of order or missing")
+            print(f"concurrency={concurrency}: {args.segments} segments in {elapsed:.2f}s")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from app.models import Video
+from app.models.base import Base
+from app.services.defaults import default_rules
+from app.services.rule_engine import compile_rules, evaluate_rules
+
+
+def _synthetic_rows(count: int, seed: int) -> list[dict]:
+    rng = random.Random(seed)
+    rows = []
+    for idx in range(count):
+        views = rng.choice([0, rng.randint(1, 5000), rng.randint(5000, 500000)])
+        follower_count = rng.choice([0, rng.randint(1, 100000)])
+        fav = int(views * rng.uniform(0, 0.03))
+        coin = int(views * rng.uniform(0, 0.006))
+        reply = int(views * rng.uniform(0, 0.005))
+        rows.append(
+            {
+                "bvid": f"BVbench{idx:08d}",
+                "title": "",
+                "up_id": str(idx % 997),
+                "up_name": "",
+                "follower_count": follower_count,
+                "views": views,
+                "like": int(views * rng.uniform(0, 0.1)),
+                "fav": fav,
+                "coin": coin,
+                "reply": reply,
+                "share": 0,
+                "fav_rate": fav / views if views > 0 else 0.0,
+                "coin_rate": coin / views if views > 0 else 0.0,
+                "reply_rate": reply / views if views > 0 else 0.0,
+                "fav_fan_ratio": fav / follower_count if follower_count > 0 else 0.0,
+            }
+        )
+    return rows
+
+
+def _python_hits(rows: list[dict], rules: dict) -> dict[str, set[str]]:
+    hits: dict[str, set[str]] = {"basic_hot": set(), "low_fan_hot": set()}
+    for row in rows:
+        stats = {key: row[key] for key in ("views", "like", "fav", "coin", "reply", "share")}
+        result = evaluate_rules(stats, row["follower_count"], rules)
+        for tag in hits:
+            if result[tag]["is_hit"]:
+                hits[tag].add(row["bvid"])
+    return hits
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare evaluate_rules with the compiled SQL predicates.")
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", future=True)
+    Base.metadata.create_all(engine)
+    rows = _synthetic_rows(args.rows, args.seed)
+    with engine.begin() as conn:
+        conn.execute(insert(Video), rows)
+
+    variants = {
+        "default": default_rules(),
+        "basic_all": {**default_rules(), "basic_hot": {"mode": "all", "thresholds": {"views": 1000, "fav": 10}}},
+        "disabled": {"basic_hot": {"enabled": False}, "low_fan_hot": {"enabled": False}},
+    }
+
+    with Session(engine) as db:
+        for name, rules in variants.items():
+            start = time.perf_counter()
+            expected = _python_hits(rows, rules)
+            python_ms = (time.perf_counter() - start) * 1000
+
+            compiled = compile_rules(rules)
+            start = time.perf_counter()
+            actual = {
+                tag: set(db.execute(select(Video.bvid).where(expr)).scalars().all())
+                for tag, expr in compiled.items()
+            }
+            sql_ms = (time.perf_counter() - start) * 1000
+
+            for tag in expected:
+                if expected[tag] != actual[tag]:
+                    diff = expected[tag] ^ actual[tag]
+                    raise SystemExit(f"{name}/{tag}: mismatch on {len(diff)} rows, e.g. {sorted(diff)[:5]}")
+            counts = ", ".join(f"{tag}={len(actual[tag])}" for tag in actual)
+            print(f"{name}: {counts} python={python_ms:.1f}ms sql={sql_ms:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
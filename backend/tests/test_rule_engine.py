@@ -0,0 +1,102 @@
+"""``compile_rules`` must select exactly the videos ``evaluate_rules`` marks as hits.
+
+``/videos?tag=`` and the rule filters push the predicates into SQL, while ingestion still
+tags rows with the Python evaluator; the two disagreeing would make listings and counts drift.
+"""
+
+from __future__ import annotations
+
+import random
+
+import pytest
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from app.models import Video
+from app.models.base import Base
+from app.services.defaults import default_rules
+from app.services.rule_engine import compile_rules, evaluate_rules
+
+_STATS = ("views", "like", "fav", "coin", "reply", "share")
+
+
+def _row(bvid: str, views: int, follower_count: int, fav: int, coin: int, reply: int, like: int = 0) -> dict:
+    return {
+        "bvid": bvid,
+        "title": "",
+        "up_id": "0",
+        "up_name": "",
+        "follower_count": follower_count,
+        "views": views,
+        "like": like,
+        "fav": fav,
+        "coin": coin,
+        "reply": reply,
+        "share": 0,
+        "fav_rate": fav / views if views > 0 else 0.0,
+        "coin_rate": coin / views if views > 0 else 0.0,
+        "reply_rate": reply / views if views > 0 else 0.0,
+        "fav_fan_ratio": fav / follower_count if follower_count > 0 else 0.0,
+    }
+
+
+def _rows() -> list[dict]:
+    rng = random.Random(7)
+    rows = []
+    for idx in range(5000):
+        views = rng.choice([0, rng.randint(1, 5000), rng.randint(5000, 500000)])
+        follower_count = rng.choice([0, rng.randint(1, 100000)])
+        rows.append(
+            _row(
+                f"BVrand{idx:06d}",
+                views,
+                follower_count,
+                fav=int(views * rng.uniform(0, 0.03)),
+                coin=int(views * rng.uniform(0, 0.006)),
+                reply=int(views * rng.uniform(0, 0.005)),
+                like=int(views * rng.uniform(0, 0.1)),
+            )
+        )
+    # Exactly on the default thresholds, and the zero guards of low_fan_hot.
+    rows.append(_row("BVedge000001", 100000, 1000, 1500, 500, 200))
+    rows.append(_row("BVedge000002", 30000, 50000, 1000, 75, 60))
+    rows.append(_row("BVedge000003", 30000, 0, 1000, 75, 60))
+    rows.append(_row("BVedge000004", 0, 1000, 0, 0, 0))
+    return rows
+
+
+_VARIANTS = {
+    "default": default_rules(),
+    "basic_all": {**default_rules(), "basic_hot": {"mode": "all", "thresholds": {"views": 1000, "fav": 10}}},
+    "basic_unknown_field": {**default_rules(), "basic_hot": {"thresholds": {"danmaku": 1, "coin": 100}}},
+    "basic_no_thresholds": {**default_rules(), "basic_hot": {"thresholds": {}}},
+    "disabled": {"basic_hot": {"enabled": False}, "low_fan_hot": {"enabled": False}},
+}
+
+
+@pytest.fixture(scope="module")
+def videos():
+    rows = _rows()
+    engine = create_engine("sqlite://", future=True)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Video), rows)
+    with Session(engine) as db:
+        yield db, rows
+    engine.dispose()
+
+
+@pytest.mark.parametrize("name", sorted(_VARIANTS))
+def test_compiled_rules_match_evaluator(videos, name):
+    db, rows = videos
+    rules = _VARIANTS[name]
+    expected: dict[str, set[str]] = {"basic_hot": set(), "low_fan_hot": set()}
+    for row in rows:
+        result = evaluate_rules({key: row[key] for key in _STATS}, row["follower_count"], rules)
+        for tag in expected:
+            if result[tag]["is_hit"]:
+                expected[tag].add(row["bvid"])
+
+    for tag, expr in compile_rules(rules).items():
+        actual = set(db.execute(select(Video.bvid).where(expr)).scalars().all())
+        assert actual == expected[tag], f"{name}/{tag}: {sorted(actual ^ expected[tag])[:5]}"
@@ -47,7 +47,7 @@ interface SubtitleState {
 
 interface FrameJobState {
   id: string
-  status: 'pending' | 'running' | 'success' | 'failed' | 'canceled'
+  status: 'pending' | 'running' | 'success' | 'failed' | 'canceled' | 'expired'
   progress?: number | null
   generated_frames?: number
   frame_count?: number
@@ -60,6 +60,9 @@ interface FrameItem {
   idx: number
   timestamp_ms: number | null
   frame_url: string
+  thumb_url?: string | null
+  width?: number | null
+  height?: number | null
   is_favorited?: boolean
 }
 
@@ -385,6 +388,15 @@ export default function CreatorCenterPage() {
     if (!frameJob?.id) return
     if (frameJob.status === 'running' || frameJob.status === 'pending') {
       const timer = window.setInterval(async () => {
+        const live = (await api.get(`/api/frame_jobs/${frameJob.id}/progress`)).data
+        if (live.status === 'running' || live.status === 'pending') {
+          setFrameJob((prev) =>
+            prev && prev.id === live.id
+              ? { ...prev, status: live.status, progress: live.progress, generated_frames: live.generated_frames }
+              : prev
+          )
+          return
+        }
         const data = await fetchFrameJob(frameJob.id)
         if (data.status === 'success') {
           await fetchFrames(frameJob.id, 1, frameOnlyFavorited)
@@ -914,6 +926,7 @@ export default function CreatorCenterPage() {
     if (status === 'success') return '已完成'
     if (status === 'failed') return '失败'
     if (status === 'canceled') return '已取消'
+    if (status === 'expired') return '已清理'
     return status
   }
 
@@ -1812,7 +1825,8 @@ export default function CreatorCenterPage() {
                   ) : (
                     <div className='frame-grid'>
                       {frameItems.map((item, index) => {
-                        const src = item.frame_url.startsWith('http') ? item.frame_url : `${baseUrl}${item.frame_url}`
+                        const tile = item.thumb_url || item.frame_url
+                        const src = tile.startsWith('http') ? tile : `${baseUrl}${tile}`
                         return (
                           <div key={item.id} className='frame-card'>
                             <button className='frame-preview' onClick={() => openFramePreview(index)}>